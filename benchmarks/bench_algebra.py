@@ -0,0 +1,52 @@
+"""Relatório das regras de simplificação algébrica sobre um corpus gerado.
+
+Uso: python3 -m benchmarks.bench_algebra [quantidade_de_statements]
+"""
+import random
+import sys
+import time
+
+from benchmarks.bench_ir import generate_ir
+from src.ir.compact import CompactIR
+from src.optimization.optimizer import Optimizer
+
+def build_source(statements, seed=10):
+    # Expressões com identidades comuns em código gerado: `* 1`, `+ 0`,
+    # `x - x`, `* 0`, `0 / x` e multiplicações/divisões por potências de 2.
+    # Os operandos são entradas `in<N>`, nunca atribuídas, para que nenhuma
+    # divisão vire constante por zero; cada statement escreve seu próprio
+    # `r<N>`, então nenhum store é morto.
+    rng = random.Random(seed)
+    lines = [f"int in{i};" for i in range(100)] + [f"int r{i};" for i in range(statements)]
+    patterns = ["in{a} * 1", "in{a} + 0", "0 + in{a}", "in{a} - 0", "in{a} - in{a}", "in{a} * 0",
+                "0 / in{a}", "in{a} / 1", "in{a} * {p}", "{p} * in{a}", "in{a} / {p}",
+                "in{a} * in{b}", "in{a} + {n}", "(in{a} - {n})"]
+    for i in range(statements):
+        terms = [rng.choice(patterns).format(a=rng.randrange(100), b=rng.randrange(100),
+                                             p=2 ** rng.randint(1, 6), n=rng.randint(2, 99))
+                 for _ in range(3)]
+        lines.append(f"r{i} = {terms[0]} + {terms[1]} * {terms[2]};")
+    return "\n".join(lines)
+
+def main():
+    statements = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    instructions = generate_ir(build_source(statements))
+    print(f"{statements} statements, {len(instructions)} instructions\n")
+
+    counts = {}
+    start = time.perf_counter()
+    Optimizer().algebraic_simplification(CompactIR.from_tuples(instructions), counts)
+    elapsed = time.perf_counter() - start
+    print(f"{'rule':<12} {'rewritten':>10}")
+    for rule, count in sorted(counts.items(), key=lambda item: -item[1]):
+        print(f"{rule:<12} {count:>10}")
+    print(f"\nalgebraic_simplification() {elapsed:.3f}s\n")
+
+    without = len(Optimizer(algebraic=False).optimize(instructions))
+    with_rules = len(Optimizer().optimize(instructions))
+    print(f"optimized without rules: {without} instructions")
+    print(f"optimized with rules:    {with_rules} instructions "
+          f"({without - with_rules} removed by the rules)")
+
+if __name__ == "__main__":
+    main()
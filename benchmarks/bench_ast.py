@@ -0,0 +1,52 @@
+"""Memória e tempo de travessia da AST de objetos contra a arena de `CompactAST`.
+
+Uso: python3 -m benchmarks.bench_ast [quantidade_de_statements]
+
+Com o padrão de 100 mil statements o programa gerado tem perto de um milhão
+de nós. A memória é a retida pela AST ao fim do parse, medida com
+`tracemalloc`; os tempos são o melhor de três execuções.
+"""
+import sys
+import tracemalloc
+
+from benchmarks.generator import generate_program
+from benchmarks.suite import measure
+from src.analysis.semantic import SemanticAnalyzer
+from src.frontend.lexer import Lexer
+from src.frontend.parser import Parser
+from src.ir.ir_generator import IRGenerator
+
+def retained(func):
+    tracemalloc.start()
+    result = func()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current
+
+def generate(ast):
+    ir_gen = IRGenerator()
+    ir_gen.generate(ast)
+    return ir_gen.get_code()
+
+def main():
+    statements = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    tokens = Lexer(generate_program(statements)).tokenize_compact()
+    objects, object_bytes = retained(lambda: Parser(tokens).parse())
+    arena, arena_bytes = retained(lambda: Parser(tokens).parse_compact())
+    if generate(objects) != generate(arena):
+        raise SystemExit("CompactAST produced different TAC")
+    nodes = len(arena)
+    print(f"{nodes} nodes")
+    print(f"dataclass AST: {object_bytes / nodes:6.1f} bytes/node")
+    print(f"CompactAST:    {arena_bytes / nodes:6.1f} bytes/node ({object_bytes / arena_bytes:.1f}x smaller)\n")
+
+    for stage, runners in (
+        ("parse", (lambda: Parser(tokens).parse(), lambda: Parser(tokens).parse_compact())),
+        ("analyze", (lambda: SemanticAnalyzer().analyze(objects), lambda: SemanticAnalyzer().analyze(arena))),
+        ("generate", (lambda: generate(objects), lambda: generate(arena))),
+    ):
+        before, after = (measure(runner, 3)[0] for runner in runners)
+        print(f"{stage:<10} {before:8.3f}s -> {after:8.3f}s {before / after:6.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Tempo de carga do formato binário de TAC contra reler o texto impresso.
+
+Uso: python3 -m benchmarks.bench_binary [instruções]
+
+O programa é um trecho gerado pelo frontend repetido até o tamanho pedido
+(10 milhões de instruções por padrão). A releitura do texto roda sobre no
+máximo 1 milhão de instruções e é comparada por instrução.
+"""
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_ir import generate_ir
+from benchmarks.bench_tokens import build_source
+from src.ir.binary import read_binary, write_binary
+from src.ir.compact import CompactIR
+from src.ir.printer import OP_SYMBOLS, format_ir
+
+SYMBOL_OPS = {symbol: op for op, symbol in OP_SYMBOLS.items()}
+
+def parse_text(text):
+    instructions = []
+    for line in text.splitlines():
+        result, expression = line.split(' = ')
+        parts = expression.split(' ')
+        if len(parts) == 1:
+            instructions.append(('ASSIGN', parts[0], None, result))
+        else:
+            instructions.append((SYMBOL_OPS[parts[1]], parts[0], parts[2], result))
+    return instructions
+
+def repeated_ir(count):
+    block = CompactIR.from_tuples(generate_ir(build_source(2500)))
+    ir = CompactIR()
+    ir.share_pools(block)
+    repeats = -(-count // len(block))
+    ir.ops, ir.arg1, ir.arg2, ir.result = (column * repeats for column in (block.ops, block.arg1, block.arg2, block.result))
+    del ir.ops[count:], ir.arg1[count:], ir.arg2[count:], ir.result[count:]
+    return ir
+
+def timed(label, func, count=None):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    rate = f"{elapsed / count * 1e9:10.1f} ns/instruction" if count else ""
+    print(f"{label:<34} {elapsed:8.3f}s {rate}")
+    return result
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    ir = repeated_ir(count)
+    print(f"{len(ir)} instructions\n")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "program.tacb")
+        timed("write_binary()", lambda: write_binary(path, ir), count)
+        print(f"{'file size':<34} {os.path.getsize(path) / 1e6:8.1f} MB")
+        timed("read_binary(verify=False)", lambda: read_binary(path, verify=False), count)
+        loaded = timed("read_binary() with CRC32", lambda: read_binary(path), count)
+        timed("scan every opcode of the mapping", lambda: loaded.ops.tobytes().count(0), count)
+        del loaded
+
+        sample = min(count, 1_000_000)
+        text = format_ir(repeated_ir(sample).to_tuples())
+        timed("parse printed text", lambda: parse_text(text), sample)
+
+if __name__ == "__main__":
+    main()
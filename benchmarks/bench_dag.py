@@ -0,0 +1,49 @@
+"""Geração de TAC em modo DAG (hash-consing) contra a geração em árvore.
+
+Uso: python3 -m benchmarks.bench_dag [quantidade_de_statements]
+
+Usa um programa com poucas variáveis e expressões montadas a partir de um
+conjunto pequeno de subexpressões, como em código com cálculos repetidos.
+Para cada modo mostra o tamanho do TAC original e do otimizado e o tempo
+(melhor de três) de geração e de otimização.
+"""
+import random
+import sys
+
+from benchmarks.suite import measure
+from src.frontend.lexer import Lexer
+from src.frontend.parser import Parser
+from src.ir.ir_generator import IRGenerator
+from src.optimization.optimizer import Optimizer
+
+def generate_repetitive_program(statements, variables=8, shared=16, seed=0):
+    rng = random.Random(seed)
+    names = [f"v{i}" for i in range(variables)]
+    pool = [f"({rng.choice(names)} {rng.choice('+-*')} {rng.choice(names)})" for _ in range(shared)]
+    lines = [f"int {name};" for name in names]
+    for _ in range(statements):
+        terms = [rng.choice(pool) for _ in range(rng.randint(2, 4))]
+        lines.append(f"{rng.choice(names)} = {' + '.join(terms)};")
+    return "\n".join(lines) + "\n"
+
+def main():
+    statements = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    source = generate_repetitive_program(statements)
+    ast = Parser(Lexer(source).tokenize_compact()).parse_compact()
+    live_out = set(ast.names)
+    print(f"{statements} statements\n")
+
+    for label, dag in (("tree", False), ("dag", True)):
+        def generate():
+            ir_gen = IRGenerator(dag=dag)
+            ir_gen.generate(ast)
+            return ir_gen.get_code()
+        instructions = generate()
+        optimized = Optimizer().optimize(instructions, live_out=live_out)
+        generate_seconds, _ = measure(generate, 3)
+        optimize_seconds, _ = measure(lambda: Optimizer().optimize(instructions, live_out=live_out), 3)
+        print(f"{label:<5} {len(instructions):>9} TAC {len(optimized):>9} optimized "
+              f"generate {generate_seconds:8.3f}s optimize {optimize_seconds:8.3f}s")
+
+if __name__ == "__main__":
+    main()
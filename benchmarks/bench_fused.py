@@ -0,0 +1,43 @@
+"""Frontend de passada única (`Translator`) contra parser + análise semântica + gerador de IR.
+
+Uso: python3 -m benchmarks.bench_fused [quantidade_de_statements]
+
+Os dois caminhos partem do mesmo `TokenBuffer` e param no TAC original; o
+tempo é o melhor de três execuções e o pico de memória vem de uma execução
+extra sob `tracemalloc`.
+"""
+import sys
+
+from benchmarks.generator import generate_program
+from benchmarks.suite import measure
+from src.analysis.semantic import SemanticAnalyzer
+from src.frontend.lexer import Lexer
+from src.frontend.parser import Parser
+from src.frontend.translator import Translator
+from src.ir.ir_generator import IRGenerator
+
+def multi_pass(tokens):
+    ast = Parser(tokens).parse()
+    SemanticAnalyzer().analyze(ast)
+    ir_gen = IRGenerator()
+    ir_gen.generate(ast)
+    return ir_gen.get_code()
+
+def fused(tokens):
+    return Translator(tokens).translate()
+
+def main():
+    statements = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    tokens = Lexer(generate_program(statements)).tokenize_compact()
+    if multi_pass(tokens) != fused(tokens):
+        raise SystemExit("fused frontend produced different TAC")
+    print(f"{statements} statements, {len(tokens)} tokens\n")
+
+    baseline = None
+    for label, func in (("AST + analyze + generate", multi_pass), ("fused Translator", fused)):
+        seconds, peak = measure(lambda: func(tokens), 3)
+        baseline = baseline or seconds
+        print(f"{label:<26} {seconds:8.3f}s {peak / 1e6:8.1f} MB peak {baseline / seconds:6.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Compara memória e tempo do TAC em tuplas com o `CompactIR`.
+
+Uso: python3 -m benchmarks.bench_ir [quantidade_de_statements]
+"""
+import sys
+import time
+import tracemalloc
+
+from benchmarks.bench_tokens import build_source
+from src.frontend.lexer import Lexer
+from src.frontend.parser import Parser
+from src.ir.ir_generator import IRGenerator
+from src.ir.compact import CompactIR
+from src.optimization.optimizer import Optimizer
+
+def generate_ir(source):
+    ir_gen = IRGenerator()
+    ir_gen.generate(Parser(Lexer(source).tokenize_compact()).parse())
+    return ir_gen.get_code()
+
+def traced(func):
+    tracemalloc.start()
+    result = func()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:<34} {time.perf_counter() - start:8.3f}s")
+    return result
+
+def main():
+    statements = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    source = build_source(statements)
+
+    instructions, tuple_bytes = traced(lambda: generate_ir(source))
+    compact, compact_bytes = traced(lambda: CompactIR.from_tuples(instructions))
+    count = len(instructions)
+    print(f"{count} instructions")
+    print(f"tuple IR:   {tuple_bytes / count:6.1f} bytes/instruction")
+    print(f"CompactIR:  {compact_bytes / count:6.1f} bytes/instruction\n")
+
+    timed("CompactIR.from_tuples()", lambda: CompactIR.from_tuples(instructions))
+    timed("optimize_compact()", lambda: Optimizer().optimize_compact(CompactIR.from_tuples(instructions)))
+    timed("optimize() (tuples in and out)", lambda: Optimizer().optimize(instructions))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Otimização particionada em paralelo contra o otimizador serial num programa largo.
+
+Uso: python3 -m benchmarks.bench_partition [módulos] [comandos por módulo]   (padrão: 16 2000)
+
+Gera um programa com vários módulos sem variáveis em comum (cada um vindo
+de `generate_program()` com os nomes prefixados), conta os componentes
+independentes do TAC e mede `Optimizer().optimize()` contra
+`Optimizer(jobs=N).optimize()` para alguns N, conferindo que o resultado é
+idêntico. O pool de processos é aquecido antes de medir. O ganho depende de
+haver mais de uma CPU: com uma só, o paralelo só mostra o custo da divisão.
+"""
+import os
+import re
+import sys
+import time
+
+from benchmarks.generator import generate_program
+from src.driver.pipeline import compile_source
+from src.ir.compact import CompactIR
+from src.optimization.optimizer import Optimizer
+from src.optimization.partition import dependency_components
+
+def wide_program(modules, statements):
+    return "".join(re.sub(r"\bv(\d+)", rf"m{module}_v\1", generate_program(statements, variables=100, seed=module))
+                   for module in range(modules))
+
+def timed(optimizer, instructions):
+    start = time.perf_counter()
+    optimized = optimizer.optimize(instructions)
+    return optimized, time.perf_counter() - start
+
+def main():
+    modules = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    statements = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    instructions = compile_source(wide_program(modules, statements), Optimizer(level=0)).original_ir
+    start = time.perf_counter()
+    components = dependency_components(CompactIR.from_tuples(instructions))
+    print(f"{len(instructions)} instructions, {len(components)} components "
+          f"(split in {time.perf_counter() - start:.2f}s), {os.cpu_count()} CPUs")
+
+    expected, serial = timed(Optimizer(), instructions)
+    print(f"{'serial':<10} {serial:8.2f}s")
+    for jobs in (2, 4, 8):
+        optimizer = Optimizer(jobs=jobs)
+        timed(optimizer, instructions[:optimizer.parallel_threshold])
+        optimized, seconds = timed(optimizer, instructions)
+        print(f"{f'jobs={jobs}':<10} {seconds:8.2f}s  {serial / seconds:5.2f}x  "
+              f"{'identical' if optimized == expected else 'DIFFERENT'}")
+
+if __name__ == "__main__":
+    main()
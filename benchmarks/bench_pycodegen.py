@@ -0,0 +1,49 @@
+"""Custo por chamada de um programa compilado para função Python.
+
+Uso: python3 -m benchmarks.bench_pycodegen [chamadas]
+
+Compara a função gerada por `compile_program()` com a mesma fórmula escrita
+à mão em Python e com um interpretador de TAC que percorre as tuplas.
+"""
+import sys
+import timeit
+
+from benchmarks.bench_evaluator import SOURCE
+from src.backend.evaluator import SCALAR_OPS
+from src.backend.pycodegen import compile_program
+from src.driver.pipeline import compile_source
+
+def hand_written(price=0, qty=0, tax=0, discount=0, total=0, score=0):
+    total = price * qty + price * qty * tax // 100 - discount * 4
+    score = (total - price) * (total + qty) // (qty + 1) + total // 8
+    return (price, qty, tax, discount, total, score)
+
+def interpret(instructions, env):
+    env = dict(env)
+    for op, arg1, arg2, result in instructions:
+        a = env[arg1] if arg1 in env else int(arg1)
+        env[result] = a if op == 'ASSIGN' else SCALAR_OPS[op](a, env[arg2] if arg2 in env else int(arg2))
+    return env
+
+def per_call(label, func, calls, baseline=None):
+    elapsed = min(timeit.repeat(func, number=calls, repeat=5)) / calls
+    ratio = f"{elapsed / baseline:6.2f}x" if baseline else ""
+    print(f"{label:<24} {elapsed * 1e9:10.1f} ns/call {ratio}")
+    return elapsed
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    result = compile_source(SOURCE)
+    function = compile_program(result.optimized_ir, result.symbol_table)
+    args = (1200, 7, 12, 40)
+    assert function(*args) == hand_written(*args)
+    env = dict(zip(result.symbol_table, args))
+
+    baseline = per_call("hand-written function", lambda: hand_written(*args), calls)
+    per_call("compile_program()", lambda: function(*args), calls, baseline)
+    per_call("TAC interpreter", lambda: interpret(result.optimized_ir, env), calls // 10, baseline)
+    per_call("compile_program() hit", lambda: compile_program(result.optimized_ir, result.symbol_table),
+             calls // 10, baseline)
+
+if __name__ == "__main__":
+    main()
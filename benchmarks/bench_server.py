@@ -0,0 +1,84 @@
+"""Teste de carga do servidor de compilação contra um processo novo por arquivo.
+
+Uso: python3 -m benchmarks.bench_server [arquivos] [clientes]   (padrão: 200 8)
+
+Gera programas pequenos com semente fixa e mede a latência (p50/p99) e os
+pedidos por segundo de três formas: `python3 -m src.main arquivo` por
+arquivo (só os primeiros 30, porque é lento), o servidor com um cliente por
+vez e o servidor com vários clientes em paralelo, primeiro com o cache frio
+e depois com todos os resultados já no cache.
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.generator import generate_program
+from src.service.client import CompileClient
+
+ONE_SHOT_FILES = 30
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def report(label, latencies, seconds):
+    print(f"{label:<28} p50 {percentile(latencies, 0.5) * 1e3:8.2f} ms  "
+          f"p99 {percentile(latencies, 0.99) * 1e3:8.2f} ms  {len(latencies) / seconds:9.1f} req/s")
+
+def timed_compiles(path, sources):
+    latencies = []
+    with CompileClient(path, timeout=120) as client:
+        for source in sources:
+            start = time.perf_counter()
+            client.compile(source)
+            latencies.append(time.perf_counter() - start)
+    return latencies
+
+def run_server_phase(label, path, sources, clients):
+    batches = [sources[i::clients] for i in range(clients)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(clients) as threads:
+        latencies = [latency for batch in threads.map(lambda batch: timed_compiles(path, batch), batches)
+                     for latency in batch]
+    report(label, latencies, time.perf_counter() - start)
+
+def main():
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    clients = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    sources = [generate_program(50, variables=20, seed=seed) for seed in range(files)]
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for index, source in enumerate(sources[:ONE_SHOT_FILES]):
+            paths.append(os.path.join(directory, f"program{index}.src"))
+            with open(paths[-1], 'w') as f:
+                f.write(source)
+
+        latencies = []
+        start = time.perf_counter()
+        for path in paths:
+            begin = time.perf_counter()
+            subprocess.run([sys.executable, '-m', 'src.main', path], check=True, capture_output=True)
+            latencies.append(time.perf_counter() - begin)
+        report("one-shot process per file", latencies, time.perf_counter() - start)
+
+        socket_path = os.path.join(directory, "compile.sock")
+        server = subprocess.Popen([sys.executable, '-m', 'src.service.server', socket_path])
+        try:
+            deadline = time.perf_counter() + 60
+            while not os.path.exists(socket_path):
+                if time.perf_counter() > deadline or server.poll() is not None:
+                    raise SystemExit("compile server did not start")
+                time.sleep(0.05)
+            half = files // 2
+            run_server_phase("server, 1 client", socket_path, sources[:half], 1)
+            run_server_phase(f"server, {clients} clients", socket_path, sources[half:], clients)
+            run_server_phase(f"server, {clients} clients, cached", socket_path, sources, clients)
+        finally:
+            server.terminate()
+            server.wait()
+
+if __name__ == "__main__":
+    main()
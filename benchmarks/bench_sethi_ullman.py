@@ -0,0 +1,44 @@
+"""Temporários vivos ao mesmo tempo com a ordem do fonte e com a ordem de Sethi–Ullman.
+
+Uso: python3 -m benchmarks.bench_sethi_ullman [quantidade_de_statements]
+
+Para cada profundidade de expressão do gerador de programas, mostra o
+máximo de temporários vivos (`max_live_temps()`) no TAC original e depois do
+-O2, a quantidade de nomes de temporários distintos e o tempo de geração
+(melhor de três).
+"""
+import sys
+
+from benchmarks.generator import generate_program
+from benchmarks.suite import measure
+from src.frontend.lexer import Lexer
+from src.frontend.parser import Parser
+from src.ir.compact import is_temp
+from src.ir.ir_generator import IRGenerator
+from src.ir.regalloc import max_live_temps
+from src.optimization.optimizer import Optimizer
+
+def distinct_temps(instructions):
+    return len({result for _, _, _, result in instructions if is_temp(result)})
+
+def main():
+    statements = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    print(f"{statements} statements per program\n")
+    print(f"{'depth':>5} {'order':<13} {'max live':>8} {'after -O2':>9} {'temps':>8} {'generate':>9}")
+    for depth in (4, 8, 12):
+        ast = Parser(Lexer(generate_program(statements, depth=depth, variables=20, seed=depth))
+                     .tokenize_compact()).parse_compact()
+        live_out = set(ast.names)
+        for label, sethi_ullman in (("source", False), ("sethi-ullman", True)):
+            def generate():
+                ir_gen = IRGenerator(sethi_ullman=sethi_ullman)
+                ir_gen.generate(ast)
+                return ir_gen.get_code()
+            instructions = generate()
+            optimized = Optimizer().optimize(instructions, live_out=live_out)
+            seconds, _ = measure(generate, 3)
+            print(f"{depth:>5} {label:<13} {max_live_temps(instructions):>8} {max_live_temps(optimized):>9} "
+                  f"{distinct_temps(instructions):>8} {seconds:8.3f}s")
+
+if __name__ == "__main__":
+    main()
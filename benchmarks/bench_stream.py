@@ -0,0 +1,69 @@
+"""Pico de memória (RSS) da compilação em streaming conforme a entrada cresce.
+
+Uso: python3 -m benchmarks.bench_stream [MB ...]   (padrão: 10 50 100)
+
+Cada tamanho gera um programa em disco, em pedaços, e o compila num
+processo novo com `compile_stream()`; o pico de RSS vem de
+`resource.getrusage()`. Com `--whole`, compila também com `compile_source()`
+para comparar (só vale a pena nos tamanhos menores).
+"""
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.generator import generate_program
+
+VARIABLES = 100
+
+def write_program(path, megabytes):
+    target = megabytes * 1024 * 1024
+    written = 0
+    seed = 0
+    with open(path, 'w') as f:
+        while written < target:
+            lines = generate_program(2000, variables=VARIABLES, seed=seed).splitlines(keepends=True)
+            chunk = ''.join(lines if seed == 0 else lines[VARIABLES:])
+            f.write(chunk)
+            written += len(chunk)
+            seed += 1
+
+def child(mode, path):
+    start = time.perf_counter()
+    if mode == 'stream':
+        from src.driver.streaming import compile_stream
+        statements = compile_stream(path, path + '.tac').statement_count
+    else:
+        from src.driver.pipeline import compile_source
+        with open(path) as f:
+            statements = compile_source(f.read()).statement_count
+    seconds = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    print(statements, seconds, peak)
+
+def run_child(mode, path):
+    output = subprocess.run([sys.executable, '-m', 'benchmarks.bench_stream', '--child', mode, path],
+                            check=True, capture_output=True, text=True).stdout.split()
+    return int(output[0]), float(output[1]), int(output[2])
+
+def main():
+    if sys.argv[1:2] == ['--child']:
+        child(sys.argv[2], sys.argv[3])
+        return
+    whole = '--whole' in sys.argv
+    sizes = [int(arg) for arg in sys.argv[1:] if arg != '--whole'] or [10, 50, 100]
+    with tempfile.TemporaryDirectory() as directory:
+        for megabytes in sizes:
+            path = os.path.join(directory, f"program_{megabytes}.src")
+            write_program(path, megabytes)
+            modes = ('stream', 'whole') if whole else ('stream',)
+            for mode in modes:
+                statements, seconds, peak = run_child(mode, path)
+                print(f"{megabytes:>6} MB {mode:<7} {statements:>10} statements {seconds:8.1f}s "
+                      f"{peak / 1e6:8.1f} MB peak RSS")
+            os.remove(path)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Compara a lista de tuplas de `Lexer.tokenize()` com o `TokenBuffer` compacto.
+
+Uso: python3 -m benchmarks.bench_tokens [quantidade_de_statements]
+"""
+import sys
+import time
+import tracemalloc
+
+from src.frontend.lexer import Lexer
+from src.frontend.parser import Parser
+
+def build_source(statements):
+    lines = [f"int v{i};" for i in range(100)]
+    for i in range(statements):
+        a, b, c = i % 100, (i * 7) % 100, (i * 13) % 100
+        lines.append(f"v{a} = (v{b} + {i}) * v{c} - {i % 17};")
+    return "\n".join(lines)
+
+def measure(label, func):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    del result
+    tracemalloc.start()
+    result = func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<32} {elapsed:8.3f}s {peak / 1e6:10.1f} MB")
+    return result
+
+def main():
+    statements = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    source = build_source(statements)
+
+    print(f"{statements} statements, {len(source) / 1e6:.1f} MB of source\n")
+    print(f"{'stage':<32} {'time':>9} {'peak mem':>13}")
+
+    tokens = measure("tokenize() tuple list", lambda: Lexer(source).tokenize())
+    buffer = measure("tokenize_compact() buffer", lambda: Lexer(source).tokenize_compact())
+    measure("parse tuple list", lambda: Parser(tokens).parse())
+    measure("parse compact buffer", lambda: Parser(buffer).parse())
+
+    print(f"\n{len(tokens)} tokens, {len(buffer.lexemes)} distinct lexemes")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""Suíte de benchmarks por estágio do compilador, com comparação contra uma linha de base.
+
+Uso:
+    python3 -m benchmarks.suite --output results.json
+    python3 -m benchmarks.suite --compare baseline.json --threshold 0.2
+    python3 -m benchmarks.suite --compare baseline.json --current results.json
+
+Cada tamanho gera um programa com `benchmarks.generator` (semente fixa, sem
+rede) e mede separadamente `Lexer.tokenize`, `Parser.parse_compact`,
+`SemanticAnalyzer.analyze`, `IRGenerator.generate`, `Translator.translate`
+(o frontend de passada única, da lista de tokens ao TAC) e `Optimizer.optimize`:
+o tempo é o melhor de `--repeat` execuções (só uma acima de 10 mil
+statements) e o pico de memória vem de uma execução extra sob `tracemalloc`.
+No modo de comparação o processo sai com código 1 se algum estágio ficar
+mais lento (ou usar mais memória) que a linha de base além do limite.
+"""
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from benchmarks.generator import generate_program
+from src.analysis.semantic import SemanticAnalyzer
+from src.frontend.lexer import Lexer
+from src.frontend.parser import Parser
+from src.frontend.translator import Translator
+from src.ir.ir_generator import IRGenerator
+from src.optimization.optimizer import Optimizer
+
+RESULTS_FORMAT = 1
+DEFAULT_SIZES = [100, 1_000, 10_000, 100_000, 1_000_000]
+STAGES = ['tokenize', 'parse', 'analyze', 'generate', 'translate', 'optimize']
+
+def analyze(ast):
+    SemanticAnalyzer().analyze(ast)
+
+def generate(ast):
+    ir_gen = IRGenerator()
+    ir_gen.generate(ast)
+    return ir_gen.get_code()
+
+def stage_runners(source):
+    # Cada estágio recebe a saída do anterior, produzida fora da medição.
+    tokens = Lexer(source).tokenize()
+    ast = Parser(tokens).parse_compact()
+    instructions = generate(ast)
+    return {
+        'tokenize': lambda: Lexer(source).tokenize(),
+        'parse': lambda: Parser(tokens).parse_compact(),
+        'analyze': lambda: analyze(ast),
+        'generate': lambda: generate(ast),
+        'translate': lambda: Translator(tokens).translate(),
+        'optimize': lambda: Optimizer().optimize(instructions),
+    }
+
+def measure(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        # Coleta o lixo da execução anterior para que ela não pese nesta.
+        gc.collect()
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+        del result
+    tracemalloc.start()
+    result = func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return best, peak
+
+def run_suite(sizes, repeat=3, depth=4, variables=100, constant_density=0.3, seed=0, log=print):
+    config = {'sizes': sizes, 'repeat': repeat, 'depth': depth, 'variables': variables,
+              'constant_density': constant_density, 'seed': seed}
+    results = {}
+    for statements in sizes:
+        source = generate_program(statements, depth, variables, constant_density, seed)
+        runners = stage_runners(source)
+        runs = repeat if statements <= 10_000 else 1
+        results[str(statements)] = row = {}
+        for stage in STAGES:
+            seconds, peak = measure(runners[stage], runs)
+            row[stage] = {'seconds': seconds, 'peak_bytes': peak}
+            log(f"{statements:>9} {stage:<10} {seconds:10.4f}s {peak / 1e6:10.1f} MB")
+    return {
+        'format': RESULTS_FORMAT,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': config,
+        'results': results,
+    }
+
+def compare(baseline, current, threshold=0.2, stage_thresholds=None, memory_threshold=None, min_seconds=0.005):
+    """Lista as regressões de `current` em relação a `baseline`.
+
+    Um estágio regride quando o tempo passa de `baseline * (1 + limite)`;
+    `stage_thresholds` troca o limite por estágio. Tempos de base abaixo de
+    `min_seconds` são ruído e não são comparados. Com `memory_threshold`, o
+    pico de memória é comparado da mesma forma.
+    """
+    stage_thresholds = stage_thresholds or {}
+    regressions = []
+    for size, stages in baseline['results'].items():
+        for stage, before in stages.items():
+            after = current['results'].get(size, {}).get(stage)
+            if after is None:
+                continue
+            limit = stage_thresholds.get(stage, threshold)
+            if before['seconds'] >= min_seconds and after['seconds'] > before['seconds'] * (1 + limit):
+                regressions.append(f"{stage} at {size} statements: {before['seconds']:.4f}s -> "
+                                   f"{after['seconds']:.4f}s (limit +{limit:.0%})")
+            if memory_threshold is not None and after['peak_bytes'] > before['peak_bytes'] * (1 + memory_threshold):
+                regressions.append(f"{stage} at {size} statements: peak {before['peak_bytes']} -> "
+                                   f"{after['peak_bytes']} bytes (limit +{memory_threshold:.0%})")
+    return regressions
+
+def parse_stage_thresholds(values):
+    thresholds = {}
+    for value in values:
+        stage, _, limit = value.partition('=')
+        if stage not in STAGES or not limit:
+            raise argparse.ArgumentTypeError(f"Invalid stage threshold: {value}")
+        thresholds[stage] = float(limit)
+    return thresholds
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog='python3 -m benchmarks.suite', description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=None,
+                        help='quantidades de statements (padrão: 1e2 a 1e6, ou as da linha de base)')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--depth', type=int, default=4)
+    parser.add_argument('--variables', type=int, default=100)
+    parser.add_argument('--constant-density', type=float, default=0.3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='grava os resultados em JSON')
+    parser.add_argument('--compare', metavar='BASELINE', help='JSON de linha de base para comparar')
+    parser.add_argument('--current', metavar='RESULTS', help='compara este JSON em vez de rodar a suíte')
+    parser.add_argument('--threshold', type=float, default=0.2, help='regressão de tempo tolerada (0.2 = +20%%)')
+    parser.add_argument('--stage-threshold', action='append', default=[], metavar='STAGE=LIMIT',
+                        help='limite específico de um estágio, ex.: optimize=0.5')
+    parser.add_argument('--memory-threshold', type=float, default=None,
+                        help='regressão de pico de memória tolerada (padrão: não compara)')
+    parser.add_argument('--min-seconds', type=float, default=0.005,
+                        help='tempos de base menores que isso não são comparados')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    try:
+        stage_thresholds = parse_stage_thresholds(args.stage_threshold)
+    except argparse.ArgumentTypeError as e:
+        print(e, file=sys.stderr)
+        return 2
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    if args.current:
+        with open(args.current, encoding='utf-8') as f:
+            current = json.load(f)
+    else:
+        # Na comparação, a configuração da linha de base é repetida para
+        # que os dois lados meçam os mesmos programas.
+        config = dict(baseline['config']) if baseline else {
+            'sizes': DEFAULT_SIZES, 'repeat': args.repeat, 'depth': args.depth, 'variables': args.variables,
+            'constant_density': args.constant_density, 'seed': args.seed,
+        }
+        if args.sizes:
+            config['sizes'] = args.sizes
+        current = run_suite(**config)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(current, f, indent=2)
+
+    if baseline is None:
+        return 0
+    regressions = compare(baseline, current, args.threshold, stage_thresholds,
+                          args.memory_threshold, args.min_seconds)
+    for regression in regressions:
+        print(f"REGRESSION: {regression}", file=sys.stderr)
+    print(f"{len(regressions)} regressions against {args.compare}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,15 +2,9 @@ from src.frontend.lexer import Lexer
 from src.frontend.parser import Parser
 from src.analysis.semantic import SemanticAnalyzer
 from src.ir.ir_generator import IRGenerator
+from src.ir.printer import format_instruction
 from src.optimization.optimizer import Optimizer
 
-def format_instruction(op, arg1, arg2, result):
-    if op == 'ASSIGN':
-        return f"{result} = {arg1}"
-    else:
-        symbol = {'ADD': '+', 'SUB': '-', 'MUL': '*', 'DIV': '/'}.get(op, op)
-        return f"{result} = {arg1} {symbol} {arg2}"
-
 def print_comparison(source_code, title):
     print("\n" + "="*80)
     print(f"  {title}")
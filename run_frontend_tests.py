@@ -0,0 +1,6 @@
+#!/usr/bin/env python3
+import sys
+sys.path.insert(0, '.')
+
+if __name__ == '__main__':
+    from tests.test_frontend import *
@@ -1,4 +1,5 @@
 from src.frontend.ast_nodes import Program, Declaration, Assignment, BinaryOp, Number, Variable
+from src.frontend.compact_ast import CompactAST, NK_DECLARATION, NK_VARIABLE, TYPES
 
 class SemanticError(Exception):
     pass
@@ -10,7 +11,10 @@ class SemanticAnalyzer:
         self.symbol_table = {}
 
     def analyze(self, node):
-        if isinstance(node, Program):
+        if isinstance(node, CompactAST):
+            self.analyze_compact(node)
+
+        elif isinstance(node, Program):
             for stmt in node.statements:
                 self.analyze(stmt)
         
@@ -31,3 +35,24 @@ class SemanticAnalyzer:
         elif isinstance(node, Variable):
             if node.name not in self.symbol_table:
                 raise SemanticError(f"Variable '{node.name}' not declared")
+
+    def analyze_compact(self, ast):
+        # Cada statement ocupa o trecho da arena que termina na sua raiz; as
+        # variáveis aparecem nele na ordem do texto, a mesma em que a
+        # travessia recursiva as visita, então o primeiro erro é o mesmo.
+        symbols = self.symbol_table
+        kinds, payload, names = ast.kinds, ast.payload, ast.names
+        start = 0
+        for root in ast.statements:
+            name = names[payload[root]]
+            if kinds[root] == NK_DECLARATION:
+                if name in symbols:
+                    raise SemanticError(f"Variable '{name}' already declared")
+                symbols[name] = TYPES[ast.left[root]]
+            else:
+                if name not in symbols:
+                    raise SemanticError(f"Variable '{name}' not declared")
+                for handle in range(start, root):
+                    if kinds[handle] == NK_VARIABLE and names[payload[handle]] not in symbols:
+                        raise SemanticError(f"Variable '{names[payload[handle]]}' not declared")
+            start = root + 1
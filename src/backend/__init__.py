@@ -0,0 +1,4 @@
+from .evaluator import VectorEvaluator, evaluate
+from .pycodegen import compile_program, generate_source
+
+__all__ = ['VectorEvaluator', 'evaluate', 'compile_program', 'generate_source']
@@ -0,0 +1,193 @@
+import operator
+from itertools import repeat
+
+from src.ir.compact import is_temp, parse_constant
+
+try:
+    import numpy
+except ImportError:  # NumPy é opcional; sem ele as colunas são listas.
+    numpy = None
+
+SCALAR_OPS = {
+    'ADD': operator.add,
+    'SUB': operator.sub,
+    'MUL': operator.mul,
+    'DIV': operator.floordiv,
+    'SHL': operator.lshift,
+    'SHR': operator.rshift,
+}
+ARRAY_OPS = {} if numpy is None else {
+    'ADD': numpy.add,
+    'SUB': numpy.subtract,
+    'MUL': numpy.multiply,
+    'DIV': numpy.floor_divide,
+    'SHL': numpy.left_shift,
+    'SHR': numpy.right_shift,
+}
+
+
+class VectorEvaluator:
+    """Executa o TAC sobre colunas inteiras, uma operação vetorial por instrução.
+
+    Variáveis lidas antes de serem atribuídas são entradas, passadas em
+    `run()` como um dicionário de colunas (arrays NumPy ou sequências). O
+    resultado traz o valor final de cada variável nomeada atribuída pelo
+    programa. `DIV` é divisão piso, como no otimizador, e um divisor zero em
+    qualquer linha levanta `ZeroDivisionError`.
+
+    Os buffers dos valores intermediários são reaproveitados assim que o
+    último uso do valor passa, então a memória cresce com o número máximo de
+    valores vivos (`buffer_count`) e não com o tamanho do programa. Com
+    NumPy o dtype padrão é int64, que transborda em silêncio onde os
+    inteiros do Python não transbordariam; `dtype=object` mantém a
+    semântica exata. Sem NumPy, cada instrução vira um `map` sobre listas.
+    """
+
+    def __init__(self, instructions, dtype=None, use_numpy=None):
+        if use_numpy is None:
+            use_numpy = numpy is not None
+        if use_numpy and numpy is None:
+            raise RuntimeError("NumPy is not installed")
+        self.use_numpy = use_numpy
+        self.dtype = dtype if dtype is not None or not use_numpy else numpy.int64
+
+        self.inputs = []
+        self.constants = []
+        self.outputs = {}
+        self.steps = []
+        self.value_count = 0
+        self.buffer_count = 0
+        self._plan(instructions)
+
+    def _plan(self, instructions):
+        # Cada definição vira um valor numerado; ASSIGN só cria um apelido.
+        # O último uso de cada valor decide quando o seu buffer volta ao pool.
+        current = {}
+        constants = {}
+        last_use = []
+        assigned = set()
+
+        def new_value():
+            last_use.append(-1)
+            self.value_count += 1
+            return self.value_count - 1
+
+        def read(arg, index):
+            value = current.get(arg)
+            if value is None:
+                number = parse_constant(arg)
+                if number is not None:
+                    value = constants.get(number)
+                    if value is None:
+                        value = constants[number] = new_value()
+                        self.constants.append((value, number))
+                else:
+                    value = current[arg] = new_value()
+                    self.inputs.append((arg, value))
+            last_use[value] = index
+            return value
+
+        pending = []
+        for index, (op, arg1, arg2, result) in enumerate(instructions):
+            left = read(arg1, index)
+            assigned.add(result)
+            if op == 'ASSIGN':
+                current[result] = left
+                continue
+            if op not in SCALAR_OPS:
+                raise ValueError(f"Unsupported opcode: {op}")
+            right = read(arg2, index)
+            value = current[result] = new_value()
+            pending.append((index, op, value, left, right))
+
+        self.outputs = {name: value for name, value in current.items()
+                        if name in assigned and not is_temp(name)}
+        for value in self.outputs.values():
+            last_use[value] = len(instructions)
+
+        computed = {}
+        free = []
+        for index, op, value, left, right in pending:
+            dead = []
+            for operand in {left, right}:
+                if last_use[operand] == index:
+                    dead.append(operand)
+                    if operand in computed:
+                        free.append(computed.pop(operand))
+            # Um operando que morre aqui pode ceder o buffer ao resultado: as
+            # operações são elemento a elemento, então escrever no lugar é seguro.
+            if free:
+                slot = free.pop()
+            else:
+                slot = self.buffer_count
+                self.buffer_count += 1
+            computed[value] = slot
+            if last_use[value] < index:
+                dead.append(value)
+                free.append(computed.pop(value))
+            self.steps.append((op, value, left, right, slot, dead))
+
+    def run(self, inputs, rows=None):
+        values = [None] * self.value_count
+        for value, number in self.constants:
+            values[value] = number
+
+        for name, value in self.inputs:
+            if name not in inputs:
+                raise ValueError(f"Missing input column: {name}")
+            column = inputs[name]
+            column = numpy.asarray(column, dtype=self.dtype) if self.use_numpy else list(column)
+            if rows is None:
+                rows = len(column)
+            elif len(column) != rows:
+                raise ValueError(f"Input column '{name}' has {len(column)} rows, expected {rows}")
+            values[value] = column
+        if rows is None:
+            rows = 1
+
+        if self.use_numpy:
+            self._run_arrays(values, rows)
+        else:
+            self._run_lists(values)
+
+        results = {}
+        for name, value in self.outputs.items():
+            column = values[value]
+            if isinstance(column, int):
+                column = numpy.full(rows, column, dtype=self.dtype) if self.use_numpy else [column] * rows
+            results[name] = column
+        return results
+
+    def _run_arrays(self, values, rows):
+        buffers = [None] * self.buffer_count
+        for op, value, left, right, slot, dead in self.steps:
+            a, b = values[left], values[right]
+            if isinstance(a, int) and isinstance(b, int):
+                values[value] = SCALAR_OPS[op](a, b)
+            else:
+                if op == 'DIV' and (b == 0 if isinstance(b, int) else not b.all()):
+                    raise ZeroDivisionError("integer division or modulo by zero")
+                out = buffers[slot]
+                if out is None:
+                    out = buffers[slot] = numpy.empty(rows, dtype=self.dtype)
+                ARRAY_OPS[op](a, b, out=out)
+                values[value] = out
+            for operand in dead:
+                values[operand] = None
+
+    def _run_lists(self, values):
+        for op, value, left, right, slot, dead in self.steps:
+            a, b = values[left], values[right]
+            a_scalar, b_scalar = isinstance(a, int), isinstance(b, int)
+            if a_scalar and b_scalar:
+                values[value] = SCALAR_OPS[op](a, b)
+            else:
+                values[value] = list(map(SCALAR_OPS[op], repeat(a) if a_scalar else a,
+                                         repeat(b) if b_scalar else b))
+            for operand in dead:
+                values[operand] = None
+
+
+def evaluate(instructions, inputs, rows=None, **options):
+    """Atalho para `VectorEvaluator(instructions, **options).run(inputs, rows)`."""
+    return VectorEvaluator(instructions, **options).run(inputs, rows)
@@ -0,0 +1,63 @@
+import keyword
+from functools import lru_cache
+
+from src.ir.compact import parse_constant
+
+PY_OPERATORS = {'ADD': '+', 'SUB': '-', 'MUL': '*', 'DIV': '//', 'SHL': '<<', 'SHR': '>>'}
+CACHE_SIZE = 256
+
+
+def python_name(name):
+    """Nomes do programa que são palavras reservadas do Python ganham um `_` no fim.
+
+    Nomes que já terminam em `_` também ganham um, para que `if` (`if_`) e
+    `if_` (`if__`) nunca colidam: só nomes escapados terminam em `_`.
+    """
+    if not name.isidentifier():
+        raise ValueError(f"Invalid variable name: {name!r}")
+    return name + '_' if name[-1] == '_' or keyword.iskeyword(name) else name
+
+
+def generate_source(instructions, variables, function_name='program'):
+    """Gera o código de uma função Python equivalente ao TAC.
+
+    As variáveis declaradas são os parâmetros (com valor inicial 0) e a
+    função devolve uma tupla com o valor final de cada uma, na mesma ordem.
+    Temporários viram variáveis locais.
+    """
+    params = [python_name(name) for name in variables]
+    lines = [f"def {python_name(function_name)}({', '.join(f'{param}=0' for param in params)}):"]
+
+    def operand(arg):
+        value = parse_constant(arg)
+        return python_name(arg) if value is None else repr(value)
+
+    for op, arg1, arg2, result in instructions:
+        if op == 'ASSIGN':
+            lines.append(f"    {python_name(result)} = {operand(arg1)}")
+        elif op in PY_OPERATORS:
+            lines.append(f"    {python_name(result)} = {operand(arg1)} {PY_OPERATORS[op]} {operand(arg2)}")
+        else:
+            raise ValueError(f"Unsupported opcode: {op}")
+    lines.append(f"    return ({', '.join(params)}{',' if len(params) == 1 else ''})")
+    return "\n".join(lines) + "\n"
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _compile_function(instructions, variables, function_name):
+    source = generate_source(instructions, variables, function_name)
+    namespace = {}
+    exec(compile(source, f"<tac:{function_name}>", 'exec'), namespace)
+    function = namespace[python_name(function_name)]
+    function.source = source
+    return function
+
+
+def compile_program(instructions, symbol_table, function_name='program'):
+    """Compila o TAC otimizado para uma função Python, com cache pelo hash do programa.
+
+    `symbol_table` é a tabela do `SemanticAnalyzer`; a ordem das suas chaves
+    define a ordem dos parâmetros e dos valores devolvidos. Programas iguais
+    compartilham o mesmo objeto função.
+    """
+    return _compile_function(tuple(instructions), tuple(symbol_table), function_name)
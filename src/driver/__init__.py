@@ -0,0 +1,9 @@
+from .session import CompileSession
+from .pipeline import CompileResult, CompileStatistics, Compiler, StageStatistics, compile_source
+from .cache import CompileCache
+from .streaming import StreamResult, compile_stream
+
+__all__ = [
+    'CompileSession', 'CompileResult', 'CompileStatistics', 'Compiler', 'StageStatistics',
+    'compile_source', 'CompileCache', 'StreamResult', 'compile_stream',
+]
@@ -0,0 +1,184 @@
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from typing import List, Optional
+
+from src.analysis.semantic import SemanticError
+from src.driver.cache import CompileCache
+from src.driver.pipeline import compile_source
+from src.driver.streaming import compile_stream
+from src.ir.binary import write_binary
+from src.ir.printer import format_ir
+
+DEFAULT_CHUNK_BYTES = 256 * 1024
+
+
+@dataclass
+class FileOutcome:
+    path: str
+    output_path: Optional[str] = None
+    statements: int = 0
+    instructions: int = 0
+    error_type: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self):
+        return self.error_type is None
+
+
+@dataclass
+class BatchReport:
+    outcomes: List[FileOutcome] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def failures(self):
+        return [outcome for outcome in self.outcomes if not outcome.ok]
+
+    @property
+    def statements(self):
+        return sum(outcome.statements for outcome in self.outcomes)
+
+    def summary(self):
+        elapsed = self.elapsed or 1e-9
+        return (
+            f"{len(self.outcomes)} files ({len(self.failures)} failed), "
+            f"{self.statements} statements in {self.elapsed:.2f}s: "
+            f"{len(self.outcomes) / elapsed:.1f} files/sec, "
+            f"{self.statements / elapsed:.1f} statements/sec"
+        )
+
+
+def expand_inputs(patterns):
+    """Expande arquivos e globs (incluindo `**`), mantendo a ordem e removendo repetidos."""
+    paths = []
+    seen = set()
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True)) if glob.has_magic(pattern) else [pattern]
+        for path in matches:
+            if path not in seen and not os.path.isdir(path):
+                seen.add(path)
+                paths.append(path)
+    return paths
+
+
+def make_chunks(paths, jobs, chunk_bytes=DEFAULT_CHUNK_BYTES):
+    """Agrupa arquivos em lotes de ~chunk_bytes para que arquivos pequenos não paguem um IPC cada.
+
+    O tamanho do lote é reduzido quando necessário para que cada worker
+    receba ao menos alguns lotes e a carga fique balanceada.
+    """
+    sizes = []
+    for path in paths:
+        try:
+            sizes.append(os.path.getsize(path))
+        except OSError:
+            sizes.append(0)
+    target = max(1, min(chunk_bytes, sum(sizes) // (jobs * 4)))
+
+    chunks = []
+    current = []
+    current_bytes = 0
+    for path, size in zip(paths, sizes):
+        current.append(path)
+        current_bytes += size
+        if current_bytes >= target:
+            chunks.append(current)
+            current = []
+            current_bytes = 0
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def output_path_for(path, output_dir, suffix='.tac'):
+    if output_dir is None:
+        return path + suffix
+    # Espelha o caminho da entrada dentro de output_dir, sem sair dele.
+    relative = os.path.normpath(os.path.splitdrive(path)[1]).lstrip(os.sep)
+    parts = [part for part in relative.split(os.sep) if part != os.pardir]
+    return os.path.join(output_dir, *parts) + suffix
+
+
+def compile_file(path, output_dir=None, cache=None, binary=False, optimizer=None, fused=False, dag=False,
+                 sethi_ullman=False, stream=False):
+    outcome = FileOutcome(path)
+    try:
+        if stream:
+            # O modo streaming grava a saída enquanto compila e não usa o cache.
+            output_path = output_path_for(path, output_dir, '.tacb' if binary else '.tac')
+            os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+            streamed = compile_stream(path, output_path, optimizer, binary, dag=dag)
+            outcome.output_path = output_path
+            outcome.statements = streamed.statement_count
+            outcome.instructions = streamed.optimized_instructions
+            return outcome
+        with open(path, encoding='utf-8') as f:
+            source = f.read()
+        result = compile_source(source, optimizer, cache, fused, dag, sethi_ullman)
+        # A gravação também fica no try: um diretório de saída sem permissão
+        # vira o erro deste arquivo, não do lote inteiro.
+        output_path = output_path_for(path, output_dir, '.tacb' if binary else '.tac')
+        os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+        if binary:
+            write_binary(output_path, result.optimized_ir)
+        else:
+            with open(output_path, 'w', encoding='utf-8') as f:
+                text = format_ir(result.optimized_ir)
+                f.write(text + '\n' if text else '')
+    except SemanticError as e:
+        outcome.error_type, outcome.error = 'SemanticError', str(e)
+        return outcome
+    except SyntaxError as e:
+        outcome.error_type, outcome.error = 'SyntaxError', str(e)
+        return outcome
+    except (RuntimeError, ZeroDivisionError, OSError, UnicodeDecodeError) as e:
+        outcome.error_type, outcome.error = type(e).__name__, str(e)
+        return outcome
+
+    outcome.output_path = output_path
+    outcome.statements = result.statement_count
+    outcome.instructions = len(result.optimized_ir)
+    return outcome
+
+
+_worker_caches = {}
+
+
+def _compile_chunk(paths, output_dir, cache_dir, binary=False, optimizer=None, fused=False, dag=False,
+                   sethi_ullman=False, stream=False):
+    cache = None
+    if cache_dir:
+        cache = _worker_caches.get(cache_dir)
+        if cache is None:
+            cache = _worker_caches[cache_dir] = CompileCache(cache_dir)
+    return [compile_file(path, output_dir, cache, binary, optimizer, fused, dag, sethi_ullman, stream)
+            for path in paths]
+
+
+def run_batch(paths, jobs=None, output_dir=None, cache_dir=None, chunk_bytes=DEFAULT_CHUNK_BYTES,
+              binary=False, optimizer=None, fused=False, dag=False, sethi_ullman=False, stream=False):
+    """Compila `paths` em paralelo num pool de processos; falhas não interrompem o lote."""
+    jobs = jobs or os.cpu_count() or 1
+    start = time.perf_counter()
+    chunks = make_chunks(paths, jobs, chunk_bytes)
+
+    report = BatchReport()
+    if jobs == 1 or len(chunks) <= 1:
+        for chunk in chunks:
+            report.outcomes.extend(_compile_chunk(chunk, output_dir, cache_dir, binary, optimizer, fused, dag,
+                                                  sethi_ullman, stream))
+    else:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(chunks))) as pool:
+            worker = partial(_compile_chunk, output_dir=output_dir, cache_dir=cache_dir, binary=binary,
+                             optimizer=optimizer, fused=fused, dag=dag, sethi_ullman=sethi_ullman,
+                             stream=stream)
+            for outcomes in pool.map(worker, chunks):
+                report.outcomes.extend(outcomes)
+
+    report.elapsed = time.perf_counter() - start
+    return report
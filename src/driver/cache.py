@@ -0,0 +1,149 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from pathlib import Path
+
+from src.driver.pipeline import CompileResult
+from src.optimization.optimizer import OUTPUT_OPTIONS
+
+CACHE_FORMAT = 2
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+_compiler_fingerprint = None
+
+
+def compiler_fingerprint():
+    """Hash do código do próprio compilador; muda sempre que algum módulo de `src/` muda."""
+    global _compiler_fingerprint
+    if _compiler_fingerprint is None:
+        digest = hashlib.sha256()
+        root = Path(__file__).resolve().parent.parent
+        for path in sorted(root.rglob('*.py')):
+            digest.update(str(path.relative_to(root)).encode())
+            digest.update(path.read_bytes())
+        _compiler_fingerprint = digest.hexdigest()
+    return _compiler_fingerprint
+
+
+def optimizer_config(optimizer):
+    # Só as opções que mudam o resultado: trocar `--optimize-jobs` não invalida o cache.
+    options = {name: getattr(optimizer, name, None) for name in OUTPUT_OPTIONS}
+    return {'class': type(optimizer).__qualname__, 'options': options}
+
+
+class CompileCache:
+    """Cache em disco endereçado por conteúdo, com despejo LRU limitado por tamanho.
+
+    A chave é o SHA-256 do código fonte, do código do compilador e da
+    configuração do otimizador. Cada entrada é um arquivo JSON com a tabela de
+    símbolos, o TAC original e o TAC otimizado; o mtime do arquivo registra o
+    último acesso, então a ordem LRU sobrevive entre processos.
+    """
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._load_index()
+
+    @staticmethod
+    def accepts(optimizer):
+        """Com `time_budget` o resultado depende do relógio e não entra no cache; `max_iterations` entra."""
+        return getattr(optimizer, 'time_budget', None) is None
+
+    def key(self, source, optimizer, dag=False, sethi_ullman=False):
+        payload = json.dumps(
+            [CACHE_FORMAT, compiler_fingerprint(), optimizer_config(optimizer),
+             {'dag': dag, 'sethi_ullman': sethi_ullman}],
+            sort_keys=True, default=repr,
+        )
+        digest = hashlib.sha256(payload.encode())
+        digest.update(source.encode())
+        return digest.hexdigest()
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+            os.utime(path)
+        except FileNotFoundError:
+            self._forget(path)
+            self.misses += 1
+            return None
+        except ValueError:
+            self._remove(path)
+            self.misses += 1
+            return None
+
+        if path in self._entries:
+            self._entries.move_to_end(path)
+        self.hits += 1
+        return CompileResult(
+            data['symbol_table'],
+            [tuple(instr) for instr in data['original_ir']],
+            [tuple(instr) for instr in data['optimized_ir']],
+            data['statement_count'],
+        )
+
+    def put(self, key, result):
+        data = json.dumps({
+            'symbol_table': result.symbol_table,
+            'original_ir': result.original_ir,
+            'optimized_ir': result.optimized_ir,
+            'statement_count': result.statement_count,
+        }, separators=(',', ':')).encode('utf-8')
+        if len(data) > self.max_bytes:
+            return
+
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        temp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+        temp_path.write_bytes(data)
+        os.replace(temp_path, path)
+
+        self._forget(path)
+        self._entries[path] = len(data)
+        self._total_bytes += len(data)
+        self._evict()
+
+    def clear(self):
+        for path in list(self._entries):
+            self._remove(path)
+
+    def _path(self, key):
+        return self.directory / key[:2] / f'{key}.json'
+
+    def _load_index(self):
+        found = []
+        for path in self.directory.glob('??/*.json'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            found.append((stat.st_mtime, path, stat.st_size))
+        for _, path, size in sorted(found):
+            self._entries[path] = size
+            self._total_bytes += size
+
+    def _evict(self):
+        while self._total_bytes > self.max_bytes and self._entries:
+            path = next(iter(self._entries))
+            self._remove(path)
+
+    def _remove(self, path):
+        self._forget(path)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _forget(self, path):
+        size = self._entries.pop(path, None)
+        if size is not None:
+            self._total_bytes -= size
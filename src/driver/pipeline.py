@@ -0,0 +1,265 @@
+import json
+import os
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from src.frontend.ast_nodes import Assignment, BinaryOp, Program
+from src.frontend.compact_ast import CompactAST
+from src.frontend.lexer import Lexer
+from src.frontend.parser import Parser
+from src.frontend.translator import Translator
+from src.analysis.semantic import SemanticAnalyzer
+from src.ir.ir_generator import IRGenerator
+from src.optimization.optimizer import OptimizationStats, Optimizer
+
+Instruction = Tuple[str, Optional[str], Optional[str], str]
+
+STAGES = ('tokenize', 'parse', 'analyze', 'generate', 'optimize')
+FUSED_STAGES = ('tokenize', 'translate', 'optimize')
+
+
+@dataclass
+class StageStatistics:
+    """Um estágio do pipeline: início relativo à compilação, duração e alocações.
+
+    `allocated_blocks` é a variação de `sys.getallocatedblocks()` durante o
+    estágio (blocos alocados e ainda vivos no fim); `peak_bytes` só é medido
+    com `trace_memory`.
+    """
+    name: str
+    start: float
+    seconds: float
+    allocated_blocks: int
+    peak_bytes: Optional[int] = None
+
+
+@dataclass
+class CompileStatistics:
+    stages: List[StageStatistics] = field(default_factory=list)
+    tokens: int = 0
+    ast_nodes: int = 0
+    instructions: int = 0
+    optimized_instructions: int = 0
+    optimizer: OptimizationStats = field(default_factory=OptimizationStats)
+    seconds: float = 0.0
+
+    def to_dict(self):
+        return asdict(self)
+
+    def to_json(self, indent=2):
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def trace_events(self):
+        """Eventos completos (`ph: X`) no formato de trace do Chrome, com os passes dentro de `optimize`."""
+        pid = os.getpid()
+        counters = {
+            'tokenize': {'tokens': self.tokens},
+            'parse': {'ast_nodes': self.ast_nodes},
+            'generate': {'instructions': self.instructions},
+            'translate': {'instructions': self.instructions},
+            'optimize': {'instructions': self.optimized_instructions,
+                         'iterations': self.optimizer.iterations},
+        }
+        events = [{
+            'name': 'compile', 'cat': 'compile', 'ph': 'X', 'pid': pid, 'tid': 0,
+            'ts': 0.0, 'dur': self.seconds * 1e6,
+        }]
+        for stage in self.stages:
+            args = {'allocated_blocks': stage.allocated_blocks, **counters.get(stage.name, {})}
+            if stage.peak_bytes is not None:
+                args['peak_bytes'] = stage.peak_bytes
+            events.append({
+                'name': stage.name, 'cat': 'stage', 'ph': 'X', 'pid': pid, 'tid': 0,
+                'ts': stage.start * 1e6, 'dur': stage.seconds * 1e6, 'args': args,
+            })
+        for run in self.optimizer.passes:
+            events.append({
+                'name': run.name, 'cat': 'pass', 'ph': 'X', 'pid': pid, 'tid': 0,
+                'ts': run.start * 1e6, 'dur': run.seconds * 1e6,
+                'args': {'iteration': run.iteration, 'removed': run.removed, 'changed': run.changed},
+            })
+        return events
+
+    def write_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.to_json() + '\n')
+
+    def write_chrome_trace(self, path):
+        """Grava um arquivo que abre em chrome://tracing ou no Perfetto."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': self.trace_events(), 'displayTimeUnit': 'ms'}, f)
+
+    def summary(self):
+        lines = [f"{stage.name:<10} {stage.seconds * 1e3:10.3f} ms {stage.allocated_blocks:>10} blocks"
+                 for stage in self.stages]
+        lines.append(f"{self.tokens} tokens, {self.ast_nodes} AST nodes, "
+                     f"{self.instructions} -> {self.optimized_instructions} instructions, "
+                     f"{self.optimizer.iterations} optimizer iterations"
+                     + (", budget exhausted" if self.optimizer.budget_exhausted else ""))
+        lines.extend(f"  {run.name:<22} {run.seconds * 1e3:10.3f} ms {run.removed:>8} removed"
+                     for run in self.optimizer.passes)
+        return "\n".join(lines)
+
+
+@dataclass
+class CompileResult:
+    symbol_table: Dict[str, str]
+    original_ir: List[Instruction]
+    optimized_ir: List[Instruction]
+    statement_count: int = 0
+    stats: Optional[CompileStatistics] = None
+
+
+def count_ast_nodes(ast):
+    if isinstance(ast, CompactAST):
+        # A arena não tem nó para o Program; ele entra na conta como na AST de objetos.
+        return len(ast) + 1
+    count = 0
+    stack = [ast]
+    while stack:
+        node = stack.pop()
+        count += 1
+        if isinstance(node, Program):
+            stack.extend(node.statements)
+        elif isinstance(node, Assignment):
+            stack.append(node.expression)
+        elif isinstance(node, BinaryOp):
+            stack.append(node.left)
+            stack.append(node.right)
+    return count
+
+
+class Compiler:
+    """Pipeline de compilação com instrumentação opcional.
+
+    Sem instrumentação, `compile()` encadeia os estágios diretamente, sem
+    nenhuma medição. Com `instrument=True`, algum hook ou `trace_memory=True`,
+    o resultado traz `stats` (`CompileStatistics`) com tempo e alocações de
+    cada estágio, as contagens de tokens, nós da AST e instruções, e as
+    estatísticas de cada passe do otimizador. Cada hook é chamado com o
+    `StageStatistics` de um estágio assim que ele termina. `trace_memory`
+    liga o `tracemalloc` durante cada estágio para medir o pico de memória,
+    o que deixa a compilação várias vezes mais lenta.
+
+    Com `fused=True`, parser, análise semântica e geração de TAC rodam numa
+    passada só (`Translator`), sem AST; o resultado é o mesmo. Com `dag=True`,
+    o TAC original já sai com as subexpressões repetidas compartilhadas, e
+    com `sethi_ullman=True` ele é gerado na ordem de Sethi–Ullman, com
+    temporários reaproveitados (ver `IRGenerator`). A ordem de Sethi–Ullman
+    precisa da árvore inteira de cada expressão, então não combina com
+    `fused`.
+    """
+
+    def __init__(self, optimizer=None, instrument=False, hooks=(), trace_memory=False, fused=False,
+                 dag=False, sethi_ullman=False):
+        if fused and sethi_ullman:
+            raise ValueError("the fused frontend does not support sethi_ullman ordering")
+        if dag and sethi_ullman:
+            raise ValueError("dag and sethi_ullman modes cannot be combined")
+        self.optimizer = optimizer or Optimizer()
+        self.fused = fused
+        self.dag = dag
+        self.sethi_ullman = sethi_ullman
+        self.hooks = list(hooks)
+        self.trace_memory = trace_memory
+        self.instrument = instrument or bool(self.hooks) or trace_memory
+
+    def compile(self, source) -> CompileResult:
+        if self.instrument:
+            return self._compile_instrumented(source)
+        if self.fused:
+            translator = Translator(Lexer(source).tokenize_compact(), dag=self.dag)
+            original_ir = translator.translate()
+            return CompileResult(
+                translator.symbol_table, original_ir,
+                self.optimizer.optimize(original_ir, live_out=translator.symbol_table),
+                translator.statement_count,
+            )
+        ast = Parser(Lexer(source).tokenize_compact()).parse_compact()
+
+        semantic = SemanticAnalyzer()
+        semantic.analyze(ast)
+
+        ir_gen = IRGenerator(dag=self.dag, sethi_ullman=self.sethi_ullman)
+        ir_gen.generate(ast)
+        original_ir = ir_gen.get_code()
+
+        return CompileResult(
+            semantic.symbol_table, original_ir,
+            self.optimizer.optimize(original_ir, live_out=semantic.symbol_table), len(ast.statements),
+        )
+
+    def _compile_instrumented(self, source):
+        stats = CompileStatistics()
+        origin = time.perf_counter()
+
+        def stage(name, func, *args):
+            if self.trace_memory:
+                tracemalloc.start()
+            blocks = sys.getallocatedblocks()
+            start = time.perf_counter()
+            try:
+                return func(*args)
+            finally:
+                end = time.perf_counter()
+                record = StageStatistics(name, start - origin, end - start, sys.getallocatedblocks() - blocks)
+                if self.trace_memory:
+                    record.peak_bytes = tracemalloc.get_traced_memory()[1]
+                    tracemalloc.stop()
+                stats.stages.append(record)
+                for hook in self.hooks:
+                    hook(record)
+
+        def generate(ast):
+            ir_gen = IRGenerator(dag=self.dag, sethi_ullman=self.sethi_ullman)
+            ir_gen.generate(ast)
+            return ir_gen.get_code()
+
+        tokens = stage('tokenize', Lexer(source).tokenize_compact)
+        if self.fused:
+            translator = Translator(tokens, dag=self.dag)
+            original_ir = stage('translate', translator.translate)
+            symbol_table, statement_count = translator.symbol_table, translator.statement_count
+        else:
+            semantic = SemanticAnalyzer()
+            ast = stage('parse', Parser(tokens).parse_compact)
+            stage('analyze', semantic.analyze, ast)
+            original_ir = stage('generate', generate, ast)
+            symbol_table, statement_count = semantic.symbol_table, len(ast.statements)
+            stats.ast_nodes = count_ast_nodes(ast)
+        optimized_ir = stage('optimize', self.optimizer.optimize, original_ir, symbol_table, stats.optimizer)
+
+        stats.seconds = time.perf_counter() - origin
+        stats.tokens = len(tokens)
+        stats.instructions = len(original_ir)
+        stats.optimized_instructions = len(optimized_ir)
+        for run in stats.optimizer.passes:
+            run.start -= origin
+        return CompileResult(symbol_table, original_ir, optimized_ir, statement_count, stats)
+
+
+def compile_source(source, optimizer=None, cache=None, fused=False, dag=False,
+                   sethi_ullman=False) -> CompileResult:
+    """Executa o pipeline completo; com `cache`, reaproveita resultados de fontes já compiladas.
+
+    `fused` usa o frontend de passada única; como o resultado é o mesmo, as
+    entradas do cache servem aos dois modos. `dag` e `sethi_ullman` mudam o
+    TAC original e por isso fazem parte da chave do cache. Otimizadores com
+    `time_budget` não usam o cache (veja `CompileCache.accepts()`).
+    """
+    optimizer = optimizer or Optimizer()
+    if cache is not None and not cache.accepts(optimizer):
+        cache = None
+    if cache is not None:
+        key = cache.key(source, optimizer, dag, sethi_ullman)
+        result = cache.get(key)
+        if result is not None:
+            return result
+
+    result = Compiler(optimizer, fused=fused, dag=dag, sethi_ullman=sethi_ullman).compile(source)
+    if cache is not None:
+        cache.put(key, result)
+    return result
@@ -0,0 +1,208 @@
+from bisect import bisect_left
+
+from src.frontend.lexer import Lexer
+from src.frontend.parser import Parser
+from src.frontend.ast_nodes import Program
+from src.frontend.compact_ast import NK_BINARY, NK_DECLARATION, TYPES
+from src.analysis.semantic import SemanticAnalyzer
+from src.ir.ir_generator import IRGenerator
+
+
+class _Statement:
+    """Resultado cacheado de um statement: AST compacta, declaração e fragmento TAC."""
+
+    __slots__ = ('ast', 'declares', 'var_type', 'fragment', 'temp_count')
+
+    def __init__(self, ast):
+        self.ast = ast
+        root = ast.statements[0]
+        if ast.kinds[root] == NK_DECLARATION:
+            self.declares, self.var_type = ast.names[ast.payload[root]], TYPES[ast.left[root]]
+        else:
+            self.declares = self.var_type = None
+
+        generator = IRGenerator()
+        generator.generate_compact(ast)
+        self.fragment = self._renumber(ast, generator.get_code())
+        self.temp_count = generator.temp_counter - 1
+
+    @staticmethod
+    def _renumber(ast, code):
+        # Temporários viram inteiros a partir de 0 para serem reposicionados
+        # em `place()`. Pelo texto não dá para separar `t1` gerado de uma
+        # variável `t1` do usuário, então a AST diz quais operandos vêm de
+        # nós binários: o j-ésimo nó binário emitiu a j-ésima instrução.
+        kinds, lefts, rights = ast.kinds, ast.left, ast.right
+        binaries = [handle for handle, kind in enumerate(kinds) if kind == NK_BINARY]
+        binaries.append(ast.statements[0])
+        fragment = []
+        for number, (op, arg1, arg2, result) in enumerate(code):
+            handle = binaries[number]
+            if kinds[lefts[handle]] == NK_BINARY:
+                arg1 = int(arg1[1:]) - 1
+            if op != 'ASSIGN':
+                if kinds[rights[handle]] == NK_BINARY:
+                    arg2 = int(arg2[1:]) - 1
+                result = number
+            fragment.append((op, arg1, arg2, result))
+        return fragment
+
+    def place(self, base):
+        def operand(value):
+            return f"t{base + value}" if isinstance(value, int) else value
+        return [(op, operand(arg1), operand(arg2), operand(result))
+                for op, arg1, arg2, result in self.fragment]
+
+
+class CompileSession:
+    """Sessão de compilação incremental.
+
+    Cada statement é identificado pelo seu texto (a impressão digital) e tem a
+    AST, as dependências de símbolos e o fragmento TAC reaproveitados entre
+    chamadas de `compile()`. Só statements novos ou alterados passam pelo
+    lexer, parser e gerador de IR e pelo `SemanticAnalyzer`; os do fim, que
+    não mudaram, só são reanalisados se as declarações antes deles mudaram.
+    Os fragmentos são renumerados quando a posição dos temporários muda.
+    """
+
+    def __init__(self):
+        self.symbol_table = {}
+        self.instructions = []
+        self.stats = {'statements': 0, 'compiled': 0, 'reused': 0, 'analyzed': 0}
+        self._statements = {}
+        self._texts = []
+        self._bases = []
+        self._fragments = []
+        # (posição, nome, tipo) de cada declaração da última compilação.
+        self._declarations = []
+
+    def compile(self, source):
+        texts = list(self._split(source))
+        entries = []
+        compiled = 0
+        for text in texts:
+            entry = self._statements.get(text)
+            if entry is None:
+                entry = self._statements[text] = self._compile_statement(text, source)
+                compiled += 1
+            entries.append(entry)
+
+        prefix, suffix = self._unchanged(texts)
+        self.symbol_table, analyzed = self._check(entries, prefix, suffix)
+        self._place(texts, entries, prefix, suffix)
+
+        instructions = []
+        for fragment in self._fragments:
+            instructions.extend(fragment)
+
+        self._statements = dict(zip(texts, entries))
+        self.instructions = instructions
+        self.stats = {
+            'statements': len(texts),
+            'compiled': compiled,
+            'reused': len(texts) - compiled,
+            'analyzed': analyzed,
+        }
+        return instructions
+
+    @property
+    def program(self):
+        """`Program` de `ast_nodes` da última compilação, montado sob demanda e sem recursão."""
+        return Program([self._statements[text].ast.to_program().statements[0] for text in self._texts])
+
+    def _unchanged(self, texts):
+        # Quantos statements no início e no fim são iguais aos da última compilação.
+        old_texts = self._texts
+        n, m = len(texts), len(old_texts)
+        limit = min(n, m)
+        prefix = 0
+        while prefix < limit and texts[prefix] == old_texts[prefix]:
+            prefix += 1
+        suffix = 0
+        while suffix < limit - prefix and texts[n - 1 - suffix] == old_texts[m - 1 - suffix]:
+            suffix += 1
+        return prefix, suffix
+
+    def _check(self, entries, prefix, suffix):
+        # A última compilação passou pela análise, então o início igual continua
+        # válido e as suas declarações vêm da lista guardada. O trecho alterado
+        # é analisado; o fim igual só é analisado de novo se o trecho alterado
+        # declara outros nomes ou tipos, porque só isso muda o que ele enxerga.
+        old = self._declarations
+        n, m = len(entries), len(self._texts)
+        positions = [position for position, _, _ in old]
+        kept = bisect_left(positions, prefix)
+        removed = bisect_left(positions, m - suffix)
+        analyzer = SemanticAnalyzer()
+        analyzer.symbol_table = {name: var_type for _, name, var_type in old[:kept]}
+        declarations = old[:kept]
+        analyzed = n - suffix - prefix
+        for position in range(prefix, n - suffix):
+            entry = entries[position]
+            analyzer.analyze_compact(entry.ast)
+            if entry.declares is not None:
+                declarations.append((position, entry.declares, entry.var_type))
+
+        shift = n - m
+        if ({(name, var_type) for _, name, var_type in declarations[kept:]}
+                == {(name, var_type) for _, name, var_type in old[kept:removed]}):
+            for position, name, var_type in old[removed:]:
+                analyzer.symbol_table[name] = var_type
+                declarations.append((position + shift, name, var_type))
+        else:
+            analyzed += suffix
+            for position in range(n - suffix, n):
+                entry = entries[position]
+                analyzer.analyze_compact(entry.ast)
+                if entry.declares is not None:
+                    declarations.append((position, entry.declares, entry.var_type))
+        self._declarations = declarations
+        return analyzer.symbol_table, analyzed
+
+    def _place(self, texts, entries, prefix, suffix):
+        # Statements iguais no início e no fim em relação à compilação anterior
+        # mantêm seus fragmentos; os do fim só são renumerados se a quantidade
+        # de temporários antes deles mudou.
+        old_bases, old_fragments = self._bases, self._fragments
+        n, m = len(texts), len(self._texts)
+
+        bases = old_bases[:prefix]
+        fragments = old_fragments[:prefix]
+        base = bases[-1] + entries[prefix - 1].temp_count if prefix else 1
+        for index in range(prefix, n - suffix):
+            bases.append(base)
+            fragments.append(entries[index].place(base))
+            base += entries[index].temp_count
+
+        if suffix and old_bases[m - suffix] == base:
+            bases.extend(old_bases[m - suffix:])
+            fragments.extend(old_fragments[m - suffix:])
+        else:
+            for index in range(n - suffix, n):
+                bases.append(base)
+                fragments.append(entries[index].place(base))
+                base += entries[index].temp_count
+
+        self._texts, self._bases, self._fragments = texts, bases, fragments
+
+    def get_code(self):
+        return self.instructions
+
+    @staticmethod
+    def _split(source):
+        pieces = source.split(';')
+        for piece in pieces[:-1]:
+            yield piece.strip() + ';'
+        if pieces[-1].strip():
+            yield pieces[-1].strip()
+
+    @staticmethod
+    def _compile_statement(text, source):
+        try:
+            ast = Parser(Lexer(text).tokenize_compact()).parse_compact()
+        except (RuntimeError, SyntaxError):
+            # Reanalisa o programa inteiro para reportar o primeiro erro com
+            # a posição correta no código fonte completo.
+            Parser(Lexer(source).tokenize_compact()).parse()
+            raise
+        return _Statement(ast)
@@ -0,0 +1,121 @@
+import mmap
+import os
+from dataclasses import dataclass
+from typing import Dict
+
+from src.frontend.lexer import TK_EOF, MappedTokens
+from src.frontend.translator import Translator
+from src.ir.binary import BinaryWriter
+from src.ir.printer import format_ir
+from src.optimization.optimizer import Optimizer
+
+DEFAULT_WINDOW = 4096
+# madvise() existe a partir do Python 3.8 e só em alguns sistemas.
+_DONTNEED = getattr(mmap, 'MADV_DONTNEED', None)
+
+
+@dataclass
+class StreamResult:
+    symbol_table: Dict[str, str]
+    output_path: str
+    statement_count: int = 0
+    instructions: int = 0
+    optimized_instructions: int = 0
+    windows: int = 0
+
+
+class _TextSink:
+    """Mesmo texto que `format_ir()` sobre o programa inteiro, gravado janela a janela."""
+
+    def __init__(self, path):
+        self.file = open(path, 'w', encoding='utf-8')
+
+    def write(self, instructions):
+        text = format_ir(instructions)
+        if text:
+            self.file.write(text + '\n')
+
+    def close(self):
+        self.file.close()
+
+    def discard(self):
+        self.file.close()
+
+
+def compile_stream(path, output_path, optimizer=None, binary=False, window=DEFAULT_WINDOW,
+                   dag=False) -> StreamResult:
+    """Compila um arquivo de qualquer tamanho com memória limitada, gravando a saída aos poucos.
+
+    O arquivo é mapeado com `mmap` e lexado direto dos bytes
+    (`MappedTokens`); o `Translator` analisa e traduz um statement por vez, e
+    a cada `window` instruções o TAC acumulado é otimizado sozinho, com todas
+    as variáveis declaradas vivas na saída, gravado (texto ou `BinaryWriter`)
+    e descartado. Os temporários recomeçam em `t1` a cada janela. Só a tabela
+    de símbolos (e, no formato binário, o pool de constantes distintas)
+    cresce com o programa. A otimização não atravessa janelas, então o TAC
+    pode ficar maior que o de `compile_source()`, mas é equivalente.
+
+    A saída é gravada em `output_path + '.partial'` e só substitui
+    `output_path` no fim; com erro, nada é deixado para trás. Como no
+    `Translator`, o primeiro erro semântico só é levantado depois do parse.
+    """
+    optimizer = optimizer or Optimizer()
+    result = StreamResult({}, output_path)
+    partial = output_path + '.partial'
+    with open(path, 'rb') as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Arquivos vazios não podem ser mapeados.
+            data = b''
+    # O mapeamento é fechado em qualquer saída: batch e servidor chamam isto
+    # muitas vezes no mesmo processo. Antes, o fluxo de tokens é encerrado,
+    # porque o `finditer` sobre o mmap segura o buffer enquanto existir (e um
+    # traceback guardado o manteria vivo).
+    translator = None
+    try:
+        sink = BinaryWriter(partial) if binary else _TextSink(partial)
+        try:
+            translator = Translator(MappedTokens(data), dag=dag)
+
+            def release_pages():
+                # Páginas já lexadas contam no RSS enquanto estiverem mapeadas;
+                # devolvê-las ao kernel mantém o pico constante. Elas são relidas
+                # do arquivo se uma mensagem de erro precisar da posição.
+                if translator.current is not None and isinstance(data, mmap.mmap) and _DONTNEED is not None:
+                    consumed = translator.current[2] - translator.current[2] % mmap.PAGESIZE
+                    if consumed:
+                        data.madvise(_DONTNEED, 0, consumed)
+            result.symbol_table = translator.symbol_table
+
+            def flush():
+                release_pages()
+                instructions = translator.take_instructions()
+                if not instructions:
+                    return
+                optimized = optimizer.optimize(instructions, live_out=translator.symbol_table)
+                sink.write(optimized)
+                result.instructions += len(instructions)
+                result.optimized_instructions += len(optimized)
+                result.windows += 1
+
+            while translator.kind != TK_EOF:
+                translator.translate_statement()
+                if len(translator.instructions) >= window:
+                    flush()
+            flush()
+            translator.raise_pending_error()
+            result.statement_count = translator.statement_count
+            sink.close()
+        except BaseException:
+            sink.discard()
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+        os.replace(partial, output_path)
+    finally:
+        if translator is not None:
+            translator.close_stream()
+        if isinstance(data, mmap.mmap):
+            data.close()
+    return result
@@ -1,5 +1,6 @@
-from .lexer import Lexer
+from .lexer import Lexer, MappedTokens, Token, TokenBuffer
 from .parser import Parser
+from .compact_ast import CompactAST
 from .ast_nodes import (
     Node,
     Program,
@@ -12,7 +13,11 @@ from .ast_nodes import (
 
 __all__ = [
     'Lexer',
+    'Token',
+    'TokenBuffer',
+    'MappedTokens',
     'Parser',
+    'CompactAST',
     'Node',
     'Program',
     'Declaration',
@@ -0,0 +1,111 @@
+from array import array
+from typing import Dict, List
+
+from .ast_nodes import Program, Declaration, Assignment, BinaryOp, Number, Variable
+
+NODE_KINDS = ('Declaration', 'Assignment', 'BinaryOp', 'Number', 'Variable')
+NK_DECLARATION, NK_ASSIGNMENT, NK_BINARY, NK_NUMBER, NK_VARIABLE = range(len(NODE_KINDS))
+OPERATORS = ('+', '-', '*', '/')
+OPERATOR_IDS = {op: index for index, op in enumerate(OPERATORS)}
+TYPES = ('int',)
+NO_NODE = -1
+
+
+class CompactAST:
+    """AST em arena: arrays paralelos de nós endereçados por handles inteiros.
+
+    Cada nó ocupa uma posição em `kinds`, `left`, `right` e `payload`:
+
+    - `Declaration`: `left` é o índice do tipo em `TYPES`, `payload` o nome;
+    - `Assignment`: `left` é a expressão, `payload` o nome do destino;
+    - `BinaryOp`: `left` e `right` são os operandos, `payload` o índice do
+      operador em `OPERATORS`;
+    - `Number` e `Variable`: `payload` indexa `numbers` ou `names`.
+
+    Os nós são criados em pós-ordem e cada statement ocupa um trecho
+    contínuo que termina na sua raiz (`statements` guarda as raízes). Os
+    filhos vêm sempre antes do pai, então `SemanticAnalyzer` e `IRGenerator`
+    percorrem a arena com laços simples, sem recursão. `from_program()` e
+    `to_program()` convertem de e para as classes de `ast_nodes`.
+    """
+
+    def __init__(self):
+        self.kinds = array('B')
+        self.left = array('q')
+        self.right = array('q')
+        self.payload = array('q')
+        self.statements = array('q')
+        self.names: List[str] = []
+        self.name_ids: Dict[str, int] = {}
+        self.numbers: List[int] = []
+        self.number_ids: Dict[int, int] = {}
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def add(self, kind, left, right, payload):
+        self.kinds.append(kind)
+        self.left.append(left)
+        self.right.append(right)
+        self.payload.append(payload)
+        return len(self.kinds) - 1
+
+    def name_id(self, name):
+        symbol = self.name_ids.get(name)
+        if symbol is None:
+            symbol = self.name_ids[name] = len(self.names)
+            self.names.append(name)
+        return symbol
+
+    def number_id(self, value):
+        symbol = self.number_ids.get(value)
+        if symbol is None:
+            symbol = self.number_ids[value] = len(self.numbers)
+            self.numbers.append(value)
+        return symbol
+
+    @classmethod
+    def from_program(cls, program):
+        """Converte um `Program` de `ast_nodes`, sem recursão."""
+        ast = cls()
+        add, name_id = ast.add, ast.name_id
+        for statement in program.statements:
+            if isinstance(statement, Declaration):
+                ast.statements.append(add(NK_DECLARATION, TYPES.index(statement.var_type), NO_NODE,
+                                          name_id(statement.name)))
+                continue
+            handles = []
+            stack = [(statement.expression, False)]
+            while stack:
+                node, expanded = stack.pop()
+                if isinstance(node, BinaryOp):
+                    if not expanded:
+                        stack.append((node, True))
+                        stack.append((node.right, False))
+                        stack.append((node.left, False))
+                        continue
+                    right = handles.pop()
+                    handles[-1] = add(NK_BINARY, handles[-1], right, OPERATOR_IDS[node.op])
+                elif isinstance(node, Number):
+                    handles.append(add(NK_NUMBER, NO_NODE, NO_NODE, ast.number_id(node.value)))
+                else:
+                    handles.append(add(NK_VARIABLE, NO_NODE, NO_NODE, name_id(node.name)))
+            ast.statements.append(add(NK_ASSIGNMENT, handles[0], NO_NODE, name_id(statement.name)))
+        return ast
+
+    def to_program(self):
+        """Adaptador para código que espera as classes de `ast_nodes`; também sem recursão."""
+        names, numbers = self.names, self.numbers
+        nodes = []
+        for kind, left, right, payload in zip(self.kinds, self.left, self.right, self.payload):
+            if kind == NK_BINARY:
+                nodes.append(BinaryOp(nodes[left], OPERATORS[payload], nodes[right]))
+            elif kind == NK_VARIABLE:
+                nodes.append(Variable(names[payload]))
+            elif kind == NK_NUMBER:
+                nodes.append(Number(numbers[payload]))
+            elif kind == NK_ASSIGNMENT:
+                nodes.append(Assignment(names[payload], nodes[left]))
+            else:
+                nodes.append(Declaration(TYPES[left], names[payload]))
+        return Program([nodes[root] for root in self.statements])
@@ -1,5 +1,143 @@
 import re
-from typing import List, Tuple
+from array import array
+from typing import Dict, Iterator, List, NamedTuple, Tuple
+
+TOKEN_SPECS = [
+    ('INT', r'\bint\b'),
+    ('NUMBER', r'\d+'),
+    ('ID', r'[a-zA-Z_][a-zA-Z0-9_]*'),
+    ('EQUALS', r'='),
+    ('PLUS', r'\+'),
+    ('MINUS', r'-'),
+    ('STAR', r'\*'),
+    ('SLASH', r'/'),
+    ('LPAREN', r'\('),
+    ('RPAREN', r'\)'),
+    ('SEMI', r';'),
+    ('WS', r'\s+'),
+    ('MISMATCH', r'.'),
+]
+
+TOKEN_REGEX = re.compile('|'.join('(?P<%s>%s)' % pair for pair in TOKEN_SPECS))
+# Variante que consome o espaço em branco antes de cada token, evitando um
+# match separado para WS; o grupo i corresponde ao tipo i - 2. O grupo 1 é o
+# espaço, consumido de forma atômica por `(?=(\s*))\1` (sem `\s*+` antes do
+# Python 3.11), e `\Z` faz o espaço final casar sozinho, com `lastindex` 1:
+# sem ele cada posição de um rabo em branco seria tentada de novo, em tempo
+# quadrático.
+SKIPPING_REGEX = re.compile(
+    r'(?=(\s*))\1(?:' + '|'.join(
+        '(?P<%s>%s)' % (name, r'\S' if name == 'MISMATCH' else pattern)
+        for name, pattern in TOKEN_SPECS if name != 'WS'
+    ) + r'|\Z)'
+)
+SKIP_GROUPS = 2
+
+# Mesma variante sobre bytes, para ler direto de um `mmap` sem decodificar o arquivo.
+BYTES_SKIPPING_REGEX = re.compile(SKIPPING_REGEX.pattern.encode('ascii'))
+
+KIND_NAMES = tuple(name for name, _ in TOKEN_SPECS)
+KIND_IDS = {name: kind for kind, name in enumerate(KIND_NAMES)}
+(TK_INT, TK_NUMBER, TK_ID, TK_EQUALS, TK_PLUS, TK_MINUS, TK_STAR, TK_SLASH,
+ TK_LPAREN, TK_RPAREN, TK_SEMI, TK_WS, TK_MISMATCH) = range(len(KIND_NAMES))
+TK_EOF = -1
+KIND_TEXTS = ('int', None, None, '=', '+', '-', '*', '/', '(', ')', ';', None, None)
+
+
+def source_location(source: str, offset: int) -> Tuple[int, int]:
+    line = source.count('\n', 0, offset) + 1
+    return line, offset - (source.rfind('\n', 0, offset) + 1) + 1
+
+
+class Token(NamedTuple):
+    """Token com posição (linha e coluna, a partir de 1) no código fonte."""
+    kind: str
+    value: str
+    line: int
+    column: int
+
+
+class TokenBuffer:
+    """Fluxo compacto de tokens em arrays paralelos.
+
+    Cada token ocupa um tipo inteiro (`kinds`), o offset de início no código
+    fonte (`starts`) e, para identificadores e números, o id do lexema
+    internado em `lexemes` (`symbols`). Os demais tipos têm texto fixo.
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+        self.kinds = array('B')
+        self.starts = array('I' if len(source) < 2 ** 32 else 'Q')
+        self.symbols = array('I')
+        self.lexemes: List[str] = []
+        self.lexeme_ids: Dict[str, int] = {}
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __getitem__(self, index) -> Tuple[str, str]:
+        return KIND_NAMES[self.kinds[index]], self.value(index)
+
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        for kind, value, _ in self.iter_compact():
+            yield KIND_NAMES[kind], value
+
+    def value(self, index) -> str:
+        kind = self.kinds[index]
+        if kind == TK_ID or kind == TK_NUMBER:
+            return self.lexemes[self.symbols[index]]
+        return KIND_TEXTS[kind]
+
+    def iter_compact(self) -> Iterator[Tuple[int, str, int]]:
+        lexemes = self.lexemes
+        texts = KIND_TEXTS
+        for kind, start, symbol in zip(self.kinds, self.starts, self.symbols):
+            if kind == TK_ID or kind == TK_NUMBER:
+                yield kind, lexemes[symbol], start
+            else:
+                yield kind, texts[kind], start
+
+    def location(self, offset) -> Tuple[int, int]:
+        return source_location(self.source, offset)
+
+
+class MappedTokens:
+    """Fluxo de tokens lido direto de bytes (tipicamente um `mmap`), sem guardar nada.
+
+    `iter_compact()` produz as mesmas triplas `(tipo, lexema, offset)` de
+    `TokenBuffer`, e o `Parser` as consome conforme avança, então a memória
+    não cresce com o tamanho da entrada. Os offsets são em bytes; linha e
+    coluna só são calculadas para mensagens de erro.
+    """
+
+    def __init__(self, data):
+        self.data = data
+
+    def iter_compact(self) -> Iterator[Tuple[int, str, int]]:
+        texts = KIND_TEXTS
+        for mo in BYTES_SKIPPING_REGEX.finditer(self.data):
+            group = mo.lastindex
+            kind = group - SKIP_GROUPS
+            if kind < 0:
+                break
+            if kind >= TK_WS:
+                line, column = self.location(mo.start(group))
+                character = mo.group(group).decode('utf-8', 'replace')
+                raise RuntimeError(f'Unexpected character: {character} at line {line}, column {column}')
+            if kind == TK_ID or kind == TK_NUMBER:
+                yield kind, mo.group(group).decode('ascii'), mo.start(group)
+            else:
+                yield kind, texts[kind], mo.start(group)
+
+    def location(self, offset) -> Tuple[int, int]:
+        # Conta as quebras de linha em fatias, sem copiar o prefixo inteiro do arquivo.
+        data = self.data
+        line = 1
+        for start in range(0, offset, 1 << 24):
+            line += data[start:min(start + (1 << 24), offset)].count(b'\n')
+        return line, offset - (data.rfind(b'\n', 0, offset) + 1) + 1
+
 
 class Lexer:
     """Analisador léxico que converte código fonte em tokens."""
@@ -10,31 +148,64 @@ class Lexer:
         self.pos = 0
 
     def tokenize(self) -> List[Tuple[str, str]]:
-        token_specs = [
-            ('INT', r'\bint\b'),
-            ('NUMBER', r'\d+'),
-            ('ID', r'[a-zA-Z_][a-zA-Z0-9_]*'),
-            ('EQUALS', r'='),
-            ('PLUS', r'\+'),
-            ('MINUS', r'-'),
-            ('STAR', r'\*'),
-            ('SLASH', r'/'),
-            ('LPAREN', r'\('),
-            ('RPAREN', r'\)'),
-            ('SEMI', r';'),
-            ('WS', r'\s+'),
-            ('MISMATCH', r'.'),
-        ]
-        
-        token_regex = '|'.join('(?P<%s>%s)' % pair for pair in token_specs)
-        
-        for mo in re.finditer(token_regex, self.source):
+        for mo in TOKEN_REGEX.finditer(self.source):
             kind = mo.lastgroup
-            value = mo.group()
             if kind == 'WS':
                 continue
             elif kind == 'MISMATCH':
-                raise RuntimeError(f'Unexpected character: {value}')
-            self.tokens.append((kind, value))
-        
+                raise RuntimeError(self._mismatch_message(mo))
+            self.tokens.append((kind, mo.group()))
+
+        self.pos = len(self.source)
         return self.tokens
+
+    def iter_tokens(self) -> Iterator[Token]:
+        line = 1
+        line_start = 0
+        for mo in TOKEN_REGEX.finditer(self.source):
+            kind = mo.lastgroup
+            value = mo.group()
+            if kind == 'WS':
+                newline = value.rfind('\n')
+                if newline != -1:
+                    line += value.count('\n')
+                    line_start = mo.start() + newline + 1
+                continue
+            elif kind == 'MISMATCH':
+                raise RuntimeError(self._mismatch_message(mo))
+            self.pos = mo.end()
+            yield Token(kind, value, line, mo.start() - line_start + 1)
+
+    def tokenize_compact(self) -> TokenBuffer:
+        buffer = TokenBuffer(self.source)
+        add_kind = buffer.kinds.append
+        add_start = buffer.starts.append
+        add_symbol = buffer.symbols.append
+        lexemes = buffer.lexemes
+        lexeme_ids = buffer.lexeme_ids
+
+        for mo in SKIPPING_REGEX.finditer(self.source):
+            group = mo.lastindex
+            kind = group - SKIP_GROUPS
+            if kind < 0:
+                break
+            if kind >= TK_WS:
+                raise RuntimeError(self._mismatch_message(mo, group))
+            add_kind(kind)
+            add_start(mo.start(group))
+            if kind == TK_ID or kind == TK_NUMBER:
+                lexeme = mo.group(group)
+                symbol = lexeme_ids.get(lexeme)
+                if symbol is None:
+                    symbol = lexeme_ids[lexeme] = len(lexemes)
+                    lexemes.append(lexeme)
+                add_symbol(symbol)
+            else:
+                add_symbol(0)
+
+        self.pos = len(self.source)
+        return buffer
+
+    def _mismatch_message(self, mo, group=0):
+        line, column = source_location(self.source, mo.start(group))
+        return f'Unexpected character: {mo.group(group)} at line {line}, column {column}'
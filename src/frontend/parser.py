@@ -1,74 +1,168 @@
-from typing import List, Tuple
-from .ast_nodes import Program, Declaration, Assignment, BinaryOp, Number, Variable
+from typing import Iterable, Iterator, Tuple
+from .ast_nodes import Node, Program, Declaration, Assignment, BinaryOp, Number, Variable
+from .compact_ast import (
+    CompactAST, NK_DECLARATION, NK_ASSIGNMENT, NK_BINARY, NK_NUMBER, NK_VARIABLE, NO_NODE, OPERATOR_IDS,
+)
+from .lexer import (
+    KIND_IDS, KIND_NAMES, MappedTokens, TokenBuffer,
+    TK_INT, TK_NUMBER, TK_ID, TK_EQUALS, TK_PLUS, TK_MINUS, TK_STAR, TK_SLASH,
+    TK_LPAREN, TK_RPAREN, TK_SEMI, TK_EOF,
+)
+
+BINARY_PRECEDENCE = {TK_PLUS: 1, TK_MINUS: 1, TK_STAR: 2, TK_SLASH: 2}
 
 class Parser:
-    """Analisador sintático que constrói a AST a partir de tokens."""
+    """Analisador sintático que constrói a AST a partir de tokens.
+
+    Aceita a lista de `Lexer.tokenize()`, o fluxo de `Lexer.iter_tokens()`,
+    o `TokenBuffer` de `Lexer.tokenize_compact()` ou um `MappedTokens`;
+    apenas o token corrente é mantido em memória e os tipos são comparados
+    como inteiros.
+    """
 
-    def __init__(self, tokens: List[Tuple[str, str]]):
+    def __init__(self, tokens: Iterable[Tuple[str, str]]):
         self.tokens = tokens
         self.pos = 0
+        if isinstance(tokens, (TokenBuffer, MappedTokens)):
+            self._stream = tokens.iter_compact()
+        else:
+            self._stream = ((KIND_IDS[tok[0]], tok[1], tok[2:4] or None) for tok in tokens)
+        self.current = next(self._stream, None)
+        self.kind = TK_EOF if self.current is None else self.current[0]
+
+    def close_stream(self):
+        """Encerra o fluxo de tokens; um `MappedTokens` deixa de segurar o buffer do `mmap`."""
+        self._stream.close()
 
     def parse(self) -> Program:
-        statements = []
-        while self.pos < len(self.tokens):
-            statements.append(self.statement())
-        return Program(statements)
+        return Program(list(self.statements()))
+
+    def parse_compact(self) -> CompactAST:
+        """Constrói a AST direto na arena de `CompactAST`, sem objetos por nó."""
+        ast = CompactAST()
+        add_root = ast.statements.append
+        while self.kind != TK_EOF:
+            if self.kind == TK_INT:
+                self.advance()
+                name = self.consume(TK_ID)
+                self.consume(TK_SEMI)
+                add_root(ast.add(NK_DECLARATION, 0, NO_NODE, ast.name_id(name)))
+            else:
+                name = self.consume(TK_ID)
+                self.consume(TK_EQUALS)
+                expression = self._compact_expression(ast)
+                self.consume(TK_SEMI)
+                add_root(ast.add(NK_ASSIGNMENT, expression, NO_NODE, ast.name_id(name)))
+        return ast
+
+    def statements(self) -> Iterator[Node]:
+        while self.kind != TK_EOF:
+            yield self.statement()
 
     def statement(self):
-        if self.check('INT'):
+        if self.kind == TK_INT:
             return self.declaration()
         else:
             return self.assignment()
 
     def declaration(self):
-        self.consume('INT')
-        name = self.consume('ID')[1]
-        self.consume('SEMI')
+        self.consume(TK_INT)
+        name = self.consume(TK_ID)
+        self.consume(TK_SEMI)
         return Declaration('int', name)
 
     def assignment(self):
-        name = self.consume('ID')[1]
-        self.consume('EQUALS')
+        name = self.consume(TK_ID)
+        self.consume(TK_EQUALS)
         expr = self.expression()
-        self.consume('SEMI')
+        self.consume(TK_SEMI)
         return Assignment(name, expr)
 
     def expression(self):
-        node = self.term()
-        while self.check('PLUS') or self.check('MINUS'):
-            op = self.advance()[1]
-            right = self.term()
-            node = BinaryOp(node, op, right)
-        return node
-
-    def term(self):
-        node = self.factor()
-        while self.check('STAR') or self.check('SLASH'):
-            op = self.advance()[1]
-            right = self.factor()
-            node = BinaryOp(node, op, right)
-        return node
-
-    def factor(self):
-        if self.check('NUMBER'):
-            return Number(int(self.advance()[1]))
-        elif self.check('ID'):
-            return Variable(self.advance()[1])
-        elif self.check('LPAREN'):
-            self.consume('LPAREN')
-            expr = self.expression()
-            self.consume('RPAREN')
-            return expr
-        raise SyntaxError(f"Unexpected token: {self.tokens[self.pos]}")
+        return self.climb(self._make_leaf, BinaryOp)
+
+    def _compact_expression(self, ast):
+        # Operandos são handles da arena.
+        add, name_id, number_id = ast.add, ast.name_id, ast.number_id
+
+        def make_leaf(kind, text):
+            if kind == TK_NUMBER:
+                return add(NK_NUMBER, NO_NODE, NO_NODE, number_id(int(text)))
+            return add(NK_VARIABLE, NO_NODE, NO_NODE, name_id(text))
+
+        return self.climb(make_leaf, lambda left, op, right: add(NK_BINARY, left, right, OPERATOR_IDS[op]))
+
+    def climb(self, make_leaf, reduce):
+        """Lê uma expressão por precedence climbing e devolve o operando que a representa.
+
+        `make_leaf(kind, text)` constrói o operando de um número ou
+        identificador, e `reduce(left, op, right)` o de uma operação binária;
+        cada frontend escolhe o que é um operando (nó, handle, nome TAC). As
+        pilhas são explícitas: nenhum nível de precedência ou de parênteses
+        consome a pilha de chamadas do Python.
+        """
+        operands = []
+        operators = []
+        push, pop = operands.append, operands.pop
+        depth = 0
+        while True:
+            while self.kind == TK_LPAREN:
+                self.advance()
+                operators.append(None)
+                depth += 1
+
+            kind = self.kind
+            if kind == TK_NUMBER or kind == TK_ID:
+                push(make_leaf(kind, self.advance()))
+            else:
+                raise SyntaxError(f"Unexpected token: {self.describe(self.current)}")
+
+            while True:
+                precedence = BINARY_PRECEDENCE.get(self.kind)
+                if precedence is not None:
+                    while operators and operators[-1] is not None and operators[-1][0] >= precedence:
+                        right = pop()
+                        operands[-1] = reduce(operands[-1], operators.pop()[1], right)
+                    operators.append((precedence, self.advance()))
+                    break
+                if depth == 0:
+                    while operators:
+                        right = pop()
+                        operands[-1] = reduce(operands[-1], operators.pop()[1], right)
+                    return operands[0]
+                while operators[-1] is not None:
+                    right = pop()
+                    operands[-1] = reduce(operands[-1], operators.pop()[1], right)
+                self.consume(TK_RPAREN)
+                operators.pop()
+                depth -= 1
+
+    @staticmethod
+    def _make_leaf(kind, text):
+        return Number(int(text)) if kind == TK_NUMBER else Variable(text)
 
     def check(self, kind):
-        return self.pos < len(self.tokens) and self.tokens[self.pos][0] == kind
+        return self.kind == kind
 
     def advance(self):
+        value = self.current[1]
+        self.current = next(self._stream, None)
+        self.kind = TK_EOF if self.current is None else self.current[0]
         self.pos += 1
-        return self.tokens[self.pos - 1]
+        return value
 
     def consume(self, kind):
-        if self.check(kind):
+        if self.kind == kind:
             return self.advance()
-        raise SyntaxError(f"Expected {kind}, got {self.tokens[self.pos] if self.pos < len(self.tokens) else 'EOF'}")
+        raise SyntaxError(f"Expected {KIND_NAMES[kind]}, got {self.describe(self.current)}")
+
+    def describe(self, token):
+        if token is None:
+            return 'EOF'
+        kind, value, location = token
+        text = str((KIND_NAMES[kind], value))
+        if location is None:
+            return text
+        if isinstance(location, int):
+            location = self.tokens.location(location)
+        return f"{text} at line {location[0]}, column {location[1]}"
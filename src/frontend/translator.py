@@ -0,0 +1,105 @@
+from typing import Iterable, List, Tuple
+
+from src.analysis.semantic import SemanticError
+from src.ir.ir_generator import OP_NAMES, ExpressionTable
+from .lexer import TK_INT, TK_NUMBER, TK_ID, TK_EQUALS, TK_SEMI, TK_EOF
+from .parser import Parser
+
+
+class Translator(Parser):
+    """Frontend de passada única: análise sintática, semântica e geração de TAC juntas.
+
+    Tradução dirigida pela sintaxe sobre o mesmo precedence climbing do
+    `Parser`: cada redução de operador emite a instrução TAC na hora, e as
+    declarações são conferidas conforme os identificadores aparecem, sem
+    construir a AST. O TAC, os temporários e as mensagens de `SyntaxError` e
+    `SemanticError` são os mesmos do caminho `Parser` -> `SemanticAnalyzer`
+    -> `IRGenerator`. Como lá o programa inteiro é lido antes da análise
+    semântica, o primeiro erro semântico só é levantado no fim, depois de
+    qualquer erro de sintaxe. `dag=True` tem o mesmo efeito que no
+    `IRGenerator`.
+    """
+
+    def __init__(self, tokens: Iterable[Tuple[str, str]], dag=False):
+        super().__init__(tokens)
+        self.symbol_table = {}
+        self.instructions = []
+        self.temp_counter = 1
+        self.statement_count = 0
+        self.expressions = ExpressionTable() if dag else None
+        self._error = None
+
+    def translate(self) -> List[Tuple]:
+        while self.kind != TK_EOF:
+            self.translate_statement()
+        self.raise_pending_error()
+        return self.instructions
+
+    def translate_statement(self):
+        """Traduz um statement, acrescentando o seu TAC a `instructions`."""
+        if self.kind == TK_INT:
+            self.advance()
+            name = self.consume(TK_ID)
+            self.consume(TK_SEMI)
+            if name in self.symbol_table:
+                self._fail(f"Variable '{name}' already declared")
+            else:
+                self.symbol_table[name] = 'int'
+        else:
+            name = self.consume(TK_ID)
+            if name not in self.symbol_table:
+                self._fail(f"Variable '{name}' not declared")
+            self.consume(TK_EQUALS)
+            result = self._translate_expression()
+            self.consume(TK_SEMI)
+            self.instructions.append(('ASSIGN', result, None, name))
+            if self.expressions is not None:
+                self.expressions.invalidate(name)
+        self.statement_count += 1
+
+    def take_instructions(self) -> List[Tuple]:
+        """Entrega o TAC acumulado e começa uma janela nova, com os temporários de volta em `t1`.
+
+        Só pode ser chamado entre statements: nenhum temporário sobrevive ao
+        statement que o criou, a não ser no modo DAG, cuja tabela também é
+        esvaziada.
+        """
+        instructions = self.instructions
+        self.instructions = []
+        self.temp_counter = 1
+        if self.expressions is not None:
+            self.expressions = ExpressionTable()
+        return instructions
+
+    def raise_pending_error(self):
+        if self._error is not None:
+            raise SemanticError(self._error)
+
+    def _fail(self, message):
+        if self._error is None:
+            self._error = message
+
+    def _translate_expression(self):
+        # Operandos que já são nomes TAC (variável, literal ou temporário).
+        return self.climb(self._leaf, self._emit)
+
+    def _leaf(self, kind, text):
+        if kind == TK_NUMBER:
+            return str(int(text))
+        if text not in self.symbol_table:
+            self._fail(f"Variable '{text}' not declared")
+        return text
+
+    def _emit(self, left, op, right):
+        op = OP_NAMES[op]
+        if self.expressions is not None:
+            key = self.expressions.key(op, left, right)
+            temp = self.expressions.get(key)
+            if temp is not None:
+                return temp
+        temp = f"t{self.temp_counter}"
+        self.temp_counter += 1
+        self.instructions.append((op, left, right, temp))
+        if self.expressions is not None:
+            self.expressions.add(key, temp)
+        return temp
@@ -1,3 +1,7 @@
 from .ir_generator import IRGenerator
+from .printer import format_instruction, format_ir
+from .compact import CompactIR
+from .regalloc import RegisterAllocation, allocate_registers, max_live_temps
 
-__all__ = ['IRGenerator']
+__all__ = ['IRGenerator', 'format_instruction', 'format_ir', 'CompactIR', 'RegisterAllocation', 'allocate_registers',
+           'max_live_temps']
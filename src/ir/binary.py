@@ -0,0 +1,201 @@
+import mmap
+import struct
+import sys
+import tempfile
+import zlib
+from array import array
+
+from src.ir.compact import OPCODE_IDS, CompactIR
+
+MAGIC = b'TACB'
+# Versão 2: temporários são ids densos num pool próprio, como no `CompactIR`.
+FORMAT_VERSION = 2
+# magic, versão, flags, instruções, nomes, bytes de nomes, constantes,
+# bytes de constantes, CRC32 de tudo que vem depois do cabeçalho, temporários.
+HEADER = struct.Struct('<4sHHQQQQQIQ')
+HEADER_SIZE = 64
+ALIGNMENT = 8
+
+
+class BinaryFormatError(ValueError):
+    pass
+
+
+def _padding(size):
+    return -size % ALIGNMENT
+
+
+def _little_endian(column):
+    if sys.byteorder == 'little':
+        return column
+    column = array(column.typecode, column)
+    column.byteswap()
+    return column
+
+
+def _pool(strings, kind):
+    for text in strings:
+        if '\0' in text:
+            raise BinaryFormatError(f"{kind} contains a NUL character: {text!r}")
+    return '\0'.join(strings).encode('utf-8')
+
+
+def write_binary(path, ir):
+    """Grava o TAC (lista de tuplas ou `CompactIR`) no formato binário versionado.
+
+    O arquivo é um cabeçalho de 64 bytes seguido das colunas do `CompactIR`
+    (opcodes em 1 byte e operandos etiquetados em int64 little-endian, cada
+    seção alinhada a 8 bytes), dos pools de nomes e constantes em UTF-8,
+    separados por NUL, e do pool de temporários (o N de cada `t<N>`) em
+    int64. Instruções `NOP` são mantidas para preservar índices.
+    """
+    if not isinstance(ir, CompactIR):
+        ir = CompactIR.from_tuples(ir)
+    names = _pool(ir.names, "Name")
+    constants = _pool(ir.const_texts, "Constant")
+    sections = [bytes(ir.ops)]
+    sections.extend(_little_endian(column).tobytes() for column in (ir.arg1, ir.arg2, ir.result))
+    sections.extend((names, constants, _little_endian(array('q', ir.temps)).tobytes()))
+
+    checksum = 0
+    body = []
+    for section in sections:
+        body.append(section)
+        body.append(b'\0' * _padding(len(section)))
+    for chunk in body:
+        checksum = zlib.crc32(chunk, checksum)
+
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(ir), len(ir.names), len(names),
+                         len(ir.const_texts), len(constants), checksum, len(ir.temps))
+    with open(path, 'wb') as f:
+        f.write(header.ljust(HEADER_SIZE, b'\0'))
+        for chunk in body:
+            f.write(chunk)
+
+
+class BinaryWriter:
+    """Grava o formato de `write_binary()` aos poucos, sem manter o TAC em memória.
+
+    Cada chamada de `write()` acrescenta instruções às colunas, guardadas em
+    arquivos temporários; `close()` monta o arquivo final com cabeçalho,
+    padding e CRC32. Só os pools de nomes, temporários e constantes ficam em
+    memória. Operandos são codificados por um `CompactIR` vazio usado apenas
+    como tabela de internação.
+    """
+
+    COPY_CHUNK = 1 << 20
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._pools = CompactIR()
+        self._columns = [tempfile.TemporaryFile() for _ in range(4)]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+    def write(self, instructions):
+        encode = self._pools.encode
+        ops, arg1, arg2, result = array('B'), array('q'), array('q'), array('q')
+        for op, a, b, target in instructions:
+            ops.append(OPCODE_IDS[op])
+            arg1.append(encode(a))
+            arg2.append(encode(b))
+            result.append(encode(target))
+        ops.tofile(self._columns[0])
+        for spool, column in zip(self._columns[1:], (arg1, arg2, result)):
+            _little_endian(column).tofile(spool)
+        self.count += len(ops)
+
+    def close(self):
+        pools = self._pools
+        names = _pool(pools.names, "Name")
+        constants = _pool(pools.const_texts, "Constant")
+        checksum = 0
+        with open(self.path, 'wb') as f:
+            f.write(b'\0' * HEADER_SIZE)
+            for spool in self._columns:
+                spool.seek(0)
+                while True:
+                    chunk = spool.read(self.COPY_CHUNK)
+                    if not chunk:
+                        break
+                    checksum = zlib.crc32(chunk, checksum)
+                    f.write(chunk)
+                padding = b'\0' * _padding(spool.tell())
+                checksum = zlib.crc32(padding, checksum)
+                f.write(padding)
+            for section in (names, constants, _little_endian(array('q', pools.temps)).tobytes()):
+                chunk = section + b'\0' * _padding(len(section))
+                checksum = zlib.crc32(chunk, checksum)
+                f.write(chunk)
+            header = HEADER.pack(MAGIC, FORMAT_VERSION, 0, self.count, len(pools.names), len(names),
+                                 len(pools.const_texts), len(constants), checksum, len(pools.temps))
+            f.seek(0)
+            f.write(header.ljust(HEADER_SIZE, b'\0'))
+        self.discard()
+
+    def discard(self):
+        for spool in self._columns:
+            spool.close()
+
+
+def read_binary(path, verify=True):
+    """Carrega um arquivo de `write_binary()` como `CompactIR` apoiado em `mmap`.
+
+    As colunas de instruções são `memoryview`s sobre o mapeamento em modo
+    cópia-na-escrita: nada é desserializado na carga, os passes do otimizador
+    podem reescrever instruções no lugar sem tocar no arquivo, e só as
+    páginas efetivamente lidas saem do disco. Os pools de nomes, constantes e
+    temporários são decodificados na hora. Com `verify`, o CRC32 é conferido antes.
+    """
+    with open(path, 'rb') as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        except ValueError:
+            raise BinaryFormatError(f"{path}: empty file") from None
+    view = memoryview(mapped)
+    if len(view) < HEADER_SIZE:
+        raise BinaryFormatError(f"{path}: truncated header")
+    (magic, version, _, count, name_count, name_bytes,
+     const_count, const_bytes, checksum, temp_count) = HEADER.unpack_from(view)
+    if magic != MAGIC:
+        raise BinaryFormatError(f"{path}: not a binary TAC file")
+    if version != FORMAT_VERSION:
+        raise BinaryFormatError(f"{path}: unsupported format version {version}")
+
+    sizes = [count, 8 * count, 8 * count, 8 * count, name_bytes, const_bytes, 8 * temp_count]
+    offsets = []
+    offset = HEADER_SIZE
+    for size in sizes:
+        offsets.append(offset)
+        offset += size + _padding(size)
+    if len(view) != offset:
+        raise BinaryFormatError(f"{path}: expected {offset} bytes, found {len(view)}")
+    if verify and zlib.crc32(view[HEADER_SIZE:]) != checksum:
+        raise BinaryFormatError(f"{path}: checksum mismatch")
+
+    columns = [view[start:start + size] for start, size in zip(offsets, sizes)]
+    ir = CompactIR()
+    ir.ops = columns[0]
+    if sys.byteorder == 'little':
+        ir.arg1, ir.arg2, ir.result = (column.cast('q') for column in columns[1:4])
+    else:
+        ir.arg1, ir.arg2, ir.result = (_little_endian(array('q', column.cast('q'))) for column in columns[1:4])
+
+    ir.names = columns[4].tobytes().decode('utf-8').split('\0') if name_count else []
+    ir.name_ids = {name: symbol for symbol, name in enumerate(ir.names)}
+    ir.const_texts = columns[5].tobytes().decode('utf-8').split('\0') if const_count else []
+    ir.const_values = list(map(int, ir.const_texts))
+    ir.const_ids = {text: symbol for symbol, text in enumerate(ir.const_texts)}
+    ir.temps = _little_endian(array('q', columns[6].cast('q'))).tolist()
+    ir.temp_ids = {number: symbol for symbol, number in enumerate(ir.temps)}
+    if len(ir.names) != name_count or len(ir.const_texts) != const_count:
+        raise BinaryFormatError(f"{path}: corrupt string pool")
+    return ir
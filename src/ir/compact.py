@@ -0,0 +1,182 @@
+from array import array
+from typing import Dict, List
+
+OPCODES = ('NOP', 'ASSIGN', 'ADD', 'SUB', 'MUL', 'DIV', 'SHL', 'SHR')
+OPCODE_IDS = {name: code for code, name in enumerate(OPCODES)}
+OP_NOP, OP_ASSIGN, OP_ADD, OP_SUB, OP_MUL, OP_DIV, OP_SHL, OP_SHR = range(len(OPCODES))
+
+# Operandos são inteiros com a etiqueta nos 2 bits baixos e o payload no
+# restante: índice no pool de constantes, de nomes ou de temporários.
+# Temporários são os nomes canônicos `t<N>` gerados pelo IRGenerator; o pool
+# guarda N e o payload é denso, então passes indexam arrays pelos ids.
+TAG_NONE, TAG_CONST, TAG_VAR, TAG_TEMP = range(4)
+NONE = TAG_NONE
+
+
+def tag_of(operand):
+    return operand & 3
+
+
+def payload_of(operand):
+    return operand >> 2
+
+
+def is_temp(name):
+    """Nomes canônicos `t<N>` do IRGenerator, os únicos tratados como temporários."""
+    digits = name[1:]
+    return (name[:1] == 't' and digits.isdigit() and digits.isascii() and len(digits) < 19
+            and (digits[0] != '0' or digits == '0'))
+
+
+def parse_constant(text):
+    """Mesma regra de `Optimizer.is_number`: constante é o que `int()` aceita."""
+    if text[:1].isalpha() or text[:1] == '_':
+        return None
+    try:
+        return int(text)
+    except ValueError:
+        return None
+
+
+class CompactIR:
+    """TAC em estrutura de arrays com opcodes inteiros e operandos etiquetados.
+
+    Cada instrução ocupa uma posição em `ops`, `arg1`, `arg2` e `result`.
+    Nomes, temporários e constantes ficam em pools internados, então os passes comparam e
+    indexam inteiros em vez de analisar strings. Instruções removidas viram
+    `OP_NOP` e só são descartadas em `to_tuples()` ou `compacted()`, o que
+    mantém os índices estáveis durante os passes.
+    """
+
+    def __init__(self):
+        self.ops = array('B')
+        self.arg1 = array('q')
+        self.arg2 = array('q')
+        self.result = array('q')
+        self.names: List[str] = []
+        self.name_ids: Dict[str, int] = {}
+        self.temps: List[int] = []
+        self.temp_ids: Dict[int, int] = {}
+        self.const_texts: List[str] = []
+        self.const_values: List[int] = []
+        self.const_ids: Dict[str, int] = {}
+
+    def __len__(self):
+        return len(self.ops)
+
+    @classmethod
+    def from_tuples(cls, instructions):
+        ir = cls()
+        encode = ir.encode
+        add_op, add_arg1, add_arg2, add_result = (
+            ir.ops.append, ir.arg1.append, ir.arg2.append, ir.result.append)
+        for op, arg1, arg2, result in instructions:
+            add_op(OPCODE_IDS[op])
+            add_arg1(encode(arg1))
+            add_arg2(encode(arg2))
+            add_result(encode(result))
+        return ir
+
+    def to_tuples(self):
+        decode = self.decode
+        return [
+            (OPCODES[op], decode(arg1), decode(arg2), decode(result))
+            for op, arg1, arg2, result in zip(self.ops, self.arg1, self.arg2, self.result)
+            if op != OP_NOP
+        ]
+
+    def append(self, op, arg1, arg2, result):
+        self.ops.append(op)
+        self.arg1.append(arg1)
+        self.arg2.append(arg2)
+        self.result.append(result)
+
+    def share_pools(self, other):
+        """Passa a usar os pools de nomes, temporários e constantes de `other`."""
+        self.names, self.name_ids = other.names, other.name_ids
+        self.temps, self.temp_ids = other.temps, other.temp_ids
+        self.const_texts, self.const_values, self.const_ids = other.const_texts, other.const_values, other.const_ids
+
+    def compacted(self):
+        ir = CompactIR()
+        ir.share_pools(self)
+        for index, op in enumerate(self.ops):
+            if op != OP_NOP:
+                ir.append(op, self.arg1[index], self.arg2[index], self.result[index])
+        return ir
+
+    def select(self, indices):
+        """IR só com as instruções em `indices`, na ordem dada, e pools só com o que elas usam.
+
+        Os ids são renumerados, mas `decode()` da cópia devolve os mesmos
+        textos do original; a cópia custa o tamanho da seleção para ser
+        serializada, não o dos pools do programa inteiro.
+        """
+        ir = CompactIR()
+        ops = self.ops
+        ir.ops = array('B', [ops[index] for index in indices])
+        columns = [[column[index] for index in indices] for column in (self.arg1, self.arg2, self.result)]
+        used = list(dict.fromkeys(columns[0] + columns[1] + columns[2]))
+        remap = {NONE: NONE}
+        # O id local i de cada etiqueta vira o operando (i << 2) | etiqueta, a range com passo 4.
+        names = [operand for operand in used if operand & 3 == TAG_VAR]
+        ir.names = [self.names[operand >> 2] for operand in names]
+        ir.name_ids = {name: symbol for symbol, name in enumerate(ir.names)}
+        remap.update(zip(names, range(TAG_VAR, 4 * len(names), 4)))
+        temps = [operand for operand in used if operand & 3 == TAG_TEMP]
+        ir.temps = [self.temps[operand >> 2] for operand in temps]
+        ir.temp_ids = {number: symbol for symbol, number in enumerate(ir.temps)}
+        remap.update(zip(temps, range(TAG_TEMP, 4 * len(temps), 4)))
+        constants = [operand for operand in used if operand & 3 == TAG_CONST]
+        ir.const_texts = [self.const_texts[operand >> 2] for operand in constants]
+        ir.const_values = [self.const_values[operand >> 2] for operand in constants]
+        ir.const_ids = {text: symbol for symbol, text in enumerate(ir.const_texts)}
+        remap.update(zip(constants, range(TAG_CONST, 4 * len(constants), 4)))
+        ir.arg1, ir.arg2, ir.result = (array('q', map(remap.__getitem__, column)) for column in columns)
+        return ir
+
+    def encode(self, text):
+        if text is None:
+            return NONE
+        if text[:1] == 't' and is_temp(text):
+            number = int(text[1:])
+            symbol = self.temp_ids.get(number)
+            if symbol is None:
+                symbol = self.temp_ids[number] = len(self.temps)
+                self.temps.append(number)
+            return (symbol << 2) | TAG_TEMP
+        symbol = self.name_ids.get(text)
+        if symbol is not None:
+            return (symbol << 2) | TAG_VAR
+        symbol = self.const_ids.get(text)
+        if symbol is not None:
+            return (symbol << 2) | TAG_CONST
+        value = parse_constant(text)
+        if value is not None:
+            return self._intern_constant(text, value)
+        symbol = self.name_ids[text] = len(self.names)
+        self.names.append(text)
+        return (symbol << 2) | TAG_VAR
+
+    def decode(self, operand):
+        tag = operand & 3
+        if tag == TAG_TEMP:
+            return f"t{self.temps[operand >> 2]}"
+        if tag == TAG_VAR:
+            return self.names[operand >> 2]
+        if tag == TAG_CONST:
+            return self.const_texts[operand >> 2]
+        return None
+
+    def constant(self, value):
+        text = str(value)
+        symbol = self.const_ids.get(text)
+        if symbol is not None:
+            return (symbol << 2) | TAG_CONST
+        return self._intern_constant(text, value)
+
+    def _intern_constant(self, text, value):
+        symbol = self.const_ids[text] = len(self.const_texts)
+        self.const_texts.append(text)
+        self.const_values.append(value)
+        return (symbol << 2) | TAG_CONST
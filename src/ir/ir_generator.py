@@ -1,11 +1,87 @@
+from heapq import heappop, heappush
+
 from src.frontend.ast_nodes import Program, Declaration, Assignment, BinaryOp, Number, Variable
+from src.frontend.compact_ast import CompactAST, NK_ASSIGNMENT, NK_BINARY, NK_NUMBER, NK_VARIABLE, OPERATORS
+
+OP_NAMES = {'+': 'ADD', '-': 'SUB', '*': 'MUL', '/': 'DIV'}
+COMMUTATIVE_OPS = {'ADD', 'MUL'}
 
-class IRGenerator:
-    """Gerador de código intermediário em formato TAC (Three-Address Code)."""
+
+class ExpressionTable:
+    """Hash-consing de subexpressões: (op, operando, operando) -> temporário que já guarda o valor.
+
+    Os operandos de ADD e MUL entram na chave em ordem canônica. Temporários
+    são escritos uma vez só, então só as chaves que leem uma variável precisam
+    ser esquecidas quando ela é atribuída (`invalidate()`); `readers` guarda,
+    por variável, as chaves que a leem.
+    """
 
     def __init__(self):
+        self.temps = {}
+        self.readers = {}
+        self.produced = set()
+
+    @staticmethod
+    def key(op, left, right):
+        if op in COMMUTATIVE_OPS and right < left:
+            return op, right, left
+        return op, left, right
+
+    def get(self, key):
+        return self.temps.get(key)
+
+    def add(self, key, temp):
+        self.temps[key] = temp
+        self.produced.add(temp)
+        for operand in key[1:]:
+            if operand not in self.produced and not operand[0].isdigit():
+                self.readers.setdefault(operand, []).append(key)
+
+    def invalidate(self, name):
+        for key in self.readers.pop(name, ()):
+            self.temps.pop(key, None)
+
+
+def sethi_ullman_labels(ast):
+    """Número de Sethi–Ullman de cada nó de uma `CompactAST`: temporários vivos que a subárvore exige.
+
+    Folhas viram operandos diretos e não ocupam temporário (rótulo 0). Um
+    operador com filhos de rótulos diferentes precisa do maior deles; com
+    rótulos iguais, de um a mais.
+    """
+    labels = [0] * len(ast)
+    for handle, (kind, left, right) in enumerate(zip(ast.kinds, ast.left, ast.right)):
+        if kind == NK_BINARY:
+            a, b = labels[left], labels[right]
+            labels[handle] = a if a > b else b if b > a else a + 1
+    return labels
+
+
+class IRGenerator:
+    """Gerador de código intermediário em formato TAC (Three-Address Code).
+
+    Com `dag=True`, subexpressões repetidas (mesmo operador e mesmos
+    operandos, no mesmo statement ou em statements seguintes) reaproveitam o
+    temporário já calculado em vez de emitir outra instrução, até que uma
+    atribuição mude alguma variável lida por elas.
+
+    Com `sethi_ullman=True`, cada operador avalia primeiro o operando que
+    exige mais temporários (`sethi_ullman_labels()`) e os temporários são
+    reaproveitados assim que seu valor é lido: um statement nunca tem mais
+    temporários vivos que o rótulo da sua expressão. Os operandos de cada
+    instrução continuam na ordem do fonte, então o resultado é o mesmo; só
+    os temporários deixam de ser escritos uma vez só, e por isso o modo não
+    combina com `dag`.
+    """
+
+    def __init__(self, dag=False, sethi_ullman=False):
+        if dag and sethi_ullman:
+            raise ValueError("dag and sethi_ullman modes cannot be combined")
         self.instructions = []
         self.temp_counter = 1
+        self.expressions = ExpressionTable() if dag else None
+        self.sethi_ullman = sethi_ullman
+        self.free_temps = []
 
     def new_temp(self):
         temp = f"t{self.temp_counter}"
@@ -13,7 +89,13 @@ class IRGenerator:
         return temp
 
     def generate(self, node):
-        if isinstance(node, Program):
+        if isinstance(node, CompactAST):
+            self.generate_compact(node)
+
+        elif self.sethi_ullman and isinstance(node, (Program, Assignment)):
+            self.generate_compact(CompactAST.from_program(node if isinstance(node, Program) else Program([node])))
+
+        elif isinstance(node, Program):
             for stmt in node.statements:
                 self.generate(stmt)
         
@@ -23,13 +105,23 @@ class IRGenerator:
         elif isinstance(node, Assignment):
             result = self.generate(node.expression)
             self.instructions.append(('ASSIGN', result, None, node.name))
-            
+            if self.expressions is not None:
+                self.expressions.invalidate(node.name)
+
         elif isinstance(node, BinaryOp):
             left = self.generate(node.left)
             right = self.generate(node.right)
-            temp = self.new_temp()
-            op_map = {'+': 'ADD', '-': 'SUB', '*': 'MUL', '/': 'DIV'}
-            self.instructions.append((op_map[node.op], left, right, temp))
+            op = OP_NAMES[node.op]
+            if self.expressions is None:
+                temp = self.new_temp()
+                self.instructions.append((op, left, right, temp))
+                return temp
+            key = self.expressions.key(op, left, right)
+            temp = self.expressions.get(key)
+            if temp is None:
+                temp = self.new_temp()
+                self.instructions.append((op, left, right, temp))
+                self.expressions.add(key, temp)
             return temp
             
         elif isinstance(node, Number):
@@ -38,5 +130,105 @@ class IRGenerator:
         elif isinstance(node, Variable):
             return node.name
 
+    def generate_compact(self, ast):
+        # A arena está em pós-ordem, que é a ordem de emissão da travessia
+        # recursiva: um laço linear gera o mesmo TAC e os mesmos temporários.
+        if self.sethi_ullman:
+            self._generate_sethi_ullman(ast)
+            return
+        names = ast.names
+        numbers = [str(value) for value in ast.numbers]
+        op_names = [OP_NAMES[op] for op in OPERATORS]
+        emit = self.instructions.append
+        expressions = self.expressions
+        if expressions is not None:
+            # Versão em linha de ExpressionTable.key()/get()/add(): os tipos
+            # dos nós filhos dizem direto quais operandos são variáveis.
+            temps, readers, produced = expressions.temps, expressions.readers, expressions.produced
+            kinds = ast.kinds
+        values = [None] * len(ast)
+        counter = self.temp_counter
+        for handle, (kind, left, right, payload) in enumerate(zip(ast.kinds, ast.left, ast.right, ast.payload)):
+            if kind == NK_VARIABLE:
+                values[handle] = names[payload]
+            elif kind == NK_BINARY:
+                op = op_names[payload]
+                a, b = values[left], values[right]
+                if expressions is not None:
+                    key = (op, b, a) if op in COMMUTATIVE_OPS and b < a else (op, a, b)
+                    temp = temps.get(key)
+                    if temp is not None:
+                        values[handle] = temp
+                        continue
+                temp = values[handle] = f"t{counter}"
+                counter += 1
+                emit((op, a, b, temp))
+                if expressions is not None:
+                    temps[key] = temp
+                    produced.add(temp)
+                    if kinds[left] == NK_VARIABLE:
+                        readers.setdefault(a, []).append(key)
+                    if kinds[right] == NK_VARIABLE:
+                        readers.setdefault(b, []).append(key)
+            elif kind == NK_NUMBER:
+                values[handle] = numbers[payload]
+            elif kind == NK_ASSIGNMENT:
+                emit(('ASSIGN', values[left], None, names[payload]))
+                if expressions is not None:
+                    expressions.invalidate(names[payload])
+        self.temp_counter = counter
+
+    def _generate_sethi_ullman(self, ast):
+        names = ast.names
+        numbers = [str(value) for value in ast.numbers]
+        op_names = [OP_NAMES[op] for op in OPERATORS]
+        kinds, lefts, rights, payloads = ast.kinds, ast.left, ast.right, ast.payload
+        labels = sethi_ullman_labels(ast)
+        emit = self.instructions.append
+        free = self.free_temps
+        values = [None] * len(ast)
+        for root in ast.statements:
+            if kinds[root] != NK_ASSIGNMENT:
+                continue
+            # Pilha explícita: um handle não negativo ainda vai ser expandido,
+            # ~handle marca um operador com os dois operandos já calculados.
+            stack = [lefts[root]]
+            while stack:
+                handle = stack.pop()
+                if handle < 0:
+                    handle = ~handle
+                    left, right = lefts[handle], rights[handle]
+                    # Operandos temporários morrem aqui; o resultado pode reusar um deles.
+                    if kinds[left] == NK_BINARY:
+                        heappush(free, int(values[left][1:]))
+                    if kinds[right] == NK_BINARY:
+                        heappush(free, int(values[right][1:]))
+                    if free:
+                        number = heappop(free)
+                    else:
+                        number = self.temp_counter
+                        self.temp_counter += 1
+                    temp = values[handle] = f"t{number}"
+                    emit((op_names[payloads[handle]], values[left], values[right], temp))
+                    continue
+                kind = kinds[handle]
+                if kind == NK_VARIABLE:
+                    values[handle] = names[payloads[handle]]
+                elif kind == NK_NUMBER:
+                    values[handle] = numbers[payloads[handle]]
+                else:
+                    left, right = lefts[handle], rights[handle]
+                    stack.append(~handle)
+                    if labels[right] > labels[left]:
+                        stack.append(left)
+                        stack.append(right)
+                    else:
+                        stack.append(right)
+                        stack.append(left)
+            expression = lefts[root]
+            emit(('ASSIGN', values[expression], None, names[payloads[root]]))
+            if kinds[expression] == NK_BINARY:
+                heappush(free, int(values[expression][1:]))
+
     def get_code(self):
         return self.instructions
@@ -0,0 +1,10 @@
+OP_SYMBOLS = {'ADD': '+', 'SUB': '-', 'MUL': '*', 'DIV': '/', 'SHL': '<<', 'SHR': '>>'}
+
+def format_instruction(op, arg1, arg2, result):
+    if op == 'ASSIGN':
+        return f"{result} = {arg1}"
+    symbol = OP_SYMBOLS.get(op, op)
+    return f"{result} = {arg1} {symbol} {arg2}"
+
+def format_ir(instructions):
+    return "\n".join(format_instruction(*instr) for instr in instructions)
@@ -0,0 +1,181 @@
+from dataclasses import dataclass, field
+from heapq import heappop, heappush
+from typing import List, Optional
+
+from src.ir.compact import is_temp
+
+
+@dataclass
+class RegisterAllocation:
+    """TAC reescrito pela alocação e a pressão de registradores obtida.
+
+    `max_pressure` é o maior número de temporários vivos ao mesmo tempo no
+    programa de entrada; sem limite de registradores ele é exatamente o número
+    de registradores usados. `spilled` conta os intervalos que ficaram em
+    slots de memória por falta de registrador.
+    """
+    instructions: list
+    register_limit: Optional[int] = None
+    registers_used: int = 0
+    spill_slots: int = 0
+    spilled: int = 0
+    intervals: int = 0
+    max_pressure: int = 0
+    register_names: List[str] = field(default_factory=list)
+    spill_names: List[str] = field(default_factory=list)
+
+    def summary(self):
+        limit = 'unlimited' if self.register_limit is None else self.register_limit
+        return (
+            f"{self.intervals} temp intervals, max pressure {self.max_pressure}: "
+            f"{self.registers_used} registers (limit {limit}), "
+            f"{self.spilled} spilled into {self.spill_slots} slots"
+        )
+
+
+def live_intervals(instructions):
+    """Intervalos [definição, último uso] dos temporários, um por definição, em ordem de início.
+
+    Devolve `(starts, ends, outside)`. Temporários lidos sem uma definição
+    anterior não entram em nenhum intervalo; `outside` é o maior número entre
+    eles (0 se não houver), para que os nomes novos não colidam.
+    """
+    starts, ends = [], []
+    current = {}
+    outside = 0
+    for index, (op, arg1, arg2, result) in enumerate(instructions):
+        for arg in (arg1, arg2):
+            interval = current.get(arg)
+            if interval is not None:
+                ends[interval] = index
+            elif arg is not None and arg[:1] == 't' and is_temp(arg):
+                outside = max(outside, int(arg[1:]))
+        if result[:1] == 't' and is_temp(result):
+            current[result] = len(starts)
+            starts.append(index)
+            ends.append(index)
+    return starts, ends, outside
+
+
+def max_live_temps(instructions):
+    """Maior número de temporários vivos ao mesmo tempo, com a mesma regra de `allocate_registers()`."""
+    starts, ends, _ = live_intervals(instructions)
+    active = []
+    best = 0
+    for start, end in zip(starts, ends):
+        while active and active[0] <= start:
+            heappop(active)
+        heappush(active, end)
+        best = max(best, len(active))
+    return best
+
+
+def allocate_registers(instructions, registers=None):
+    """Linear scan (Poletto e Sarkar) dos temporários sobre `registers` registradores virtuais.
+
+    Em código linear os intervalos formam um grafo de intervalos, então sem
+    limite a varredura usa exatamente `max_pressure` registradores. Com o
+    limite estourado, o intervalo ativo que termina mais tarde vai para um
+    slot de spill inteiro, e os slots também são reaproveitados por uma
+    segunda varredura. Registradores e slots continuam sendo temporários
+    canônicos (`t<N>`, numerados depois de qualquer temporário que não foi
+    alocado), então o resultado segue válido para o printer e o otimizador;
+    operandos em slots de spill são lidos direto da memória.
+    """
+    if registers is not None and registers < 1:
+        raise ValueError("registers must be at least 1")
+    instructions = list(instructions)
+    starts, ends, outside = live_intervals(instructions)
+    count = len(starts)
+
+    location = [0] * count
+    spilled = []
+    # `active` é um heap pelo fim do intervalo, para expirar; `latest` é um
+    # heap pelo fim negado, para achar a vítima do spill. Quem sai de um
+    # deles fica marcado em `gone` e é descartado quando aparece no outro.
+    active = []
+    latest = []
+    gone = bytearray(count)
+    live = 0
+    free = []
+    used = 0
+    max_pressure = 0
+    for interval in range(count):
+        start = starts[interval]
+        # Um operando cujo último uso é a instrução que define este intervalo
+        # já foi lido quando o resultado é escrito, então o registrador é livre.
+        while active and active[0][0] <= start:
+            _, expired = heappop(active)
+            if not gone[expired]:
+                gone[expired] = 1
+                live -= 1
+                heappush(free, location[expired])
+        max_pressure = max(max_pressure, live + 1)
+
+        if free:
+            register = heappop(free)
+        elif registers is None or used < registers:
+            register = used
+            used += 1
+        else:
+            while gone[-latest[0][1]]:
+                heappop(latest)
+            end, victim = -latest[0][0], -latest[0][1]
+            if end > ends[interval]:
+                heappop(latest)
+                gone[victim] = 1
+                live -= 1
+                register = location[victim]
+                spilled.append(victim)
+            else:
+                spilled.append(interval)
+                continue
+        location[interval] = register
+        heappush(active, (ends[interval], interval))
+        heappush(latest, (-ends[interval], -interval))
+        live += 1
+
+    spill_location = _assign_spill_slots(sorted(spilled), starts, ends)
+    slots = max(spill_location.values(), default=-1) + 1
+
+    register_names = [f"t{outside + number + 1}" for number in range(used)]
+    spill_names = [f"t{outside + used + number + 1}" for number in range(slots)]
+
+    # Segunda passada com a mesma numeração de intervalos de live_intervals().
+    names = [register_names[location[interval]] if interval not in spill_location
+             else spill_names[spill_location[interval]] for interval in range(count)]
+    rewritten = []
+    current = {}
+    interval = 0
+    next_start = starts[0] if count else -1
+    for index, (op, arg1, arg2, result) in enumerate(instructions):
+        arg1 = current.get(arg1, arg1)
+        arg2 = current.get(arg2, arg2)
+        if index == next_start:
+            current[result] = result = names[interval]
+            interval += 1
+            next_start = starts[interval] if interval < count else -1
+        rewritten.append((op, arg1, arg2, result))
+
+    return RegisterAllocation(
+        rewritten, registers, used, slots, len(spilled), count,
+        max_pressure, register_names, spill_names,
+    )
+
+
+def _assign_spill_slots(spilled, starts, ends):
+    slot_of = {}
+    active = []
+    free = []
+    slots = 0
+    for interval in spilled:
+        while active and active[0][0] <= starts[interval]:
+            _, expired = heappop(active)
+            heappush(free, slot_of[expired])
+        if free:
+            slot_of[interval] = heappop(free)
+        else:
+            slot_of[interval] = slots
+            slots += 1
+        heappush(active, (ends[interval], interval))
+    return slot_of
@@ -1,20 +1,113 @@
+import argparse
+import sys
+
 from src.frontend.lexer import Lexer
 from src.frontend.parser import Parser
-from src.analysis.semantic import SemanticAnalyzer
+from src.analysis.semantic import SemanticAnalyzer, SemanticError
 from src.ir.ir_generator import IRGenerator
-from src.optimization.optimizer import Optimizer
+from src.ir.printer import format_instruction
+from src.optimization.optimizer import OPTIMIZATION_LEVELS, Optimizer
+from src.driver.batch import DEFAULT_CHUNK_BYTES, expand_inputs, run_batch
+from src.driver.pipeline import Compiler
 
 def print_ir(instructions, title):
     print(f"--- {title} ---")
-    for op, arg1, arg2, result in instructions:
-        if op == 'ASSIGN':
-            print(f"{result} = {arg1}")
-        else:
-            symbol = {'ADD': '+', 'SUB': '-', 'MUL': '*', 'DIV': '/'}.get(op, op)
-            print(f"{result} = {arg1} {symbol} {arg2}")
+    for instr in instructions:
+        print(format_instruction(*instr))
     print()
 
-def main():
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog='python3 -m src.main',
+        description='Compila arquivos fonte para TAC otimizado. Sem argumentos, executa o exemplo.',
+    )
+    parser.add_argument('inputs', nargs='*', help='arquivos ou globs (ex.: "src/**/*.c")')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='processos em paralelo (padrão: número de CPUs)')
+    parser.add_argument('-o', '--output-dir', default=None,
+                        help='diretório de saída (padrão: <arquivo>.tac ao lado da entrada)')
+    parser.add_argument('--cache-dir', default=None,
+                        help='diretório do cache de compilação em disco')
+    parser.add_argument('--chunk-bytes', type=int, default=DEFAULT_CHUNK_BYTES,
+                        help='tamanho alvo, em bytes, de cada lote enviado a um worker')
+    parser.add_argument('--binary', action='store_true',
+                        help='grava o TAC no formato binário (.tacb) em vez de texto')
+    parser.add_argument('-O', dest='level', type=int, choices=OPTIMIZATION_LEVELS, default=2,
+                        help='nível de otimização: 0 desliga, 1 só os passes originais, 2 todos (padrão)')
+    parser.add_argument('--max-iterations', type=int, default=None,
+                        help='máximo de rodadas do gerenciador de passes')
+    parser.add_argument('--time-budget', type=float, default=None, metavar='SECONDS',
+                        help='tempo máximo de otimização por arquivo')
+    parser.add_argument('--optimize-jobs', type=int, default=1, metavar='N',
+                        help='otimiza em N processos os trechos independentes de programas grandes (0: número de CPUs)')
+    parser.add_argument('--fused', action='store_true',
+                        help='frontend de passada única, sem AST (mesmo TAC, menor latência)')
+    parser.add_argument('--dag', action='store_true',
+                        help='compartilha subexpressões repetidas já na geração do TAC')
+    parser.add_argument('--sethi-ullman', action='store_true',
+                        help='gera o TAC na ordem de Sethi–Ullman, reaproveitando temporários')
+    parser.add_argument('--stream', action='store_true',
+                        help='compila com mmap e memória limitada, gravando a saída aos poucos (sem cache)')
+    parser.add_argument('--stats', metavar='FILE',
+                        help='perfila a compilação de um único arquivo e grava as estatísticas em JSON')
+    parser.add_argument('--trace', metavar='FILE',
+                        help='perfila a compilação de um único arquivo e grava um trace do Chrome')
+    args = parser.parse_args(argv)
+    if args.sethi_ullman and (args.fused or args.dag):
+        parser.error("--sethi-ullman cannot be combined with --fused or --dag")
+    if args.stream and (args.sethi_ullman or args.stats or args.trace):
+        parser.error("--stream cannot be combined with --sethi-ullman, --stats or --trace")
+    return args
+
+def make_optimizer(args):
+    return Optimizer(level=args.level, max_iterations=args.max_iterations, time_budget=args.time_budget,
+                     jobs=args.optimize_jobs)
+
+def compile_batch(args):
+    paths = expand_inputs(args.inputs)
+    if not paths:
+        print("No input files matched", file=sys.stderr)
+        return 1
+
+    report = run_batch(paths, jobs=args.jobs, output_dir=args.output_dir,
+                       cache_dir=args.cache_dir, chunk_bytes=args.chunk_bytes, binary=args.binary,
+                       optimizer=make_optimizer(args), fused=args.fused, dag=args.dag,
+                       sethi_ullman=args.sethi_ullman, stream=args.stream)
+    for outcome in report.failures:
+        print(f"{outcome.path}: {outcome.error_type}: {outcome.error}", file=sys.stderr)
+    print(report.summary())
+    return 1 if report.failures else 0
+
+def profile_file(args):
+    paths = expand_inputs(args.inputs)
+    if len(paths) != 1:
+        print("--stats and --trace need exactly one input file", file=sys.stderr)
+        return 1
+    try:
+        with open(paths[0], encoding='utf-8') as f:
+            compiler = Compiler(make_optimizer(args), instrument=True, fused=args.fused, dag=args.dag,
+                                sethi_ullman=args.sethi_ullman)
+            result = compiler.compile(f.read())
+    except (SemanticError, SyntaxError, RuntimeError, ZeroDivisionError, OSError, UnicodeDecodeError) as e:
+        print(f"{paths[0]}: {type(e).__name__}: {e}", file=sys.stderr)
+        return 1
+    if args.stats:
+        result.stats.write_json(args.stats)
+    if args.trace:
+        result.stats.write_chrome_trace(args.trace)
+    print(result.stats.summary())
+    return 0
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    if args.stats or args.trace:
+        return profile_file(args)
+    if args.inputs:
+        return compile_batch(args)
+    run_example()
+    return 0
+
+def run_example():
     source_code = """
     int a;
     int b;
@@ -52,4 +145,4 @@ def main():
     print_ir(optimized_ir, "Optimized Intermediate Code")
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -1,3 +1,4 @@
-from .optimizer import Optimizer
+from .optimizer import OPTIMIZATION_LEVELS, OUTPUT_OPTIONS, Optimizer
+from .pass_manager import OptimizationStats, PassManager, PassStatistics
 
-__all__ = ['Optimizer']
+__all__ = ['OPTIMIZATION_LEVELS', 'OUTPUT_OPTIONS', 'Optimizer', 'OptimizationStats', 'PassManager', 'PassStatistics']
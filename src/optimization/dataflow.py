@@ -0,0 +1,51 @@
+from array import array
+
+from src.ir.compact import OP_NOP
+
+
+class DefUse:
+    """Cadeias def-use de um programa `CompactIR` em linha reta.
+
+    Cada operando é identificado por `2 * i + slot` (slot 0 para arg1, 1 para
+    arg2). `reaching[operando]` é o índice da instrução cuja definição alcança
+    aquele uso (-1 para literais, entradas e operandos ausentes) e os usos de
+    cada definição ficam em formato CSR: `uses[starts[d]:starts[d + 1]]`.
+    """
+
+    def __init__(self, ir):
+        count = len(ir)
+        reaching = array('q', [-1]) * (2 * count)
+        last_def = {}
+        for index, (op, arg1, arg2, result) in enumerate(zip(ir.ops, ir.arg1, ir.arg2, ir.result)):
+            if op == OP_NOP:
+                continue
+            if arg1 & 2:
+                definition = last_def.get(arg1)
+                if definition is not None:
+                    reaching[2 * index] = definition
+            if arg2 & 2:
+                definition = last_def.get(arg2)
+                if definition is not None:
+                    reaching[2 * index + 1] = definition
+            last_def[result] = index
+
+        starts = array('q', [0]) * (count + 1)
+        for definition in reaching:
+            if definition >= 0:
+                starts[definition + 1] += 1
+        for index in range(count):
+            starts[index + 1] += starts[index]
+
+        uses = array('q', [0]) * starts[count]
+        fill = starts[:count]
+        for operand, definition in enumerate(reaching):
+            if definition >= 0:
+                uses[fill[definition]] = operand
+                fill[definition] += 1
+
+        self.reaching = reaching
+        self.starts = starts
+        self.uses = uses
+
+    def users(self, definition):
+        return self.uses[self.starts[definition]:self.starts[definition + 1]]
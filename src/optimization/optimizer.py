@@ -1,23 +1,439 @@
+import operator
+from collections import deque
+
+from src.ir.compact import (
+    CompactIR, NONE, OP_NOP, OP_ASSIGN, OP_ADD, OP_SUB, OP_MUL, OP_DIV, OP_SHL, OP_SHR,
+    TAG_CONST, TAG_TEMP, TAG_VAR, is_temp,
+)
+from src.optimization.dataflow import DefUse
+from src.optimization.partition import MIN_PARALLEL_INSTRUCTIONS, optimize_partitioned
+from src.optimization.pass_manager import OptimizationStats, PassManager, PassStatistics
+
+OPTIMIZATION_LEVELS = (0, 1, 2)
+# Opções do `Optimizer` que mudam o TAC gerado (e entram na chave do cache);
+# `jobs` e `parallel_threshold` só mudam como ele é calculado.
+OUTPUT_OPTIONS = ('value_numbering', 'algebraic', 'liveness', 'level', 'max_iterations', 'time_budget')
+
+FOLDABLE_OPS = {
+    OP_ADD: operator.add,
+    OP_SUB: operator.sub,
+    OP_MUL: operator.mul,
+    OP_DIV: operator.floordiv,
+    OP_SHL: operator.lshift,
+    OP_SHR: operator.rshift,
+}
+COMMUTATIVE_OPS = {OP_ADD, OP_MUL}
+
+# (opcode, operando constante (1 = arg1, 2 = arg2), valor) -> (regra, reescrita).
+# COPY_OTHER copia o outro operando; um inteiro vira essa constante. Como no
+# resto do compilador, a divisão por zero em tempo de execução não é
+# preservada: `0 / x` vira 0 sem olhar para x.
+COPY_OTHER = 'copy'
+ALGEBRAIC_RULES = {
+    (OP_ADD, 1, 0): ('x + 0', COPY_OTHER),
+    (OP_ADD, 2, 0): ('x + 0', COPY_OTHER),
+    (OP_SUB, 2, 0): ('x - 0', COPY_OTHER),
+    (OP_MUL, 1, 1): ('x * 1', COPY_OTHER),
+    (OP_MUL, 2, 1): ('x * 1', COPY_OTHER),
+    (OP_MUL, 1, 0): ('x * 0', 0),
+    (OP_MUL, 2, 0): ('x * 0', 0),
+    (OP_DIV, 2, 1): ('x / 1', COPY_OTHER),
+    (OP_DIV, 1, 0): ('0 / x', 0),
+    (OP_SHL, 2, 0): ('x << 0', COPY_OTHER),
+    (OP_SHR, 2, 0): ('x >> 0', COPY_OTHER),
+}
+# Multiplicação e divisão (piso) por 2^k viram shifts, com k na constante.
+STRENGTH_RULES = {
+    (OP_MUL, 1): ('x * 2^k', OP_SHL),
+    (OP_MUL, 2): ('x * 2^k', OP_SHL),
+    (OP_DIV, 2): ('x / 2^k', OP_SHR),
+}
+
 class Optimizer:
-    """Otimizador de código intermediário com propagação de constantes e eliminação de código morto."""
+    """Otimizador de código intermediário com propagação de constantes e eliminação de código morto.
+
+    `optimize()` converte o TAC para `CompactIR` e roda as versões por
+    worklist dos passes, guiadas por cadeias def-use, sobre os arrays de
+    inteiros. Com `value_numbering=False`, `algebraic=False` e
+    `liveness=False` o resultado é o mesmo de iterar `constant_propagation()`
+    e `dead_code_elimination()` sobre as tuplas até o ponto fixo.
+
+    `live_out` são as variáveis cujo valor final importa; por padrão, todas
+    as variáveis nomeadas do programa.
+
+    `level` escolhe o pipeline do `PassManager`: 0 não otimiza, 1 roda só a
+    propagação de constantes e a eliminação de temporários mortos (o mesmo
+    resultado das três opções em False) e 2, o padrão, roda os passes
+    ligados pelas opções. `max_iterations` e `time_budget` (segundos) limitam
+    o trabalho do `PassManager` em entradas enormes.
+
+    Com `jobs` > 1, `optimize()` divide programas com pelo menos
+    `parallel_threshold` instruções em componentes sem nomes em comum e os
+    otimiza em paralelo (veja `partition.optimize_partitioned()`); o
+    resultado é o mesmo do caminho serial. Com limites ou `stats` o caminho
+    é sempre serial, porque o orçamento e as estatísticas são do programa
+    inteiro.
+    """
+
+    def __init__(self, value_numbering=True, algebraic=True, liveness=True, level=2,
+                 max_iterations=None, time_budget=None, jobs=1,
+                 parallel_threshold=MIN_PARALLEL_INSTRUCTIONS):
+        if level not in OPTIMIZATION_LEVELS:
+            raise ValueError(f"Unknown optimization level: {level}")
+        self.value_numbering = value_numbering
+        self.algebraic = algebraic
+        self.liveness = liveness
+        self.level = level
+        self.max_iterations = max_iterations
+        self.time_budget = time_budget
+        self.jobs = jobs
+        self.parallel_threshold = parallel_threshold
+
+    def optimize(self, instructions, live_out=None, stats=None):
+        if (self.jobs != 1 and self.level > 0 and stats is None and self.max_iterations is None
+                and self.time_budget is None and len(instructions) >= self.parallel_threshold):
+            return optimize_partitioned(self, instructions, live_out, self.jobs)
+        return self.optimize_compact(CompactIR.from_tuples(instructions), live_out, stats).to_tuples()
+
+    def pass_manager(self, live_out=None):
+        """`PassManager` com os passes do nível configurado."""
+        manager = PassManager(self.max_iterations, self.time_budget)
+        if self.level == 0:
+            return manager
+        # Nenhum passe deixa constantes por propagar: a numeração de valores e
+        # as regras algébricas propagam e dobram as constantes que criam.
+        manager.register('constant_propagation', self.sparse_constant_propagation, rerun_after=())
+        if self.level == 1:
+            return manager.register('dead_code', lambda ir, analyses: self.worklist_dead_code_elimination(ir))
+        if self.algebraic:
+            manager.register('algebraic', lambda ir, analyses: self.algebraic_simplification(ir, analyses=analyses),
+                             rerun_after=('constant_propagation', 'value_numbering'))
+        if self.value_numbering:
+            manager.register('value_numbering', lambda ir, analyses: self.local_value_numbering(ir),
+                             rerun_after=('constant_propagation', 'algebraic'))
+        if self.liveness:
+            manager.register('dead_code',
+                             lambda ir, analyses: self.liveness_dead_code_elimination(ir, live_out))
+        else:
+            manager.register('dead_code', lambda ir, analyses: self.worklist_dead_code_elimination(ir))
+        return manager
+
+    def optimize_compact(self, ir, live_out=None, stats=None):
+        """Roda os passes sobre `ir`; com `stats` (`OptimizationStats`), registra cada execução."""
+        return self.pass_manager(live_out).run(ir, stats)
+
+    def sparse_constant_propagation(self, ir, analyses=None):
+        # Cada instrução entra na worklist uma única vez, quando todos os seus
+        # operandos passam a ser constantes.
+        def_use = DefUse(ir) if analyses is None else analyses.get('def_use', ir)
+        ops, arg1s, arg2s = ir.ops, ir.arg1, ir.arg2
+        const_values = ir.const_values
+        pending = []
+        worklist = []
+        for index, (op, arg1, arg2) in enumerate(zip(ops, arg1s, arg2s)):
+            unknown = ((arg1 >> 1) & 1) + ((arg2 >> 1) & 1)
+            pending.append(unknown)
+            if unknown == 0 and op != OP_NOP:
+                worklist.append(index)
+
+        starts, uses = def_use.starts, def_use.uses
+        changed = False
+        while worklist:
+            index = worklist.pop()
+            op = ops[index]
+            if op == OP_ASSIGN:
+                value = arg1s[index]
+            elif op in FOLDABLE_OPS:
+                value = ir.constant(FOLDABLE_OPS[op](const_values[arg1s[index] >> 2],
+                                                     const_values[arg2s[index] >> 2]))
+                ops[index] = OP_ASSIGN
+                arg1s[index] = value
+                arg2s[index] = NONE
+                changed = True
+            else:
+                continue
+            for position in range(starts[index], starts[index + 1]):
+                operand = uses[position]
+                user = operand >> 1
+                if operand & 1:
+                    arg2s[user] = value
+                else:
+                    arg1s[user] = value
+                changed = True
+                pending[user] -= 1
+                if pending[user] == 0:
+                    worklist.append(user)
+
+        return ir, changed
+
+    def algebraic_simplification(self, ir, counts=None, analyses=None):
+        # Identidades com um operando constante vêm de ALGEBRAIC_RULES; `x - x`
+        # e a redução de força por potências de 2 são tratadas à parte. Uma
+        # instrução que vira constante é propagada aos seus usos pelas cadeias
+        # def-use e eles voltam à worklist, então `(x - x) * y + z` se resolve
+        # numa passada só. Espera que as constantes já atribuídas tenham sido
+        # propagadas (a propagação de constantes roda antes). Se `counts` for
+        # dado, acumula quantas instruções cada regra reescreveu.
+        ops, arg1s, arg2s = ir.ops, ir.arg1, ir.arg2
+        const_values = ir.const_values
+        chains = []
 
-    def optimize(self, instructions):
-        changed = True
-        current_ir = instructions
-        while changed:
-            changed = False
+        def def_use():
+            # Construídas só quando alguma regra precisa delas, a partir do
+            # estado atual das instruções.
+            if not chains:
+                built = DefUse(ir) if analyses is None else analyses.get('def_use', ir)
+                chains.extend((built.reaching, built.starts, built.uses))
+            return chains
 
-            new_ir, folded = self.constant_propagation(current_ir)
-            if folded:
+        # Um slot só recebe a constante da definição que ainda o alcança:
+        # operandos descartados por uma regra têm `reaching` zerado, e o
+        # operando que sobrevive em arg2 é movido para arg1 junto com seu uso.
+        def move_to_arg1(index):
+            reaching, starts, uses = def_use()
+            definition = reaching[2 * index + 1]
+            if definition < 0:
+                return
+            for position in range(starts[definition], starts[definition + 1]):
+                if uses[position] == 2 * index + 1:
+                    uses[position] = 2 * index
+            reaching[2 * index] = definition
+            reaching[2 * index + 1] = -1
+
+        worklist = [
+            index for index in range(len(ops) - 1, -1, -1)
+            if ops[index] > OP_ASSIGN and (arg1s[index] & 3 == TAG_CONST or arg2s[index] & 3 == TAG_CONST
+                                           or arg1s[index] == arg2s[index])
+        ]
+        changed = False
+        while worklist:
+            index = worklist.pop()
+            op = ops[index]
+            if op == OP_NOP or op == OP_ASSIGN:
+                continue
+            arg1, arg2 = arg1s[index], arg2s[index]
+            rule = None
+            if arg1 & 3 == TAG_CONST and arg2 & 3 == TAG_CONST:
+                ops[index] = OP_ASSIGN
+                arg1s[index] = ir.constant(FOLDABLE_OPS[op](const_values[arg1 >> 2], const_values[arg2 >> 2]))
+                arg2s[index] = NONE
                 changed = True
-                current_ir = new_ir
+            else:
+                for slot, constant, other in ((2, arg2, arg1), (1, arg1, arg2)):
+                    if constant & 3 != TAG_CONST:
+                        continue
+                    value = const_values[constant >> 2]
+                    rewrite = ALGEBRAIC_RULES.get((op, slot, value))
+                    if rewrite is not None:
+                        rule, result = rewrite
+                        if result == COPY_OTHER and slot == 1:
+                            move_to_arg1(index)
+                        ops[index] = OP_ASSIGN
+                        arg1s[index] = other if result == COPY_OTHER else ir.constant(result)
+                        arg2s[index] = NONE
+                        break
+                    reduction = STRENGTH_RULES.get((op, slot))
+                    if reduction is not None and value > 1 and value & (value - 1) == 0:
+                        if slot == 1:
+                            move_to_arg1(index)
+                        rule, ops[index] = reduction
+                        arg1s[index] = other
+                        arg2s[index] = ir.constant(value.bit_length() - 1)
+                        break
+                else:
+                    if op == OP_SUB and arg1 == arg2 and arg1 & 2:
+                        rule = 'x - x'
+                        ops[index] = OP_ASSIGN
+                        arg1s[index] = ir.constant(0)
+                        arg2s[index] = NONE
+                if rule is None:
+                    continue
+                if arg1s[index] & 3 == TAG_CONST:
+                    reaching = def_use()[0]
+                    reaching[2 * index] = reaching[2 * index + 1] = -1
+                changed = True
+                if counts is not None:
+                    counts[rule] = counts.get(rule, 0) + 1
 
-            new_ir, eliminated = self.dead_code_elimination(current_ir)
-            if eliminated:
+            value = arg1s[index]
+            if ops[index] != OP_ASSIGN or value & 3 != TAG_CONST:
+                continue
+            reaching, starts, uses = def_use()
+            for position in range(starts[index], starts[index + 1]):
+                operand = uses[position]
+                if reaching[operand] != index:
+                    continue
+                reaching[operand] = -1
+                user = operand >> 1
+                if operand & 1:
+                    arg2s[user] = value
+                else:
+                    arg1s[user] = value
+                worklist.append(user)
+
+        return ir, changed
+
+    def local_value_numbering(self, ir):
+        # Numeração de valores em uma passada: (op, vn(arg1), vn(arg2)) vira
+        # chave de uma tabela hash, com operandos de ADD/MUL em ordem canônica.
+        # Um cálculo repetido vira cópia do nome que ainda guarda o valor, e
+        # os usos seguintes leem esse nome, deixando a cópia para o DCE.
+        ops, arg1s, arg2s, results = ir.ops, ir.arg1, ir.arg2, ir.result
+        const_values = ir.const_values
+        value_numbers = {}
+        first_holder = []
+        other_holders = {}
+        table = {}
+        changed = False
+
+        def holder(value):
+            # Nomes reatribuídos deixam de guardar o valor e são descartados
+            # aqui, sob demanda; constantes são sempre válidas.
+            name = first_holder[value]
+            if name is not None and (not name & 2 or value_numbers.get(name) == value):
+                return name
+            others = other_holders.get(value)
+            while others:
+                name = others.popleft()
+                if not name & 2 or value_numbers.get(name) == value:
+                    first_holder[value] = name
+                    return name
+            first_holder[value] = None
+            return None
+
+        def number(operand):
+            value = value_numbers.get(operand)
+            if value is None:
+                value = value_numbers[operand] = len(first_holder)
+                first_holder.append(operand)
+            return value
+
+        for index, op in enumerate(ops):
+            if op == OP_NOP:
+                continue
+            arg1, arg2, result = arg1s[index], arg2s[index], results[index]
+            left = number(arg1)
+            if arg1 & 2 and first_holder[left] != arg1:
+                canonical = holder(left)
+                if canonical is not None and canonical != arg1:
+                    arg1s[index] = arg1 = canonical
+                    changed = True
+
+            if op == OP_ASSIGN:
+                value = left
+            elif op in FOLDABLE_OPS:
+                right = number(arg2)
+                if arg2 & 2 and first_holder[right] != arg2:
+                    canonical = holder(right)
+                    if canonical is not None and canonical != arg2:
+                        arg2s[index] = arg2 = canonical
+                        changed = True
+                if arg1 & 3 == TAG_CONST and arg2 & 3 == TAG_CONST:
+                    # Operandos trocados por constantes podem deixar o cálculo
+                    # todo constante; dobrá-lo aqui poupa outra rodada de passes.
+                    ops[index] = OP_ASSIGN
+                    arg1s[index] = ir.constant(FOLDABLE_OPS[op](const_values[arg1 >> 2],
+                                                                const_values[arg2 >> 2]))
+                    arg2s[index] = NONE
+                    changed = True
+                    value = number(arg1s[index])
+                else:
+                    key = (op, right, left) if op in COMMUTATIVE_OPS and left > right else (op, left, right)
+                    value = table.get(key)
+                    if value is None:
+                        value = table[key] = len(first_holder)
+                        first_holder.append(None)
+                    else:
+                        canonical = holder(value)
+                        if canonical is not None and canonical != result:
+                            ops[index] = OP_ASSIGN
+                            arg1s[index] = canonical
+                            arg2s[index] = NONE
+                            changed = True
+            else:
+                value = len(first_holder)
+                first_holder.append(None)
+
+            if value_numbers.get(result) == value:
+                ops[index] = OP_NOP
+                changed = True
+                continue
+            value_numbers[result] = value
+            if first_holder[value] is None:
+                first_holder[value] = result
+            else:
+                other_holders.setdefault(value, deque()).append(result)
+
+        return ir, changed
+
+    def liveness_dead_code_elimination(self, ir, live_out=None):
+        # Varredura única de trás para frente: uma definição cujo resultado não
+        # está vivo é removida, senão o resultado morre e os operandos nascem.
+        # Remove numa passada cadeias mortas inteiras e stores sobrescritos
+        # (`a = 1; a = 2;`). O conjunto vivo é um bytearray indexado pelo próprio
+        # operando: os ids de nomes e temporários são densos, então o tamanho é
+        # proporcional aos pools, não ao número do maior `t<N>`. Temporários
+        # nunca estão vivos na saída.
+        ops, arg1s, arg2s, results = ir.ops, ir.arg1, ir.arg2, ir.result
+        if live_out is None:
+            live_operands = [(symbol << 2) | TAG_VAR for symbol in range(len(ir.names))]
+        else:
+            # Codificados antes de dimensionar: um nome de fora do programa entra no pool.
+            live_operands = [ir.encode(name) for name in live_out]
+        live = bytearray(4 * max(len(ir.names), len(ir.temps)))
+        for operand in live_operands:
+            if operand & 2:
+                live[operand] = 1
+
+        changed = False
+        for index in range(len(ops) - 1, -1, -1):
+            if ops[index] == OP_NOP:
+                continue
+            result = results[index]
+            if not live[result]:
+                ops[index] = OP_NOP
+                changed = True
+                continue
+            live[result] = 0
+            arg1, arg2 = arg1s[index], arg2s[index]
+            if arg1 & 2:
+                live[arg1] = 1
+            if arg2 & 2:
+                live[arg2] = 1
+
+        return ir, changed
+
+    def worklist_dead_code_elimination(self, ir):
+        # Ao remover uma definição morta, os usos dos seus operandos são
+        # decrementados; temporários que ficam sem uso entram na worklist. Só
+        # temporários (`TAG_TEMP`) são removidos: uma variável do usuário, mesmo
+        # começando com 't' (`total`), pode estar viva na saída.
+        ops, arg1s, arg2s = ir.ops, ir.arg1, ir.arg2
+        use_counts = {}
+        definitions = {}
+        for index, (op, arg1, arg2, result) in enumerate(zip(ops, arg1s, arg2s, ir.result)):
+            if op == OP_NOP:
+                continue
+            if arg1 & 2: use_counts[arg1] = use_counts.get(arg1, 0) + 1
+            if arg2 & 2: use_counts[arg2] = use_counts.get(arg2, 0) + 1
+            definitions.setdefault(result, []).append(index)
+
+        worklist = [name for name in definitions if name & 3 == TAG_TEMP and name not in use_counts]
+        changed = False
+        while worklist:
+            for index in definitions[worklist.pop()]:
+                if ops[index] == OP_NOP:
+                    continue
+                ops[index] = OP_NOP
                 changed = True
-                current_ir = new_ir
+                for arg in (arg1s[index], arg2s[index]):
+                    if not arg & 2:
+                        continue
+                    use_counts[arg] -= 1
+                    if use_counts[arg] == 0 and arg & 3 == TAG_TEMP and arg in definitions:
+                        worklist.append(arg)
 
-        return current_ir
+        return ir, changed
 
     def constant_propagation(self, instructions):
         constants = {}
@@ -73,7 +489,8 @@ class Optimizer:
         for instr in instructions:
             op, arg1, arg2, result = instr
 
-            if result.startswith('t') and result not in used_vars:
+            # Só temporários do IRGenerator: `total` é uma variável do usuário.
+            if is_temp(result) and result not in used_vars:
                 changed = True
                 continue
             new_instructions.append(instr)
@@ -82,6 +499,7 @@ class Optimizer:
 
     def is_number(self, s):
         if s is None: return False
+        if s[:1].isalpha() or s[:1] == '_': return False
         try:
             int(s)
             return True
@@ -0,0 +1,198 @@
+import atexit
+import heapq
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from src.ir.compact import OPCODES, OP_NOP, TAG_CONST, TAG_NONE, CompactIR
+from src.optimization.pass_manager import OptimizationStats
+
+# Abaixo disso o custo de mandar o TAC para outros processos supera o ganho.
+MIN_PARALLEL_INSTRUCTIONS = 20_000
+# Fatias por worker: mais fatias equilibram melhor componentes de tamanhos diferentes.
+SLICES_PER_JOB = 4
+
+# Um pool só, recriado se `jobs` mudar e encerrado por `shutdown()` ou na saída.
+_pool = None
+_pool_jobs = None
+
+
+def dependency_components(ir):
+    """Particiona as instruções de `ir` em componentes que não compartilham variáveis nem temporários.
+
+    Duas instruções ficam no mesmo componente quando alguma variável ou
+    temporário liga as duas, direta ou indiretamente; constantes não ligam
+    nada. Devolve os índices de cada componente em ordem crescente, com os
+    componentes na ordem da sua primeira instrução.
+    """
+    parent = {}
+
+    def find(operand):
+        # Só quem não é raiz aparece em `parent`; o caminho é comprimido.
+        root = operand
+        while root in parent:
+            root = parent[root]
+        while operand != root:
+            parent[operand], operand = root, parent[operand]
+        return root
+
+    roots = []
+    for op, arg1, arg2, result in zip(ir.ops, ir.arg1, ir.arg2, ir.result):
+        if op == OP_NOP:
+            roots.append(None)
+            continue
+        root = find(result)
+        for operand in (arg1, arg2):
+            tag = operand & 3
+            if tag != TAG_NONE and tag != TAG_CONST:
+                other = find(operand)
+                if other != root:
+                    # O resultado (muitas vezes um temporário novo) vai para
+                    # baixo da raiz do operando, que já existia.
+                    parent[root] = other
+                    root = other
+        roots.append(root)
+
+    components = {}
+    for index, root in enumerate(roots):
+        if root is not None:
+            components.setdefault(find(root), []).append(index)
+    return list(components.values())
+
+
+def balance(components, slices):
+    """Distribui os componentes em até `slices` fatias de tamanho parecido (maiores primeiro).
+
+    Cada fatia é a lista ordenada dos índices das suas instruções.
+    """
+    heap = [(0, number, []) for number in range(min(slices, len(components)))]
+    for component in sorted(components, key=len, reverse=True):
+        size, number, indices = heapq.heappop(heap)
+        indices.extend(component)
+        heapq.heappush(heap, (size + len(component), number, indices))
+    return [sorted(indices) for _, _, indices in sorted(heap, key=lambda entry: entry[1]) if indices]
+
+
+def _optimize_slice(optimizer, ir, live_out, history, schedule):
+    # Roda no worker e devolve o traço (passe, mudou) das execuções novas e
+    # o IR da fatia, que ainda tem as instruções removidas como NOP: a
+    # posição i continua sendo a instrução i da fatia, e o estado pode ser
+    # retomado depois.
+    stats = OptimizationStats()
+    ir = optimizer.pass_manager(live_out).run(ir, stats, schedule, history)
+    return [(execution.name, execution.changed) for execution in stats.passes], ir
+
+
+def replay_schedule(manager, traces):
+    """Reconstrói o escalonamento do `PassManager` no programa inteiro a partir dos traços das fatias.
+
+    No programa inteiro um passe "mudou" se mudou alguma fatia, e é isso que
+    decide o que roda depois. Devolve os passes do escalonamento global até
+    o primeiro em que alguma fatia fez outra coisa, e os índices dessas
+    fatias (vazio se todas seguiram o escalonamento global até o fim).
+    """
+    ran_at = {}
+    changed_at = {}
+    steps = []
+    while True:
+        ran = False
+        for registered in manager.passes:
+            if not manager._has_new_work(registered, ran_at, changed_at):
+                continue
+            ran = True
+            step = len(steps)
+            steps.append(registered.name)
+            diverged = [number for number, trace in enumerate(traces)
+                        if step >= len(trace) or trace[step][0] != registered.name]
+            if diverged:
+                return steps, diverged
+            ran_at[registered.name] = step + 1
+            if any(trace[step][1] for trace in traces):
+                changed_at[registered.name] = step + 1
+        if not ran:
+            return steps, []
+
+
+def _executor(jobs):
+    global _pool, _pool_jobs
+    if _pool is None or _pool_jobs != jobs:
+        shutdown()
+        _pool, _pool_jobs = ProcessPoolExecutor(max_workers=jobs), jobs
+    return _pool
+
+
+def shutdown():
+    """Encerra os workers da otimização particionada; o próximo uso cria um pool novo."""
+    global _pool, _pool_jobs
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = _pool_jobs = None
+
+
+atexit.register(shutdown)
+
+
+def optimize_partitioned(optimizer, instructions, live_out=None, jobs=None):
+    """Otimiza os componentes independentes de `instructions` em paralelo e junta tudo na ordem original.
+
+    Nenhum passe relaciona instruções sem nomes em comum (cálculos só com
+    constantes são dobrados), mas o `PassManager` decide quais passes rodam
+    de novo olhando o programa inteiro: uma mudança num componente faz um
+    passe rodar de novo em todos. Cada fatia roda até o próprio ponto fixo
+    e devolve o seu traço; as fatias cujo traço se afasta do escalonamento
+    global (`replay_schedule()`) rodam de novo com ele imposto, até todas o
+    seguirem. O resultado é então o mesmo do caminho serial: cada instrução
+    mantém a sua posição e os seus nomes, e a junção é só uma intercalação
+    pelos índices originais. Cada fatia leva só as entradas dos pools que
+    usa (`CompactIR.select()`) e só os nomes de `live_out` que aparecem
+    nela, então o que vai para os workers cresce com a fatia, não com o
+    programa; `live_out=None` continua significando todas as variáveis.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    if multiprocessing.parent_process() is not None:
+        # Dentro de um worker (do lote ou do servidor) o paralelismo já está
+        # fora; um pool aninhado só manteria processos presos ao worker.
+        jobs = 1
+    ir = CompactIR.from_tuples(instructions)
+    components = dependency_components(ir) if jobs > 1 else ()
+    if len(components) < 2:
+        return optimizer.optimize_compact(ir, live_out).to_tuples()
+    groups = balance(components, jobs * SLICES_PER_JOB)
+    slices = [ir.select(indices) for indices in groups]
+    if live_out is None:
+        live_outs = [None] * len(slices)
+    else:
+        live_out = set(live_out)
+        live_outs = [[name for name in part.names if name in live_out] for part in slices]
+    executor = _executor(jobs)
+    manager = optimizer.pass_manager(live_out)
+    count = len(slices)
+    runs = executor.map(_optimize_slice, [optimizer] * count, slices, live_outs, [()] * count, [()] * count)
+    results = [list(result) for result in runs]
+    while True:
+        schedule, diverged = replay_schedule(manager, [trace for trace, _ in results])
+        if not diverged:
+            break
+        # Uma fatia que só parou antes (o traço acabou) retoma do estado em
+        # que parou; uma que pulou um passe do escalonamento global recomeça.
+        resumes = [len(results[number][0]) == len(schedule) - 1 for number in diverged]
+        runs = executor.map(
+            _optimize_slice,
+            [optimizer] * len(diverged),
+            [results[number][1] if resume else slices[number] for number, resume in zip(diverged, resumes)],
+            [live_outs[number] for number in diverged],
+            [results[number][0] if resume else () for number, resume in zip(diverged, resumes)],
+            [schedule[-1:] if resume else schedule for resume in resumes],
+        )
+        for number, resume, (trace, state) in zip(diverged, resumes, runs):
+            results[number] = [results[number][0] + trace if resume else trace, state]
+
+    # Cada fatia tem os próprios pools (renumerados por `select()`, mais as
+    # constantes novas dos passes), então cada uma é decodificada com os seus.
+    merged = [None] * len(ir)
+    for indices, (_, state) in zip(groups, results):
+        decode = state.decode
+        for index, op, arg1, arg2, result in zip(indices, state.ops, state.arg1, state.arg2, state.result):
+            if op != OP_NOP:
+                merged[index] = (OPCODES[op], decode(arg1), decode(arg2), decode(result))
+    return [instruction for instruction in merged if instruction is not None]
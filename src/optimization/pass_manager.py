@@ -0,0 +1,185 @@
+import time
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Tuple
+
+from src.ir.compact import OP_NOP
+from src.optimization.dataflow import DefUse
+
+# Análises que os passes podem pedir ao cache, por nome.
+ANALYSES = {
+    'def_use': DefUse,
+}
+
+
+@dataclass
+class PassStatistics:
+    """Uma execução de passe: instante de início (`perf_counter`), duração e instruções removidas."""
+    name: str
+    iteration: int
+    start: float
+    seconds: float
+    removed: int
+    changed: bool
+
+
+@dataclass
+class OptimizationStats:
+    """Estatísticas de `Optimizer.optimize()`.
+
+    `iterations` conta as rodadas do `PassManager` em que algum passe rodou;
+    `budget_exhausted` diz se o orçamento de tempo interrompeu a otimização.
+    """
+    iterations: int = 0
+    passes: List[PassStatistics] = field(default_factory=list)
+    budget_exhausted: bool = False
+    analyses_built: int = 0
+    analyses_reused: int = 0
+
+
+def _nop_count(ir):
+    # bytes() funciona tanto para array('B') quanto para o memoryview de read_binary().
+    return bytes(ir.ops).count(OP_NOP)
+
+
+class AnalysisCache:
+    """Análises compartilhadas entre passes, válidas até algum passe mudar o IR.
+
+    `get()` constrói a análise na primeira vez que um passe a pede; passes que
+    não mudam o IR deixam o resultado para o próximo. Um passe que reporta
+    mudança invalida tudo, então ele pode reaproveitar as estruturas da
+    análise como rascunho enquanto reescreve o IR.
+    """
+
+    def __init__(self):
+        self._results = {}
+        self.built = 0
+        self.reused = 0
+
+    def get(self, name, ir):
+        result = self._results.get(name)
+        if result is None:
+            result = self._results[name] = ANALYSES[name](ir)
+            self.built += 1
+        else:
+            self.reused += 1
+        return result
+
+    def invalidate(self):
+        self._results.clear()
+
+
+@dataclass
+class RegisteredPass:
+    """Passe `run(ir, analyses) -> (ir, mudou)`.
+
+    `rerun_after` são os passes cujas mudanças podem criar trabalho novo para
+    este; `None` significa qualquer passe. Um passe nunca roda de novo só por
+    causa das próprias mudanças, porque cada um já chega ao seu ponto fixo.
+    """
+    name: str
+    run: Callable
+    rerun_after: Optional[Tuple[str, ...]] = None
+
+
+class PassManager:
+    """Roda os passes registrados, em ordem, até nenhum deles ter trabalho novo.
+
+    Depois da primeira rodada, um passe só roda de novo se algum passe de
+    `rerun_after` mudou o IR desde a sua última execução. `max_iterations`
+    limita o número de rodadas e `time_budget` (segundos) o tempo total:
+    esgotado o orçamento, os passes restantes são pulados e o IR fica como
+    está, ainda correto, só menos otimizado.
+
+    `run(history=..., schedule=...)` serve à otimização particionada, que
+    reproduz numa fatia o escalonamento do programa inteiro: `history` são
+    pares (passe, mudou) já aplicados ao IR, contados como se tivessem
+    rodado agora, e `schedule` são passes que rodam em seguida, na ordem,
+    antes de voltar a decidir pelo `rerun_after`.
+    """
+
+    def __init__(self, max_iterations=None, time_budget=None):
+        self.passes = []
+        self.max_iterations = max_iterations
+        self.time_budget = time_budget
+
+    def register(self, name, run, rerun_after=None):
+        self.passes.append(RegisteredPass(name, run, rerun_after))
+        return self
+
+    def run(self, ir, stats=None, schedule=(), history=()):
+        analyses = AnalysisCache()
+        deadline = None if self.time_budget is None else time.perf_counter() + self.time_budget
+        # Cada execução de passe ganha um número de sequência; um passe tem
+        # trabalho novo se algum passe de `rerun_after` mudou o IR depois dele.
+        ran_at = {}
+        changed_at = {}
+        step = 0
+        iteration = 0
+        exhausted = False
+        replayed = 0
+        forced = 0
+        while not exhausted and (self.max_iterations is None or iteration < self.max_iterations):
+            ran = False
+            for registered in self.passes:
+                if replayed < len(history):
+                    name, changed = history[replayed]
+                    if registered.name != name:
+                        continue
+                    replayed += 1
+                    if not ran:
+                        iteration += 1
+                        ran = True
+                    step += 1
+                    ran_at[name] = step
+                    if changed:
+                        changed_at[name] = step
+                    continue
+                if forced < len(schedule):
+                    if registered.name != schedule[forced]:
+                        continue
+                    forced += 1
+                elif not self._has_new_work(registered, ran_at, changed_at):
+                    continue
+                if deadline is not None and time.perf_counter() >= deadline:
+                    exhausted = True
+                    break
+                if not ran:
+                    iteration += 1
+                    ran = True
+                step += 1
+                ran_at[registered.name] = step
+                if stats is None:
+                    ir, changed = registered.run(ir, analyses)
+                else:
+                    ir, changed = self._run_instrumented(registered, ir, analyses, iteration, stats)
+                if changed:
+                    changed_at[registered.name] = step
+                    analyses.invalidate()
+            if not ran:
+                break
+
+        if stats is not None:
+            stats.iterations += iteration
+            stats.budget_exhausted = stats.budget_exhausted or exhausted
+            stats.analyses_built += analyses.built
+            stats.analyses_reused += analyses.reused
+        return ir
+
+    @staticmethod
+    def _has_new_work(registered, ran_at, changed_at):
+        last = ran_at.get(registered.name)
+        if last is None:
+            return True
+        names = changed_at if registered.rerun_after is None else registered.rerun_after
+        return any(changed_at.get(name, 0) > last for name in names if name != registered.name)
+
+    @staticmethod
+    def _run_instrumented(registered, ir, analyses, iteration, stats):
+        before = _nop_count(ir)
+        start = time.perf_counter()
+        ir, changed = registered.run(ir, analyses)
+        seconds = time.perf_counter() - start
+        stats.passes.append(PassStatistics(
+            registered.name, iteration, start, seconds, _nop_count(ir) - before, changed,
+        ))
+        return ir, changed
@@ -0,0 +1,6 @@
+# O servidor (`src.service.server`) não é reexportado: importá-lo carrega o
+# compilador inteiro, e o cliente deve continuar leve.
+from .client import CompileClient, CompileError
+from .protocol import ProtocolError, encode_message, recv_message
+
+__all__ = ['CompileClient', 'CompileError', 'ProtocolError', 'encode_message', 'recv_message']
@@ -0,0 +1,72 @@
+import socket
+
+from src.service.protocol import ProtocolError, encode_message, recv_message
+
+
+class CompileError(Exception):
+    """Erro de compilação reportado pelo servidor; `error_type` é o nome da exceção original."""
+
+    def __init__(self, error_type, message):
+        super().__init__(f"{error_type}: {message}")
+        self.error_type = error_type
+        self.message = message
+
+
+class CompileClient:
+    """Cliente bloqueante do `CompileServer`, com uma conexão reaproveitada entre pedidos.
+
+    Só importa a biblioteca padrão e `src.service.protocol`, então criar um
+    cliente não carrega o compilador.
+    """
+
+    def __init__(self, path, timeout=None):
+        self.path = path
+        self.timeout = timeout
+        self._socket = None
+        self._next_id = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+    def request(self, message):
+        if self._socket is None:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.settimeout(self.timeout)
+            self._socket.connect(self.path)
+        self._next_id += 1
+        message = dict(message, id=self._next_id)
+        try:
+            self._socket.sendall(encode_message(message))
+            response = recv_message(self._socket)
+        except (OSError, ProtocolError):
+            self.close()
+            raise
+        if response is None:
+            self.close()
+            raise ConnectionError("Compile server closed the connection")
+        if response.get('id') != self._next_id:
+            self.close()
+            raise ProtocolError(f"Expected response {self._next_id}, got {response.get('id')}")
+        return response
+
+    def compile(self, source, **options):
+        """Devolve `(symbol_table, optimized_ir, statement_count)`; erros viram `CompileError`."""
+        response = self.request({'source': source, 'options': options})
+        if not response['ok']:
+            raise CompileError(response['error_type'], response['error'])
+        return (response['symbol_table'], [tuple(instruction) for instruction in response['optimized_ir']],
+                response['statement_count'])
+
+    def ping(self):
+        return self.request({'command': 'ping'})['ok']
+
+    def stats(self):
+        return self.request({'command': 'stats'})['stats']
+
+    def close(self):
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
@@ -0,0 +1,76 @@
+"""Protocolo do servidor de compilação: mensagens JSON com prefixo de tamanho.
+
+Cada mensagem é um inteiro de 4 bytes big-endian com o tamanho do corpo,
+seguido do corpo em JSON UTF-8. Um pedido de compilação é
+`{"id": ..., "source": "...", "options": {...}}`; a resposta repete o `id` e
+traz `ok`, e então `symbol_table`, `optimized_ir` (lista de
+`[op, arg1, arg2, result]`) e `statement_count`, ou `error_type` e `error`.
+Pedidos com `"command"` (`ping`, `stats`) consultam o próprio servidor.
+Este módulo só usa a biblioteca padrão, para que o cliente carregue rápido.
+"""
+import json
+import struct
+
+LENGTH = struct.Struct('>I')
+MAX_MESSAGE_BYTES = 256 * 1024 * 1024
+# Opções aceitas em `options`, com os valores padrão do compilador.
+OPTIONS = {
+    'level': 2,
+    'max_iterations': None,
+    'time_budget': None,
+    'dag': False,
+    'sethi_ullman': False,
+}
+
+
+class ProtocolError(ValueError):
+    pass
+
+
+def encode_message(message):
+    body = json.dumps(message, separators=(',', ':')).encode('utf-8')
+    if len(body) > MAX_MESSAGE_BYTES:
+        raise ProtocolError(f"Message of {len(body)} bytes exceeds the {MAX_MESSAGE_BYTES} byte limit")
+    return LENGTH.pack(len(body)) + body
+
+
+def decode_body(body):
+    try:
+        message = json.loads(body.decode('utf-8'))
+    except (UnicodeDecodeError, ValueError) as e:
+        raise ProtocolError(f"Malformed message: {e}") from None
+    if not isinstance(message, dict):
+        raise ProtocolError("Message must be a JSON object")
+    return message
+
+
+def body_length(header):
+    (length,) = LENGTH.unpack(header)
+    if length > MAX_MESSAGE_BYTES:
+        raise ProtocolError(f"Message of {length} bytes exceeds the {MAX_MESSAGE_BYTES} byte limit")
+    return length
+
+
+def recv_message(sock):
+    """Lê uma mensagem de um socket bloqueante; devolve `None` no fim da conexão."""
+    header = _recv_exactly(sock, LENGTH.size)
+    if header is None:
+        return None
+    body = _recv_exactly(sock, body_length(header))
+    if body is None:
+        raise ProtocolError("Connection closed inside a message body")
+    return decode_body(body)
+
+
+def _recv_exactly(sock, size):
+    chunks = []
+    remaining = size
+    while remaining:
+        chunk = sock.recv(min(remaining, 1 << 20))
+        if not chunk:
+            if chunks:
+                raise ProtocolError("Connection closed inside a message")
+            return None
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b''.join(chunks)
@@ -0,0 +1,251 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import signal
+import sys
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from src.analysis.semantic import SemanticError
+from src.driver.pipeline import compile_source
+from src.optimization.optimizer import OPTIMIZATION_LEVELS, Optimizer
+from src.service.protocol import LENGTH, OPTIONS, ProtocolError, body_length, decode_body, encode_message
+
+DEFAULT_CACHE_ENTRIES = 4096
+
+
+def compile_request(source, options):
+    """Compila um pedido num worker e devolve a resposta (sem o `id`)."""
+    try:
+        optimizer = Optimizer(level=options['level'], max_iterations=options['max_iterations'],
+                              time_budget=options['time_budget'])
+        result = compile_source(source, optimizer, dag=options['dag'], sethi_ullman=options['sethi_ullman'])
+    except (SemanticError, SyntaxError, RuntimeError, ZeroDivisionError, ValueError) as e:
+        return {'ok': False, 'error_type': type(e).__name__, 'error': str(e)}
+    return {
+        'ok': True,
+        'symbol_table': result.symbol_table,
+        'optimized_ir': [list(instruction) for instruction in result.optimized_ir],
+        'statement_count': result.statement_count,
+    }
+
+
+def _is_number(value, types=(int, float)):
+    # `true` chega do JSON como bool, que também é int em Python.
+    return isinstance(value, types) and not isinstance(value, bool)
+
+
+# Valores aceitos por opção; conferidos antes do pedido chegar a um worker.
+_OPTION_CHECKS = {
+    'level': (lambda value: _is_number(value, int) and value in OPTIMIZATION_LEVELS,
+              f"one of {', '.join(map(str, OPTIMIZATION_LEVELS))}"),
+    'max_iterations': (lambda value: value is None or _is_number(value, int), "an integer or null"),
+    'time_budget': (lambda value: value is None or _is_number(value), "a number or null"),
+    'dag': (lambda value: isinstance(value, bool), "a boolean"),
+    'sethi_ullman': (lambda value: isinstance(value, bool), "a boolean"),
+}
+
+
+def _warm_worker():
+    # Importa e exercita o pipeline inteiro antes do primeiro pedido real.
+    compile_request("int a; a = 1 + 2;", OPTIONS)
+
+
+async def read_message(reader):
+    """Lê uma mensagem de um `asyncio.StreamReader`; devolve `None` no fim da conexão."""
+    try:
+        header = await reader.readexactly(LENGTH.size)
+    except asyncio.IncompleteReadError as e:
+        if e.partial:
+            raise ProtocolError("Connection closed inside a message header") from None
+        return None
+    try:
+        body = await reader.readexactly(body_length(header))
+    except asyncio.IncompleteReadError:
+        raise ProtocolError("Connection closed inside a message body") from None
+    return decode_body(body)
+
+
+class CompileServer:
+    """Daemon de compilação sobre um socket Unix, com cache em memória e um pool de processos.
+
+    O event loop só faz E/S: cada pedido vira uma tarefa, a compilação roda
+    no `ProcessPoolExecutor` (workers de vida longa, já aquecidos) e as
+    respostas saem assim que ficam prontas, na ordem em que terminam; o
+    `id` do pedido identifica cada uma. Pedidos repetidos (mesmo fonte e
+    mesmas opções) são respondidos do cache LRU, e pedidos iguais em
+    andamento compartilham a mesma compilação.
+    """
+
+    def __init__(self, path, jobs=None, cache_entries=DEFAULT_CACHE_ENTRIES):
+        self.path = path
+        self.jobs = jobs or os.cpu_count() or 1
+        self.cache_entries = cache_entries
+        self.cache = OrderedDict()
+        self.stats = {'requests': 0, 'cache_hits': 0, 'compiled': 0, 'errors': 0, 'connections': 0}
+        self._pending = {}
+        self._pool = None
+        self._server = None
+
+    async def start(self):
+        self._pool = ProcessPoolExecutor(max_workers=self.jobs, initializer=_warm_worker)
+        # Sobe todos os workers agora, para que o primeiro pedido não pague o fork e o aquecimento.
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self._pool, os.getpid) for _ in range(self.jobs)))
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self._server = await asyncio.start_unix_server(self._serve_connection, path=self.path)
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        try:
+            await self._server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            await self.close()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+            if os.path.exists(self.path):
+                os.remove(self.path)
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    async def _serve_connection(self, reader, writer):
+        self.stats['connections'] += 1
+        lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while True:
+                try:
+                    message = await read_message(reader)
+                except ProtocolError as e:
+                    await self._send(writer, lock, {'ok': False, 'error_type': 'ProtocolError', 'error': str(e)})
+                    break
+                if message is None:
+                    break
+                task = asyncio.ensure_future(self._answer(message, writer, lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        except ConnectionError:
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _answer(self, message, writer, lock):
+        try:
+            response = await self.handle(message)
+        except Exception as e:
+            # Por exemplo, um worker que morreu (BrokenProcessPool): o pedido
+            # falha, mas a conexão e o servidor continuam de pé.
+            response = self._error(type(e).__name__, str(e))
+        if 'id' in message:
+            response['id'] = message['id']
+        await self._send(writer, lock, response)
+
+    @staticmethod
+    async def _send(writer, lock, response):
+        async with lock:
+            writer.write(encode_message(response))
+            await writer.drain()
+
+    async def handle(self, message):
+        """Responde a um pedido já decodificado."""
+        self.stats['requests'] += 1
+        command = message.get('command')
+        if command == 'ping':
+            return {'ok': True}
+        if command == 'stats':
+            return {'ok': True, 'stats': dict(self.stats, cache_entries=len(self.cache))}
+        if command is not None:
+            return self._error('ProtocolError', f"Unknown command: {command}")
+
+        source = message.get('source')
+        options = message.get('options') or {}
+        if not isinstance(source, str) or not isinstance(options, dict):
+            return self._error('ProtocolError', "Request needs a 'source' string and an 'options' object")
+        unknown = sorted(set(options) - set(OPTIONS))
+        if unknown:
+            return self._error('ProtocolError', f"Unknown options: {', '.join(unknown)}")
+        for name, value in options.items():
+            valid, expected = _OPTION_CHECKS[name]
+            if not valid(value):
+                return self._error('ProtocolError', f"Option '{name}' must be {expected}, got {json.dumps(value)}")
+        options = dict(OPTIONS, **options)
+
+        key = hashlib.sha256(json.dumps([source, options], sort_keys=True).encode()).hexdigest()
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.cache.move_to_end(key)
+            self.stats['cache_hits'] += 1
+            return dict(cached)
+
+        pending = self._pending.get(key)
+        if pending is None:
+            loop = asyncio.get_running_loop()
+            pending = self._pending[key] = loop.run_in_executor(self._pool, compile_request, source, options)
+            self.stats['compiled'] += 1
+            try:
+                # shield(): se esta conexão cair, a compilação continua para quem mais a espera.
+                response = await asyncio.shield(pending)
+            finally:
+                del self._pending[key]
+            if not response['ok']:
+                self.stats['errors'] += 1
+            # Como no `CompileCache`: sob `time_budget` a resposta depende do relógio.
+            if options['time_budget'] is None:
+                self.cache[key] = response
+                if len(self.cache) > self.cache_entries:
+                    self.cache.popitem(last=False)
+        else:
+            self.stats['cache_hits'] += 1
+            response = await asyncio.shield(pending)
+        return dict(response)
+
+    def _error(self, error_type, error):
+        self.stats['errors'] += 1
+        return {'ok': False, 'error_type': error_type, 'error': error}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python3 -m src.service.server',
+        description='Servidor de compilação sobre um socket Unix.',
+    )
+    parser.add_argument('socket', help='caminho do socket Unix')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='processos de compilação (padrão: número de CPUs)')
+    parser.add_argument('--cache-entries', type=int, default=DEFAULT_CACHE_ENTRIES,
+                        help='respostas mantidas no cache em memória')
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    async def run():
+        server = CompileServer(args.socket, args.jobs, args.cache_entries)
+        task = asyncio.ensure_future(server.serve_forever())
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, task.cancel)
+        await task
+
+    asyncio.run(run())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
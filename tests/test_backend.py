@@ -0,0 +1,99 @@
+import random
+
+from src.backend.evaluator import VectorEvaluator, evaluate, numpy
+from src.backend.pycodegen import compile_program
+from src.driver.pipeline import compile_source
+
+def check(description, condition):
+    status = "SUCCESS" if condition else "FAIL"
+    print(f"{status}: {description}")
+
+def run_rows(instructions, columns, rows):
+    # Interpretador escalar de referência: o programa inteiro uma vez por linha.
+    ops = {'ADD': lambda a, b: a + b, 'SUB': lambda a, b: a - b, 'MUL': lambda a, b: a * b,
+           'DIV': lambda a, b: a // b, 'SHL': lambda a, b: a << b, 'SHR': lambda a, b: a >> b}
+    results = []
+    for row in range(rows):
+        env = {name: column[row] for name, column in columns.items()}
+        for op, arg1, arg2, result in instructions:
+            a = env[arg1] if arg1 in env else int(arg1)
+            env[result] = a if op == 'ASSIGN' else ops[op](a, env[arg2] if arg2 in env else int(arg2))
+        results.append(env)
+    return results
+
+def same_columns(results, expected, names):
+    return all([int(value) for value in results[name]] == [env[name] for env in expected] for name in names)
+
+print("\n" + "="*70)
+print("  BACKEND TESTS")
+print("="*70 + "\n")
+
+compiled = compile_source("""
+int price;
+int qty;
+int discount;
+int total;
+int avg;
+total = price * qty - discount * 8;
+avg = (total + 0) / (qty + 1);
+discount = price / 4 - 7;
+""")
+program = compiled.optimized_ir
+
+rng = random.Random(12)
+rows = 500
+columns = {name: [rng.randint(-1000, 1000) for _ in range(rows)] for name in ('price', 'discount')}
+columns['qty'] = [rng.randint(0, 50) for _ in range(rows)]
+expected = run_rows(program, columns, rows)
+
+results = evaluate(program, columns, use_numpy=False)
+check("List evaluator matches the per-row interpreter, including floor division of negatives",
+      sorted(results) == ['avg', 'discount', 'total'] and same_columns(results, expected, results))
+if numpy is not None:
+    check("NumPy evaluator matches the per-row interpreter",
+          same_columns(evaluate(program, columns), expected, results))
+
+evaluator = VectorEvaluator(program, use_numpy=False)
+check("Evaluator treats variables read before assignment as inputs",
+      sorted(name for name, _ in evaluator.inputs) == ['discount', 'price', 'qty'])
+
+chain = [('ADD', 'x', '1', 't1')] + [('MUL', f't{i}', '3', f't{i + 1}') for i in range(1, 1000)]
+chain.append(('ASSIGN', 't1000', None, 'y'))
+check("Evaluator reuses temp buffers by liveness",
+      VectorEvaluator(chain, use_numpy=False).buffer_count == 1)
+
+try:
+    evaluate([('DIV', 'x', 'y', 'z')], {'x': [1, 2], 'y': [1, 0]}, use_numpy=False)
+    check("Evaluator raises ZeroDivisionError when a divisor row is zero", False)
+except ZeroDivisionError:
+    check("Evaluator raises ZeroDivisionError when a divisor row is zero", True)
+
+try:
+    evaluate([('ADD', 'x', 'y', 'z')], {'x': [1, 2]}, use_numpy=False)
+    check("Evaluator reports a missing input column", False)
+except ValueError as e:
+    check("Evaluator reports a missing input column", str(e) == "Missing input column: y")
+
+check("Evaluator broadcasts constant outputs to every row",
+      evaluate([('ASSIGN', '5', None, 'a'), ('ADD', 'x', 'a', 'b')], {'x': [1, 2, 3]}, use_numpy=False)
+      == {'a': [5, 5, 5], 'b': [6, 7, 8]})
+
+function = compile_program(program, compiled.symbol_table)
+names = list(compiled.symbol_table)
+check("Compiled Python function matches the per-row interpreter",
+      all(dict(zip(names, function(*(columns.get(name, [0] * rows)[row] for name in names))))
+          == {name: env.get(name, 0) for name in names}
+          for row, env in enumerate(expected)))
+check("Compiled functions are cached by program",
+      compile_program(list(program), dict(compiled.symbol_table)) is function)
+check("Compiled functions rename variables that are Python keywords",
+      compile_program([('ADD', 'def', '1', 't1'), ('ASSIGN', 't1', None, 'class')], {'def': 'int', 'class': 'int'})(def_=4)
+      == (4, 5))
+check("Escaped keyword names never collide with names that already end in '_'",
+      compile_program(compile_source("int if; int if_; int x_; if = 1; if_ = 2; x_ = if + if_;").optimized_ir,
+                      {'if': 'int', 'if_': 'int', 'x_': 'int'})() == (1, 2, 3))
+try:
+    compile_program([('DIV', 'x', 'y', 'z')], {'x': 'int', 'y': 'int', 'z': 'int'})(1, 0)
+    check("Compiled functions raise ZeroDivisionError like the optimizer", False)
+except ZeroDivisionError:
+    check("Compiled functions raise ZeroDivisionError like the optimizer", True)
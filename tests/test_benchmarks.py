@@ -0,0 +1,33 @@
+from benchmarks.generator import generate_program
+from benchmarks.suite import STAGES, compare, run_suite
+from src.driver.pipeline import compile_source
+
+def check(description, condition):
+    status = "SUCCESS" if condition else "FAIL"
+    print(f"{status}: {description}")
+
+print("\n" + "="*70)
+print("  BENCHMARK SUITE TESTS")
+print("="*70 + "\n")
+
+check("Program generator is reproducible for a seed",
+      generate_program(200, seed=5) == generate_program(200, seed=5) != generate_program(200, seed=6))
+check("Generated programs compile through the whole pipeline",
+      all(compile_source(generate_program(300, depth=6, variables=20, constant_density=density, seed=seed))
+          for density in (0.0, 0.5) for seed in range(3)))
+
+results = run_suite([50, 100], repeat=1, log=lambda line: None)
+check("Suite records time and peak memory for every stage and size",
+      sorted(results['results']) == ['100', '50']
+      and all(sorted(row) == sorted(STAGES) and all(set(m) == {'seconds', 'peak_bytes'} for m in row.values())
+              for row in results['results'].values()))
+
+baseline = {'results': {'1000': {'parse': {'seconds': 1.0, 'peak_bytes': 100},
+                                 'optimize': {'seconds': 1.0, 'peak_bytes': 100}}}}
+current = {'results': {'1000': {'parse': {'seconds': 1.3, 'peak_bytes': 100},
+                                'optimize': {'seconds': 1.1, 'peak_bytes': 200}}}}
+check("Comparison flags stages slower than the threshold",
+      len(compare(baseline, current, threshold=0.2)) == 1)
+check("Comparison honours per-stage and memory thresholds",
+      compare(baseline, current, threshold=0.2, stage_thresholds={'parse': 0.5}) == []
+      and len(compare(baseline, current, threshold=0.5, memory_threshold=0.5)) == 1)
@@ -0,0 +1,320 @@
+from src.frontend.lexer import Lexer
+from src.frontend.parser import Parser
+from src.analysis.semantic import SemanticAnalyzer, SemanticError
+from src.ir.ir_generator import IRGenerator
+import json
+import random
+import os
+import tempfile
+import time
+from src.driver.session import CompileSession
+from src.driver.pipeline import compile_source
+from src.driver.cache import CompileCache
+from src.optimization.optimizer import Optimizer
+from src.driver.batch import expand_inputs, run_batch
+from src.ir.binary import read_binary
+
+def check(description, condition):
+    status = "SUCCESS" if condition else "FAIL"
+    print(f"{status}: {description}")
+
+def full_compile(source):
+    ast = Parser(Lexer(source).tokenize()).parse()
+    semantic = SemanticAnalyzer()
+    semantic.analyze(ast)
+    ir_gen = IRGenerator()
+    ir_gen.generate(ast)
+    return semantic.symbol_table, ir_gen.get_code()
+
+print("\n" + "="*70)
+print("  DRIVER TESTS")
+print("="*70 + "\n")
+
+program = """
+int a;
+int b;
+int c;
+a = 3 + 2;
+b = a * (a - 1);
+c = b / (a + b);
+"""
+
+session = CompileSession()
+session.compile(program)
+check("CompileSession matches the full pipeline on the first compile",
+      (session.symbol_table, session.get_code()) == full_compile(program))
+
+edited = program.replace("b = a * (a - 1);", "b = a * (a - 1) + 7 * a;")
+session.compile(edited)
+check("CompileSession matches the full pipeline after an edit",
+      (session.symbol_table, session.get_code()) == full_compile(edited))
+check("CompileSession recompiles and reanalyzes only the edited statement",
+      session.stats == {'statements': 6, 'compiled': 1, 'reused': 5, 'analyzed': 1})
+
+try:
+    session.compile(edited.replace("int c;", ""))
+    print("FAIL: CompileSession detects a removed declaration (no error raised)")
+except SemanticError as e:
+    print("SUCCESS: CompileSession detects a removed declaration")
+    print(f"   Message: {e}")
+
+try:
+    session.compile(edited + "c = (1 + ;")
+    print("FAIL: CompileSession reports syntax errors (no error raised)")
+except SyntaxError as e:
+    print("SUCCESS: CompileSession reports syntax errors with full-source positions")
+    print(f"   Message: {e}")
+
+session.compile(edited)
+session.compile(edited.replace("int c;", "int c; int d;"))
+check("CompileSession reanalyzes the unchanged tail when the edit declares new names",
+      session.stats['analyzed'] == 4
+      and session.symbol_table == full_compile(edited.replace("int c;", "int c; int d;"))[0])
+try:
+    session.compile(edited.replace("int a;", "int a; int c;"))
+    print("FAIL: CompileSession detects a declaration duplicated by a later statement (no error raised)")
+except SemanticError as e:
+    print("SUCCESS: CompileSession detects a declaration duplicated by a later statement")
+    print(f"   Message: {e}")
+
+rng = random.Random(4)
+pieces = ["int a;", "int b;", "int c;", "int x;", "a = 1;", "b = a + 2;", "c = b * a;", "a = c - 1;", "x = 3;"]
+statements = ["int a;", "int b;", "a = 1;", "b = a + 2;"]
+session = CompileSession()
+matches = True
+for _ in range(300):
+    previous = list(statements)
+    position = rng.randrange(len(statements) + 1)
+    if position < len(statements) and rng.random() < 0.3:
+        del statements[position]
+    elif position < len(statements) and rng.random() < 0.5:
+        statements[position] = rng.choice(pieces)
+    else:
+        statements.insert(position, rng.choice(pieces))
+    statements = statements[:12] or ["int a;"]
+    source = " ".join(statements)
+    try:
+        expected = full_compile(source)
+    except SemanticError as e:
+        expected = str(e)
+    try:
+        session.compile(source)
+        actual = (session.symbol_table, session.get_code())
+    except SemanticError as e:
+        actual = str(e)
+    matches = matches and actual == expected
+    if isinstance(expected, str):
+        statements = previous
+check("CompileSession matches the full pipeline over random edits, errors included", matches)
+
+temp_names = "int a; int t1; int t2; t1 = 4; t2 = (t1 + a) * t1; a = t2 - (t1 * (a + t2));"
+session = CompileSession()
+check("CompileSession keeps user variables named like temps apart from its own temps",
+      session.compile(temp_names) == full_compile(temp_names)[1]
+      and session.program == Parser(Lexer(temp_names).tokenize()).parse())
+deep = "int a; int x; a = " + "(" * 20000 + "x" + " + 1)" * 20000 + ";"
+deep_result = compile_source(deep, optimizer=None)
+check("CompileSession compiles expressions nested deeper than the recursion limit",
+      CompileSession().compile(deep) == deep_result.original_ir)
+
+with tempfile.TemporaryDirectory() as directory:
+    cache = CompileCache(directory)
+    first = compile_source(program, cache=cache)
+    second = compile_source(program, cache=cache)
+    check("CompileCache returns the stored result on a second compile",
+          first == second and (cache.hits, cache.misses) == (1, 1))
+    check("CompileCache survives reopening the directory",
+          compile_source(program, cache=CompileCache(directory)) == first)
+    dag = compile_source("int a; int x; a = x * x + x * x;", cache=cache, dag=True)
+    check("CompileCache keeps DAG and tree TAC apart",
+          len(dag.original_ir) == 3 and
+          len(compile_source("int a; int x; a = x * x + x * x;", cache=cache).original_ir) == 4)
+
+    check("CompileCache keys on optimizer options that change the output, not on parallelism",
+          cache.key(program, Optimizer(jobs=4, parallel_threshold=10)) == cache.key(program, Optimizer())
+          and cache.key(program, Optimizer(level=1)) != cache.key(program, Optimizer()))
+    entries = len(cache._entries)
+    compile_source(program, Optimizer(time_budget=60), cache=cache)
+    compile_source(program, Optimizer(time_budget=60), cache=cache)
+    compile_source(program, Optimizer(max_iterations=1), cache=cache)
+    check("CompileCache skips wall-clock budgets but caches iteration budgets",
+          len(cache._entries) == entries + 1
+          and compile_source(program, Optimizer(max_iterations=1), cache=cache) == compile_source(program, Optimizer(max_iterations=1)))
+
+    small = CompileCache(directory, max_bytes=1000)
+    for i in range(10):
+        compile_source(program + f"a = {i};", cache=small)
+    check("CompileCache evicts least recently used entries past max_bytes",
+          small._total_bytes <= 1000 and len(small._entries) < 10)
+
+with tempfile.TemporaryDirectory() as directory:
+    for i in range(20):
+        with open(os.path.join(directory, f"ok{i}.src"), "w") as f:
+            f.write(program.replace("3 + 2", f"3 + {i}"))
+    with open(os.path.join(directory, "undeclared.src"), "w") as f:
+        f.write("int a;\na = b;\n")
+    with open(os.path.join(directory, "syntax.src"), "w") as f:
+        f.write("int a;\na = (1;\n")
+
+    paths = expand_inputs([os.path.join(directory, "*.src")])
+    report = run_batch(paths, jobs=2, output_dir=os.path.join(directory, "out"))
+    check("run_batch compiles every file and keeps going after failures",
+          len(report.outcomes) == 22 and
+          sorted(o.error_type for o in report.failures) == ['SemanticError', 'SyntaxError'])
+    with open(report.outcomes[paths.index(os.path.join(directory, "ok0.src"))].output_path) as f:
+        check("run_batch writes the optimized TAC of each file",
+              f.read() == "a = 3\nb = 6\nc = 0\n")
+    binary_report = run_batch(paths[:3], jobs=1, output_dir=os.path.join(directory, "bin"), binary=True)
+    check("run_batch --binary writes .tacb files that load back to the optimized TAC",
+          all(o.output_path.endswith('.tacb') for o in binary_report.outcomes)
+          and read_binary(binary_report.outcomes[0].output_path).to_tuples()
+          == compile_source(open(paths[0]).read()).optimized_ir)
+    print(f"   Summary: {report.summary()}")
+
+    readonly = os.path.join(directory, "readonly")
+    os.mkdir(readonly, 0o555)
+    if os.access(readonly, os.W_OK):
+        # Como root a permissão não vale; um arquivo no lugar do diretório falha do mesmo jeito.
+        readonly = os.path.join(directory, "ok0.src")
+    unwritable = run_batch(paths[:3], jobs=1, output_dir=readonly)
+    check("run_batch reports an unwritable output directory per file instead of aborting",
+          len(unwritable.outcomes) == 3 and len(unwritable.failures) == 3
+          and all(isinstance(o.error_type, str) and o.output_path is None for o in unwritable.failures))
+    os.chmod(os.path.join(directory, "readonly"), 0o755)
+
+from src.driver.pipeline import Compiler, FUSED_STAGES, STAGES
+
+plain = Compiler().compile(program)
+check("Compiler without instrumentation returns no statistics",
+      plain.stats is None and plain.optimized_ir == compile_source(program).optimized_ir)
+
+seen = []
+profiled = Compiler(hooks=[seen.append]).compile(program)
+stats = profiled.stats
+check("Compiler hooks see every stage in order",
+      [stage.name for stage in seen] == list(STAGES) and stats.stages == seen)
+check("Compiler statistics count tokens, AST nodes and instructions",
+      stats.tokens == len(Lexer(program).tokenize_compact()) and stats.ast_nodes == 20 and
+      stats.instructions == len(profiled.original_ir) and
+      stats.optimized_instructions == len(profiled.optimized_ir) == 3)
+check("Compiler statistics record each optimizer pass and what it removed",
+      stats.optimizer.iterations == 1 and
+      [run.name for run in stats.optimizer.passes] ==
+      ['constant_propagation', 'algebraic', 'value_numbering', 'dead_code'] and
+      sum(run.removed for run in stats.optimizer.passes) ==
+      stats.instructions - stats.optimized_instructions)
+events = stats.trace_events()
+optimize_event = next(event for event in events if event['name'] == 'optimize')
+check("Chrome trace nests the optimizer passes inside the optimize stage",
+      all(event['ph'] == 'X' for event in events) and
+      all(optimize_event['ts'] <= event['ts'] and
+          event['ts'] + event['dur'] <= optimize_event['ts'] + optimize_event['dur'] + 1
+          for event in events if event['cat'] == 'pass'))
+with tempfile.TemporaryDirectory() as directory:
+    stats.write_chrome_trace(os.path.join(directory, "trace.json"))
+    with open(os.path.join(directory, "trace.json")) as f:
+        trace = json.load(f)
+    check("Statistics export to JSON and to a Chrome trace file",
+          json.loads(stats.to_json())['optimizer']['iterations'] == 1 and
+          len(trace['traceEvents']) == 1 + len(STAGES) + len(stats.optimizer.passes))
+memory = Compiler(trace_memory=True).compile(program).stats
+check("Compiler with trace_memory reports a peak per stage",
+      all(stage.peak_bytes > 0 for stage in memory.stages))
+
+fused_result = Compiler(fused=True).compile(program)
+fused_stats = Compiler(fused=True, instrument=True).compile(program).stats
+check("Fused Compiler matches the multi-pass pipeline",
+      (fused_result.symbol_table, fused_result.original_ir, fused_result.optimized_ir, fused_result.statement_count)
+      == (plain.symbol_table, plain.original_ir, plain.optimized_ir, plain.statement_count)
+      and [stage.name for stage in fused_stats.stages] == list(FUSED_STAGES))
+
+ordered = Compiler(sethi_ullman=True).compile("int a; int x; a = x + (x * (x - 1));")
+check("Compiler threads Sethi-Ullman ordering into IR generation",
+      ordered.original_ir[:3] == [('SUB', 'x', '1', 't1'), ('MUL', 'x', 't1', 't1'), ('ADD', 'x', 't1', 't1')])
+try:
+    Compiler(fused=True, sethi_ullman=True)
+    check("Fused Compiler rejects Sethi-Ullman ordering", False)
+except ValueError:
+    check("Fused Compiler rejects Sethi-Ullman ordering", True)
+
+from benchmarks.generator import generate_program
+from src.backend import evaluate
+from src.driver.streaming import compile_stream
+from src.ir.printer import format_ir
+
+streamed_source = generate_program(300, variables=20, seed=11)
+streamed_inputs = {f"v{i}": [i - 9, i + 2] for i in range(20)}
+with tempfile.TemporaryDirectory() as directory:
+    source_path = os.path.join(directory, "big.src")
+    with open(source_path, "w") as f:
+        f.write(streamed_source)
+    full = compile_source(streamed_source)
+    whole = compile_stream(source_path, os.path.join(directory, "whole.tac"), window=10 ** 9)
+    with open(whole.output_path) as f:
+        check("Streaming compile in a single window writes the same TAC as compile_source",
+              f.read() == format_ir(full.optimized_ir) + "\n" and whole.windows == 1
+              and whole.statement_count == full.statement_count)
+    windowed = compile_stream(source_path, os.path.join(directory, "windowed.tacb"), binary=True, window=16)
+    windowed_ir = read_binary(windowed.output_path).to_tuples()
+    check("Streaming compile optimizes bounded windows with temps restarting at t1",
+          windowed.windows > 20 and len(windowed_ir) == windowed.optimized_instructions
+          and max(int(r[1:]) for _, _, _, r in windowed_ir if r.startswith('t')) < 40
+          and evaluate(windowed_ir, streamed_inputs) == evaluate(full.optimized_ir, streamed_inputs))
+
+    failures = []
+    for text, error in (("int a;\na = b;\na = (1 + ;\n", SyntaxError), ("int a;\na = b;\n", SemanticError),
+                        ("int a;\n\na = 1 $ 2;\n", RuntimeError)):
+        with open(source_path, "w") as f:
+            f.write(text)
+        try:
+            compile_stream(source_path, os.path.join(directory, "bad.tac"))
+            failures.append(text)
+        except error as e:
+            if error is RuntimeError and "line 3, column 7" not in str(e):
+                failures.append(str(e))
+    check("Streaming compile reports the same errors and leaves no output behind",
+          failures == [] and sorted(os.listdir(directory)) == ["big.src", "whole.tac", "windowed.tacb"])
+    if os.path.exists("/proc/self/maps"):
+        with open(source_path, "w") as f:
+            f.write("int a;\na = (1;\n" + " " * 8192)
+        try:
+            compile_stream(source_path, os.path.join(directory, "bad.tac"))
+        except SyntaxError as e:
+            # A exceção guarda o frame de compile_stream, e com ele o mmap.
+            kept = e
+        with open("/proc/self/maps") as f:
+            check("Streaming compile closes the input mapping when compilation fails",
+                  source_path not in f.read())
+        del kept
+
+    with open(source_path, "w") as f:
+        f.write("int a;\na = 1;\n" + "\n" * 100000 + " " * 100000)
+    start = time.perf_counter()
+    tail = compile_stream(source_path, os.path.join(directory, "tail.tac"))
+    check("Streaming compile lexes a large blank tail of the mapped file in linear time",
+          time.perf_counter() - start < 2 and tail.statement_count == 2)
+    os.remove(tail.output_path)
+
+    with open(source_path, "w") as f:
+        f.write(streamed_source)
+    stream_report = run_batch([source_path], jobs=1, output_dir=os.path.join(directory, "out"), stream=True)
+    check("run_batch --stream compiles through the streaming path",
+          stream_report.failures == [] and stream_report.outcomes[0].statements == full.statement_count)
+
+import contextlib
+import io
+from src.main import main as cli_main
+
+with tempfile.TemporaryDirectory() as directory:
+    messages = []
+    for name, text in (("lexer.src", "int a;\na = 1 $ 2;\n"), ("zero.src", "int a;\na = 1 / 0;\n")):
+        path = os.path.join(directory, name)
+        with open(path, "w") as f:
+            f.write(text)
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            status = cli_main(["--stats", os.path.join(directory, "stats.json"), path])
+        messages.append((status, stderr.getvalue()))
+    check("--stats reports lexer errors and constant division by zero without a traceback",
+          [status for status, _ in messages] == [1, 1]
+          and "RuntimeError" in messages[0][1] and "ZeroDivisionError" in messages[1][1])
@@ -0,0 +1,165 @@
+import time
+
+from src.frontend.lexer import Lexer, MappedTokens, Token, TK_ID
+from src.frontend.parser import Parser
+from src.frontend.ast_nodes import BinaryOp, Number, Variable
+from src.frontend.translator import Translator
+from src.frontend.compact_ast import CompactAST
+from src.analysis.semantic import SemanticAnalyzer, SemanticError
+from src.ir.ir_generator import IRGenerator
+
+def check(description, condition):
+    status = "SUCCESS" if condition else "FAIL"
+    print(f"{status}: {description}")
+
+def expect_error(description, error_type, func):
+    try:
+        func()
+        print(f"FAIL: {description} (no error raised)")
+    except error_type as e:
+        print(f"SUCCESS: {description}")
+        print(f"   Message: {e}")
+
+print("\n" + "="*70)
+print("  FRONTEND TESTS")
+print("="*70 + "\n")
+
+source = """
+int a;
+int b;
+a = 3 + 2;
+b = a * (a - 1);
+"""
+
+tokens = Lexer(source).tokenize()
+stream = list(Lexer(source).iter_tokens())
+
+check("iter_tokens yields the same kinds and values as tokenize",
+      [(tok.kind, tok.value) for tok in stream] == tokens)
+check("iter_tokens reports line and column of each token",
+      stream[0] == Token('INT', 'int', 2, 1) and stream[-1] == Token('SEMI', ';', 5, 16))
+check("iter_tokens is lazy",
+      not isinstance(Lexer(source).iter_tokens(), list))
+
+check("Parser builds the same AST from the list and from the stream",
+      Parser(tokens).parse() == Parser(Lexer(source).iter_tokens()).parse())
+
+buffer = Lexer(source).tokenize_compact()
+check("tokenize_compact stores the same tokens as tokenize",
+      list(buffer) == tokens and len(buffer) == len(tokens))
+check("tokenize_compact skips trailing whitespace",
+      list(Lexer("a = 1 ;  \t \n  ").tokenize_compact()) == Lexer("a = 1 ;").tokenize())
+blank_tail = "int a; a = 1;" + "\n" * 100000 + " " * 100000
+start = time.perf_counter()
+compact_tail = list(Lexer(blank_tail).tokenize_compact())
+check("tokenize_compact skips a large blank tail in linear time",
+      time.perf_counter() - start < 2 and compact_tail == Lexer(blank_tail).tokenize())
+check("tokenize_compact interns identifiers",
+      buffer.lexemes[:3] == ['a', 'b', '3'] and buffer.symbols[buffer.kinds.tolist().index(TK_ID)] == 0)
+check("Parser builds the same AST from the compact buffer",
+      Parser(buffer).parse() == Parser(tokens).parse())
+check("MappedTokens lexes bytes into the same tokens as tokenize_compact",
+      list(MappedTokens(source.encode()).iter_compact()) == list(buffer.iter_compact())
+      and Parser(MappedTokens(source.encode())).parse() == Parser(tokens).parse())
+
+def expression_of(code):
+    return Parser(Lexer(code).tokenize_compact()).parse().statements[0].expression
+
+check("Expression parser respects precedence and left associativity",
+      expression_of("a = 1 - 2 - 3 * (4 + 5) / 6;") ==
+      BinaryOp(BinaryOp(Number(1), '-', Number(2)), '-',
+               BinaryOp(BinaryOp(Number(3), '*', BinaryOp(Number(4), '+', Number(5))), '/', Number(6))))
+
+deep = expression_of("a = " + "(" * 20000 + "x" + ")" * 20000 + ";")
+check("Expression parser handles 20000 nested parentheses without recursion",
+      deep == Variable('x'))
+
+node = expression_of("a = " + " + ".join(["x"] * 100001) + ";")
+length = 0
+while isinstance(node, BinaryOp):
+    node = node.left
+    length += 1
+check("Expression parser builds a 100000-operator chain", length == 100000)
+
+parser = Parser(Lexer(source).iter_tokens())
+first = next(parser.statements())
+check("Parser.statements() parses one statement at a time",
+      first.name == 'a' and parser.pos == 3)
+
+expect_error("Lexer reports invalid character with its position",
+             RuntimeError, lambda: list(Lexer("int a;\na = 1 $ 2;").iter_tokens()))
+expect_error("Parser reports unexpected token with its position",
+             SyntaxError, lambda: Parser(Lexer("int a;\na = 1 + ;").iter_tokens()).parse())
+expect_error("Parser reports positions from the compact buffer",
+             SyntaxError, lambda: Parser(Lexer("int a;\na = ;").tokenize_compact()).parse())
+expect_error("Parser reports positions from mapped bytes",
+             SyntaxError, lambda: Parser(MappedTokens(b"int a;\na = ;")).parse())
+expect_error("Parser reports unbalanced parentheses",
+             SyntaxError, lambda: Parser(Lexer("int a;\na = ((1 + 2);").tokenize()).parse())
+expect_error("Parser reports EOF on truncated input",
+             SyntaxError, lambda: Parser(Lexer("int a").tokenize()).parse())
+
+def multi_pass(code):
+    try:
+        ast = Parser(Lexer(code).tokenize_compact()).parse()
+        semantic = SemanticAnalyzer()
+        semantic.analyze(ast)
+        ir_gen = IRGenerator()
+        ir_gen.generate(ast)
+        return semantic.symbol_table, ir_gen.get_code()
+    except (SyntaxError, SemanticError) as e:
+        return type(e).__name__, str(e)
+
+def fused(code):
+    try:
+        translator = Translator(Lexer(code).tokenize_compact())
+        return translator.symbol_table, translator.translate()
+    except (SyntaxError, SemanticError) as e:
+        return type(e).__name__, str(e)
+
+programs = [
+    source,
+    "int x; int y; int z; z = (x + 2) * (y - 007) / (x * y + 1) - x;",
+    "int a; a = " + "(" * 50 + "1" + " + a)" * 50 + ";",
+]
+check("Translator emits the same TAC and symbol table as the multi-pass frontend",
+      all(fused(code) == multi_pass(code) and fused(code)[1] for code in programs))
+errors = [
+    "int a; int a;",
+    "int a; b = 1;",
+    "int a; a = b + c;",
+    "a = 1; int a;",
+    "int a; a = b; int a;",
+    "int a; a = b; a = (1;",
+    "int a; a = 1 +;",
+]
+check("Translator raises the same errors as the multi-pass frontend",
+      all(fused(code) == multi_pass(code) for code in errors))
+check("Translator reports a syntax error even after an earlier semantic error",
+      fused("int a; a = b; a = (1;")[0] == 'SyntaxError')
+
+def compact_pass(code):
+    try:
+        ast = Parser(Lexer(code).tokenize_compact()).parse_compact()
+        semantic = SemanticAnalyzer()
+        semantic.analyze(ast)
+        ir_gen = IRGenerator()
+        ir_gen.generate(ast)
+        return semantic.symbol_table, ir_gen.get_code()
+    except (SyntaxError, SemanticError) as e:
+        return type(e).__name__, str(e)
+
+arenas = [Parser(Lexer(code).tokenize_compact()).parse_compact() for code in programs]
+objects = [Parser(Lexer(code).tokenize_compact()).parse() for code in programs]
+check("CompactAST converts back to the same dataclass AST",
+      all(arena.to_program() == program for arena, program in zip(arenas, objects)))
+check("CompactAST.from_program lays nodes out exactly like parse_compact",
+      all(CompactAST.from_program(program).kinds == arena.kinds and
+          CompactAST.from_program(program).left == arena.left and
+          CompactAST.from_program(program).payload == arena.payload
+          for arena, program in zip(arenas, objects)))
+check("SemanticAnalyzer and IRGenerator give the same results and errors on the CompactAST",
+      all(compact_pass(code) == multi_pass(code) for code in programs + errors))
+deep = "int a; a = " + "(" * 20000 + "a" + " + 1)" * 20000 + ";"
+check("CompactAST is analyzed and lowered without recursion",
+      len(compact_pass(deep)[1]) == 20001)
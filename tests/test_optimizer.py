@@ -0,0 +1,374 @@
+import os
+import random
+import re
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.generator import generate_program
+
+from src.frontend.lexer import Lexer
+from src.frontend.compact_ast import NK_ASSIGNMENT
+from src.frontend.parser import Parser
+from src.frontend.translator import Translator
+from src.ir.ir_generator import IRGenerator, sethi_ullman_labels
+from src.ir.compact import CompactIR, TAG_CONST, TAG_TEMP, TAG_VAR, is_temp, tag_of
+from src.ir.binary import BinaryFormatError, read_binary, write_binary
+from src.ir.printer import format_ir
+from src.ir.regalloc import allocate_registers, max_live_temps
+from src.optimization import partition
+from src.optimization.optimizer import Optimizer
+from src.optimization.pass_manager import OptimizationStats, PassManager
+
+def check(description, condition):
+    status = "SUCCESS" if condition else "FAIL"
+    print(f"{status}: {description}")
+
+def generate_ir(source, dag=False, compact=False, sethi_ullman=False):
+    ir_gen = IRGenerator(dag=dag, sethi_ullman=sethi_ullman)
+    parser = Parser(Lexer(source).tokenize())
+    ir_gen.generate(parser.parse_compact() if compact else parser.parse())
+    return ir_gen.get_code()
+
+def legacy_optimize(instructions):
+    optimizer = Optimizer()
+    changed = True
+    current_ir = instructions
+    while changed:
+        changed = False
+        new_ir, folded = optimizer.constant_propagation(current_ir)
+        if folded:
+            changed = True
+            current_ir = new_ir
+        new_ir, eliminated = optimizer.dead_code_elimination(current_ir)
+        if eliminated:
+            changed = True
+            current_ir = new_ir
+    return current_ir
+
+def run_tac(instructions, inputs):
+    env = dict(inputs)
+    for op, arg1, arg2, result in instructions:
+        values = [int(arg) if Optimizer().is_number(arg) else env.get(arg, 0)
+                  for arg in (arg1, arg2) if arg is not None]
+        if op == 'ASSIGN': env[result] = values[0]
+        elif op == 'ADD': env[result] = values[0] + values[1]
+        elif op == 'SUB': env[result] = values[0] - values[1]
+        elif op == 'MUL': env[result] = values[0] * values[1]
+        elif op == 'DIV': env[result] = values[0] // values[1]
+        elif op == 'SHL': env[result] = values[0] << values[1]
+        elif op == 'SHR': env[result] = values[0] >> values[1]
+    return {name: value for name, value in env.items() if not name.startswith('t')}
+
+def preserves_semantics(optimize, instructions, inputs):
+    try:
+        expected = run_tac(instructions, inputs)
+        optimized = optimize(instructions)
+    except ZeroDivisionError:
+        return True
+    return run_tac(optimized, inputs) == expected
+
+def random_tac(rng, length, low=1):
+    names = ['a', 'b', 'total', 'x', 't1', 't2', 't3', 't4', 't5', 't6']
+    def operand():
+        return rng.choice(names) if rng.random() < 0.6 else str(rng.randint(low, 9))
+    instructions = []
+    for _ in range(length):
+        result = rng.choice(names)
+        if rng.random() < 0.3:
+            instructions.append(('ASSIGN', operand(), None, result))
+        else:
+            op = rng.choice(['ADD', 'SUB', 'MUL', 'DIV'])
+            instructions.append((op, operand(), operand(), result))
+    return instructions
+
+def same_result(optimize, reference, instructions):
+    try:
+        expected = reference(instructions)
+    except ZeroDivisionError:
+        expected = ZeroDivisionError
+    try:
+        actual = optimize(instructions)
+    except ZeroDivisionError:
+        actual = ZeroDivisionError
+    return actual == expected
+
+print("\n" + "="*70)
+print("  OPTIMIZER TESTS")
+print("="*70 + "\n")
+
+rng = random.Random(7)
+programs = [random_tac(rng, rng.randint(1, 40)) for _ in range(2000)]
+programs.append(generate_ir("""
+int a;
+int b;
+int total;
+a = 3 + 2;
+b = a * (a - 1);
+total = (a + b) * (b - a) / 2;
+"""))
+
+check("Worklist optimizer matches the fixed-point optimizer on random TAC",
+      all(same_result(Optimizer(value_numbering=False, algebraic=False, liveness=False).optimize, legacy_optimize, ir) for ir in programs))
+
+inputs = {name: value for value, name in enumerate(['a', 'b', 'total', 'x'], start=3)}
+check("Full optimizer preserves the final value of every variable on random TAC",
+      all(preserves_semantics(Optimizer().optimize, ir, inputs) for ir in programs))
+
+check("Value numbering reuses a repeated subexpression",
+      Optimizer().optimize(generate_ir("int b; int x; int y; b = (x * y) + (x * y);"))
+      == [('MUL', 'x', 'y', 't1'), ('ADD', 't1', 't1', 't3'), ('ASSIGN', 't3', None, 'b')])
+check("Value numbering treats ADD and MUL operands as commutative",
+      len(Optimizer(max_iterations=1).optimize(generate_ir("int b; int x; int y; b = x * y - y * x;"))) == 3)
+check("Value numbering folds operations whose operands become constants",
+      Optimizer().local_value_numbering(CompactIR.from_tuples([('ASSIGN', '5', None, 'a'), ('ADD', 'a', '2', 'b')]))[0].to_tuples()
+      == [('ASSIGN', '5', None, 'a'), ('ASSIGN', '7', None, 'b')])
+check("Value numbering forgets a value once its holder is reassigned",
+      Optimizer().optimize([('MUL', 'x', 'y', 'a'), ('ADD', 'a', '1', 'c'), ('ASSIGN', '5', None, 'a'), ('MUL', 'x', 'y', 'b')])
+      == [('MUL', 'x', 'y', 'a'), ('ADD', 'a', '1', 'c'), ('ASSIGN', '5', None, 'a'), ('MUL', 'x', 'y', 'b')])
+
+def random_source(rng, statements):
+    names = ['a', 'b', 'c', 'x']
+    shared = [f"{rng.choice(names)} {rng.choice('+-*')} {rng.choice(names + ['2'])}" for _ in range(4)]
+    def expression(level):
+        if level >= 2 or rng.random() < 0.3:
+            return rng.choice(names + shared)
+        return f"({expression(level + 1)}) {rng.choice('+-*')} ({expression(level + 1)})"
+    body = [f"{rng.choice(names)} = {expression(0)};" for _ in range(statements)]
+    return "".join(f"int {name};" for name in names) + "\n".join(body)
+
+check("DAG mode shares repeated subexpressions within and across statements",
+      generate_ir("int a; int b; int x; int y; a = (x * y) + (x * y); b = y * x + 1;", dag=True)
+      == [('MUL', 'x', 'y', 't1'), ('ADD', 't1', 't1', 't2'), ('ASSIGN', 't2', None, 'a'),
+          ('ADD', 't1', '1', 't3'), ('ASSIGN', 't3', None, 'b')])
+check("DAG mode recomputes an expression after one of its variables is assigned",
+      generate_ir("int a; int b; int x; int y; a = x * y; x = x * y; b = x * y;", dag=True)
+      == [('MUL', 'x', 'y', 't1'), ('ASSIGN', 't1', None, 'a'), ('ASSIGN', 't1', None, 'x'),
+          ('MUL', 'x', 'y', 't2'), ('ASSIGN', 't2', None, 'b')])
+dag_sources = [random_source(rng, rng.randint(1, 8)) for _ in range(300)]
+dag_inputs = {'a': 3, 'b': -2, 'c': 5, 'x': 7}
+check("DAG mode preserves semantics and never emits more instructions",
+      all(run_tac(generate_ir(source, dag=True), dag_inputs) == run_tac(generate_ir(source), dag_inputs) and
+          len(generate_ir(source, dag=True)) <= len(generate_ir(source)) for source in dag_sources))
+check("DAG mode gives the same TAC from the object AST, the compact AST and the fused translator",
+      all(generate_ir(source, dag=True) == generate_ir(source, dag=True, compact=True)
+          == Translator(Lexer(source).tokenize_compact(), dag=True).translate() for source in dag_sources))
+
+identities = generate_ir("int a; int x; a = (x * 1 + 0) * (x - x) + x * 8 + (x + 0) / 4 + 0 / x;")
+counts = {}
+simplified, _ = Optimizer().algebraic_simplification(CompactIR.from_tuples(identities), counts)
+check("Algebraic simplification rewrites identities and strength-reduces powers of two",
+      counts == {'x * 1': 1, 'x + 0': 4, 'x - x': 1, 'x * 0': 1, 'x * 2^k': 1, 'x / 2^k': 1, '0 / x': 1})
+check("Algebraic simplification folds the whole identity chain away",
+      Optimizer().optimize(identities)
+      == [('SHL', 'x', '3', 't5'), ('SHR', 'x', '2', 't8'), ('ADD', 't5', 't8', 't9'), ('ASSIGN', 't9', None, 'a')])
+zero_programs = [random_tac(rng, rng.randint(1, 40), low=0) for _ in range(1000)]
+check("Algebraic simplification preserves semantics on random TAC with 0, 1 and powers of two",
+      all(preserves_semantics(Optimizer(value_numbering=False).optimize, ir, inputs) for ir in zero_programs))
+
+check("Liveness DCE removes overwritten stores to user variables",
+      Optimizer().optimize([('ASSIGN', 'x', None, 'a'), ('ADD', 'a', '1', 'b'), ('ASSIGN', 'y', None, 'a')])
+      == [('ADD', 'x', '1', 'b'), ('ASSIGN', 'y', None, 'a')])
+check("Liveness DCE keeps user variables whose names start with 't'",
+      Optimizer().optimize([('ADD', 'x', 'y', 't1'), ('ASSIGN', 't1', None, 'total'), ('ASSIGN', 'x', None, 'temp')])
+      == [('ADD', 'x', 'y', 't1'), ('ASSIGN', 't1', None, 'total'), ('ASSIGN', 'x', None, 'temp')])
+check("Liveness DCE drops everything outside live_out in one sweep",
+      Optimizer().optimize(generate_ir("int a; int b; int x; a = x * 3 + 1; b = a - x; a = b * 2;"), live_out={'b'})
+      == [('MUL', 'x', '3', 't1'), ('ADD', 't1', '1', 't2'), ('SUB', 't2', 'x', 't3'), ('ASSIGN', 't3', None, 'b')])
+
+check("Liveness DCE handles temp-like names with huge numbers",
+      Optimizer().optimize(generate_ir("int t99999999999; t99999999999 = 1;"), live_out={'t99999999999'})
+      == [('ASSIGN', '1', None, 't99999999999')]
+      and Optimizer().optimize([('ADD', 'x', '1', 't999999999999999999'), ('ASSIGN', 'x', None, 'a')])
+      == [('ASSIGN', 'x', None, 'a')])
+
+chain = [('ADD', 'x', '1', 't1')] + [('ADD', f't{i}', '1', f't{i + 1}') for i in range(1, 5000)]
+chain_ir, changed = Optimizer().worklist_dead_code_elimination(CompactIR.from_tuples(chain))
+live_chain_ir, live_changed = Optimizer().liveness_dead_code_elimination(CompactIR.from_tuples(chain))
+check("Worklist and liveness DCE remove a 5000-temp dead chain in one pass",
+      changed and chain_ir.to_tuples() == [] and live_changed and live_chain_ir.to_tuples() == [])
+
+check("-O0 leaves the TAC untouched",
+      all(Optimizer(level=0).optimize(ir) == ir for ir in programs))
+check("-O1 reproduces the original fixed-point optimizer",
+      all(same_result(Optimizer(level=1).optimize, legacy_optimize, ir) for ir in programs))
+temp_like = generate_ir("int total; int temp; int x; int a; int d;"
+                        "total = x; temp = ((total + x * a) / d) * total; x = 2;")
+check("-O1 and liveness=False keep stores to user variables starting with 't'",
+      all([result for _, _, _, result in optimize(temp_like) if not is_temp(result)] == ['total', 'temp', 'x']
+          for optimize in (Optimizer(level=1).optimize, Optimizer(liveness=False).optimize))
+      and all(preserves_semantics(Optimizer(level=1).optimize, ir, inputs)
+              and preserves_semantics(Optimizer(liveness=False).optimize, ir, inputs) for ir in programs))
+fixed_point = OptimizationStats()
+folded = Optimizer().optimize(generate_ir("int b; int x; int y; b = x * y - y * x;"), stats=fixed_point)
+check("-O2 iterates until no pass has new work, skipping unaffected passes",
+      folded == [('ASSIGN', '0', None, 'b')] and fixed_point.iterations == 2 and
+      [run.name for run in fixed_point.passes if run.iteration == 2] == ['algebraic', 'value_numbering', 'dead_code'])
+one_round = OptimizationStats()
+Optimizer(max_iterations=1).optimize(programs[0], stats=one_round)
+exhausted = OptimizationStats()
+check("Iteration and time budgets cap the pass manager",
+      one_round.iterations == 1 and
+      Optimizer(time_budget=0).optimize(programs[0], stats=exhausted) == programs[0] and
+      exhausted.budget_exhausted and exhausted.passes == [])
+reused = OptimizationStats()
+Optimizer().optimize([('MUL', '1', 'x', 'a')], stats=reused)
+check("Pass manager shares def-use chains until a pass changes the IR",
+      reused.analyses_built == 1 and reused.analyses_reused == 1)
+calls = []
+def recording(name, changes_once):
+    return lambda ir, analyses: (calls.append(name) or ir, changes_once and calls.count(name) == 1)
+manager = PassManager().register('a', recording('a', True))
+manager.register('b', recording('b', False), rerun_after=('c',))
+manager.register('c', recording('c', True))
+manager.register('d', recording('d', False), rerun_after=('a',))
+manager.run(CompactIR())
+check("Pass manager reruns a pass only after a pass it depends on changed the IR",
+      calls == ['a', 'b', 'c', 'd', 'a', 'b'])
+calls.clear()
+manager.run(CompactIR(), schedule=('d',), history=[('a', True), ('b', False), ('c', True)])
+check("Pass manager resumes from a recorded history and runs a forced schedule first",
+      calls == ['d', 'a', 'b', 'c', 'd', 'a', 'b'])
+try:
+    Optimizer(level=3)
+    check("Unknown optimization levels are rejected", False)
+except ValueError:
+    check("Unknown optimization levels are rejected", True)
+
+compact = CompactIR.from_tuples(programs[-1])
+check("CompactIR round-trips the tuple IR exactly",
+      all(CompactIR.from_tuples(ir).to_tuples() == ir for ir in programs))
+check("CompactIR tags constants, named variables and temps",
+      [tag_of(operand) for operand in (compact.arg1[0], compact.result[0], compact.result[1])]
+      == [TAG_CONST, TAG_TEMP, TAG_VAR])
+sparse = CompactIR.from_tuples([('ADD', 'x', '1', 't99999999999'), ('ASSIGN', 't99999999999', None, 't7')])
+check("CompactIR interns temps densely and decodes their original numbers",
+      [operand >> 2 for operand in (sparse.result[0], sparse.arg1[1], sparse.result[1])] == [0, 0, 1]
+      and sparse.temps == [99999999999, 7] and sparse.to_tuples()[1] == ('ASSIGN', 't99999999999', None, 't7'))
+
+def allocation_preserves(instructions, registers):
+    allocation = allocate_registers(instructions, registers)
+    return (preserves_semantics(lambda ir: allocate_registers(ir, registers).instructions, instructions, inputs)
+            and preserves_semantics(lambda ir: Optimizer().optimize(allocation.instructions), instructions, inputs))
+
+check("Register allocation preserves semantics, with and without spills",
+      all(allocation_preserves(ir, registers) for ir in programs[:500] for registers in (None, 1, 2)))
+nested = generate_ir("int a; int x; a = " + "(x + " * 50 + "x" + ")" * 50 + " * ((x - 1) * (x - 2));")
+allocation = allocate_registers(nested)
+check("Linear scan without a limit uses exactly the maximum register pressure",
+      allocation.max_pressure == allocation.registers_used == 3 and allocation.spilled == 0)
+spilled = allocate_registers(generate_ir("int a; int x; a = (x + 1) * (x + 2) * ((x + 3) * (x + 4));"), registers=1)
+check("Linear scan spills intervals beyond the register limit and reports it",
+      spilled.registers_used == 1 and spilled.spilled > 0 and spilled.spill_slots > 0
+      and "spilled into" in spilled.summary() and format_ir(spilled.instructions).count("\n") == 7)
+
+nested_source = "int a; int x; a = " + "(x + " * 50 + "x" + ")" * 50 + " * ((x - 1) * (x - 2));"
+labeled = Parser(Lexer(nested_source).tokenize()).parse_compact()
+check("Sethi-Ullman labels count the temps each subtree needs",
+      sethi_ullman_labels(labeled)[labeled.left[labeled.statements[-1]]] == 2)
+check("Sethi-Ullman order evaluates the heavier operand first and reuses dead temps",
+      generate_ir("int a; int x; int y; a = x + (y * (x - y)); a = (x + y) * (x - y) + a;", sethi_ullman=True)
+      == [('SUB', 'x', 'y', 't1'), ('MUL', 'y', 't1', 't1'), ('ADD', 'x', 't1', 't1'), ('ASSIGN', 't1', None, 'a'),
+          ('ADD', 'x', 'y', 't1'), ('SUB', 'x', 'y', 't2'), ('MUL', 't1', 't2', 't1'), ('ADD', 't1', 'a', 't1'),
+          ('ASSIGN', 't1', None, 'a')])
+check("Sethi-Ullman order lowers max-live temps to the label bound",
+      max_live_temps(generate_ir(nested_source)) == 3 and max_live_temps(generate_ir(nested_source, sethi_ullman=True)) == 2)
+su_sources = [generate_program(12, depth=depth, variables=20, seed=seed) for depth in (3, 6, 9) for seed in range(20)]
+su_inputs = {f"v{i}": i - 7 for i in range(20)}
+def sethi_ullman_matches(source):
+    tree = generate_ir(source)
+    ordered = generate_ir(source, sethi_ullman=True)
+    ast = Parser(Lexer(source).tokenize()).parse_compact()
+    labels = sethi_ullman_labels(ast)
+    return (run_tac(ordered, su_inputs) == run_tac(tree, su_inputs)
+            and max_live_temps(ordered) == max(labels[ast.left[root]] for root in ast.statements
+                                             if ast.kinds[root] == NK_ASSIGNMENT)
+            and max_live_temps(ordered) <= max_live_temps(tree)
+            and ordered == generate_ir(source, compact=True, sethi_ullman=True)
+            and preserves_semantics(Optimizer().optimize, ordered, su_inputs))
+check("Sethi-Ullman order preserves semantics, meets the bound and survives the optimizer",
+      all(sethi_ullman_matches(source) for source in su_sources))
+try:
+    IRGenerator(dag=True, sethi_ullman=True)
+    check("DAG and Sethi-Ullman modes are rejected together", False)
+except ValueError:
+    check("DAG and Sethi-Ullman modes are rejected together", True)
+
+def wide_tac(rng, groups, length):
+    # Intercala programas aleatórios sem nomes em comum (variáveis e temporários renomeados por grupo).
+    def rename(text, group):
+        if text is None or not text[:1].isalpha():
+            return text
+        return f"t{group * 10 + int(text[1:])}" if is_temp(text) else f"{text}_{group}"
+    streams = [[(op, rename(arg1, group), rename(arg2, group), rename(result, group))
+                for op, arg1, arg2, result in random_tac(rng, length)] for group in range(groups)]
+    instructions = []
+    while any(streams):
+        instructions.append(rng.choice([stream for stream in streams if stream]).pop(0))
+    return instructions
+
+def modules(statements, count):
+    return "".join(re.sub(r"\bv(\d+)", rf"m{module}_v\1", generate_program(statements, variables=100, seed=module))
+                   for module in range(count))
+
+check("Dependency components split TAC by shared variables and temps, ignoring constants",
+      partition.dependency_components(CompactIR.from_tuples(
+          [('ADD', 'x', '1', 't1'), ('ASSIGN', '1', None, 'y'), ('ASSIGN', 't1', None, 'a'),
+           ('MUL', 'y', '2', 't2'), ('ADD', 'a', 'x', 'b')])) == [[0, 2, 4], [1, 3]])
+check("Partitioned optimization falls back to the serial path for budgets, stats and small programs",
+      Optimizer(jobs=2, time_budget=60, parallel_threshold=0).optimize(programs[0]) == Optimizer().optimize(programs[0])
+      and Optimizer(jobs=2, parallel_threshold=0).optimize(programs[0], stats=OptimizationStats())
+      == Optimizer().optimize(programs[0])
+      and Optimizer(jobs=2).optimize(programs[0]) == Optimizer().optimize(programs[0])
+      and partition._pool is None)
+wide_programs = [wide_tac(rng, rng.randint(2, 6), rng.randint(1, 30)) for _ in range(100)]
+check("Partitioned optimization matches the serial optimizer on random independent TAC",
+      all(same_result(Optimizer(jobs=2, parallel_threshold=0, **options).optimize, Optimizer(**options).optimize, ir)
+          for ir in wide_programs for options in ({}, {'level': 1}, {'liveness': False})))
+wide_ir = generate_ir(modules(300, 2))
+check("Partitioned optimization replays the whole-program pass schedule on every slice",
+      len(partition.dependency_components(CompactIR.from_tuples(wide_ir))) == 2
+      and Optimizer(jobs=2, parallel_threshold=0).optimize(wide_ir) == Optimizer().optimize(wide_ir)
+      and Optimizer(jobs=3, parallel_threshold=0).optimize(wide_ir, live_out=['m0_v1', 'm1_v2'])
+      == Optimizer().optimize(wide_ir, live_out=['m0_v1', 'm1_v2']))
+whole = CompactIR.from_tuples(wide_ir)
+first, second = partition.dependency_components(whole)
+part = whole.select(first)
+check("Slices carry only the pool entries they use and decode to the same TAC",
+      part.to_tuples() == [wide_ir[index] for index in first]
+      and set(part.names) == {name for index in first for name in wide_ir[index][1:] if name in whole.name_ids}
+      and len(part.names) < len(whole.names) and len(part.temps) < len(whole.temps)
+      and Optimizer(jobs=3, parallel_threshold=0).optimize(wide_ir, live_out={'m0_v1': 'int', 'm1_v2': 'int'})
+      == Optimizer().optimize(wide_ir, live_out=['m0_v1', 'm1_v2']))
+pool = partition._pool
+partition.shutdown()
+check("Partitioned optimization keeps a single pool and shuts it down on request",
+      partition._pool_jobs is None and partition._pool is None and pool._max_workers == 3
+      and Optimizer(jobs=2, parallel_threshold=0).optimize(wide_ir) == Optimizer().optimize(wide_ir)
+      and partition._pool_jobs == 2)
+partition.shutdown()
+with ProcessPoolExecutor(max_workers=1) as worker:
+    # Num worker (lote, servidor) o caminho é serial: um pool aninhado prendia a saída do worker.
+    nested = worker.submit(Optimizer(jobs=2, parallel_threshold=0).optimize, wide_ir)
+    check("Partitioned optimization runs serially inside a worker process",
+          nested.result(timeout=60) == Optimizer().optimize(wide_ir) and partition._pool is None)
+
+with tempfile.TemporaryDirectory() as directory:
+    path = os.path.join(directory, "program.tacb")
+    check("Binary IR round-trips the tuple IR exactly",
+          all(write_binary(path, ir) or read_binary(path).to_tuples() == ir for ir in programs[:300]))
+    write_binary(path, programs[-1])
+    mapped = read_binary(path)
+    optimized = Optimizer().optimize_compact(mapped).to_tuples()
+    check("Optimizer runs in place on a memory-mapped binary IR without changing the file",
+          isinstance(mapped.arg1, memoryview) and optimized == Optimizer().optimize(programs[-1])
+          and read_binary(path).to_tuples() == programs[-1])
+    with open(path, "r+b") as f:
+        f.seek(-1, os.SEEK_END)
+        last = f.read(1)
+        f.seek(-1, os.SEEK_END)
+        f.write(bytes([last[0] ^ 1]))
+    try:
+        read_binary(path)
+        check("Binary IR rejects a corrupted file by checksum", False)
+    except BinaryFormatError as e:
+        check("Binary IR rejects a corrupted file by checksum", "checksum" in str(e))
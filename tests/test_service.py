@@ -0,0 +1,99 @@
+import asyncio
+import os
+import socket
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.driver.pipeline import compile_source
+from src.service.client import CompileClient, CompileError
+from src.service.protocol import LENGTH, encode_message, recv_message
+from src.service.server import CompileServer
+
+def check(description, condition):
+    status = "SUCCESS" if condition else "FAIL"
+    print(f"{status}: {description}")
+
+print("\n" + "="*70)
+print("  COMPILE SERVER TESTS")
+print("="*70 + "\n")
+
+directory = tempfile.mkdtemp()
+path = os.path.join(directory, "compile.sock")
+loop = asyncio.new_event_loop()
+server = CompileServer(path, jobs=2, cache_entries=8)
+started = threading.Event()
+
+def serve():
+    asyncio.set_event_loop(loop)
+    loop.run_until_complete(server.start())
+    started.set()
+    loop.run_until_complete(server.serve_forever())
+
+thread = threading.Thread(target=serve, daemon=True)
+thread.start()
+started.wait(60)
+
+program = "int a; int b; a = 3 + 2; b = a * (a - 1);"
+expected = compile_source(program)
+with CompileClient(path, timeout=60) as client:
+    check("Server answers ping", client.ping())
+    check("Server returns the symbol table and optimized TAC of compile_source",
+          client.compile(program) == (expected.symbol_table, expected.optimized_ir, expected.statement_count))
+    check("Server honours compile options", client.compile(program, level=0)[1] == expected.original_ir)
+    try:
+        client.compile("int a; a = b;")
+        check("Server reports semantic errors", False)
+    except CompileError as e:
+        check("Server reports semantic errors", e.error_type == 'SemanticError' and "'b'" in e.message)
+    try:
+        client.compile("int a; a = (1 + ;")
+        check("Server reports syntax errors and keeps the connection", False)
+    except CompileError as e:
+        check("Server reports syntax errors and keeps the connection",
+              e.error_type == 'SyntaxError' and client.ping())
+    response = client.request({'source': program, 'options': {'colour': True}})
+    check("Server rejects unknown options", not response['ok'] and response['error_type'] == 'ProtocolError')
+    bad_values = [{'max_iterations': 'x'}, {'level': 7}, {'level': True}, {'time_budget': [1]}, {'dag': 1}]
+    responses = [client.request({'source': program, 'options': options}) for options in bad_values]
+    check("Server rejects option values of the wrong type before compiling",
+          all(not response['ok'] and response['error_type'] == 'ProtocolError' for response in responses)
+          and "'max_iterations'" in responses[0]['error'] and client.ping())
+    budgeted = [client.compile(program, time_budget=60) for _ in range(2)]
+    check("Server does not cache responses produced under a wall-clock budget",
+          budgeted[0] == budgeted[1] and client.stats()['compiled'] == 6)
+    again = client.compile(program)
+    stats = client.stats()
+    check("Repeated requests are answered from the warm cache",
+          again[1] == expected.optimized_ir and stats['cache_hits'] == 1 and stats['compiled'] == 6)
+
+sources = [f"int a; int x; a = x * {i} + {i % 5};" for i in range(60)]
+def compile_remote(batch):
+    with CompileClient(path, timeout=60) as client:
+        return [client.compile(source) for source in batch]
+with ThreadPoolExecutor(8) as threads:
+    results = [result for batch in threads.map(compile_remote, [sources[i::8] for i in range(8)])
+               for result in batch]
+expected_results = [compile_remote([source])[0] for source in sources]
+check("Concurrent clients all get correct results",
+      sorted(map(repr, results)) == sorted(map(repr, expected_results))
+      and all(result[1] == compile_source(source).optimized_ir for source, result in zip(sources, expected_results)))
+check("Cache keeps at most cache_entries results", len(server.cache) <= 8)
+
+raw = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+raw.settimeout(60)
+raw.connect(path)
+big = "int a; int x;" + " a = x * 3 + 1;" * 20000
+raw.sendall(encode_message({'id': 'slow', 'source': big}) + encode_message({'id': 'fast', 'command': 'ping'}))
+order = [recv_message(raw)['id'], recv_message(raw)['id']]
+check("Requests on one connection are handled concurrently", order == ['fast', 'slow'])
+raw.sendall(LENGTH.pack(5) + b"nope!")
+response = recv_message(raw)
+check("Malformed messages get a ProtocolError and close the connection",
+      response['error_type'] == 'ProtocolError' and recv_message(raw) is None)
+raw.close()
+
+loop.call_soon_threadsafe(lambda: [task.cancel() for task in asyncio.all_tasks(loop)])
+thread.join(60)
+check("Server removes its socket on shutdown", not thread.is_alive() and not os.path.exists(path))
+os.rmdir(directory)